@@ -35,6 +35,28 @@ DB_PASSWORD = env('DB_PASSWORD')
 # Google Maps API Key (for Drive Time Calculator)
 GOOGLE_MAPS_API_KEY = env('GOOGLE_MAPS_API_KEY', default='')
 
+# Google Places response cache: off, record (serve fresh hits, save misses)
+# or replay (serve recorded responses only, never call the API)
+GOOGLE_PLACES_CACHE_MODE = env('GOOGLE_PLACES_CACHE_MODE', default='off')
+GOOGLE_PLACES_CACHE_DIR = env('GOOGLE_PLACES_CACHE_DIR', default=str(BASE_DIR / '.places_cache'))
+GOOGLE_PLACES_CACHE_TTL = env.int('GOOGLE_PLACES_CACHE_TTL', default=7 * 24 * 60 * 60)
+
+# Where management commands write --profile output (.pstats/.collapsed)
+PROFILE_DIR = env('PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+
+# AI usage logs are queued and written in batches by a background thread;
+# logs that can't be written (database down, queue full) spill here
+AI_USAGE_LOG_BUFFERED = env.bool('AI_USAGE_LOG_BUFFERED', default=True)
+AI_USAGE_SPILL_DIR = env('AI_USAGE_SPILL_DIR', default=str(BASE_DIR / '.usage_spill'))
+
+# archive_ai_usage moves AI usage logs older than this (whole months) into
+# gzipped JSON-lines archives; the daily cost rollups are kept
+AI_USAGE_RETENTION_DAYS = env.int('AI_USAGE_RETENTION_DAYS', default=180)
+AI_USAGE_ARCHIVE_DIR = env('AI_USAGE_ARCHIVE_DIR', default=str(BASE_DIR / 'archives' / 'ai_usage'))
+
+# Yelp Fusion API root override (e.g. a local stand-in for testing)
+YELP_API_BASE_URL = env('YELP_API_BASE_URL', default='')
+
 # Application URL (used in emails, links, etc.)
 APP_URL = "http://localhost:8000"
 if ENVIRONMENT == 'development':
@@ -186,6 +208,14 @@ STATIC_URL = '/static/'
 # Media files
 MEDIA_URL = '/media/'
 
+# Cache
+# Rate-limit buckets for provider APIs live here; use a shared backend
+# (e.g. rediscache:// or dbcache://) so gunicorn workers and the refresh
+# timer draw from one budget. Local memory is per-process.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
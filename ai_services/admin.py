@@ -7,7 +7,8 @@ from django.contrib import admin
 from django.utils.html import format_html
 import os
 
-from .models import AIProvider, AIModel, AIOperationConfig, AIUsageLog
+from core.pagination import EstimatedCountPaginator, KeysetChangeList
+from .models import AIProvider, AIModel, AIOperationConfig, AIUsageLog, AIUsageDailyRollup
 
 
 @admin.register(AIProvider)
@@ -258,8 +259,17 @@ class AIUsageLogAdmin(admin.ModelAdmin):
         'response_time_ms', 'success', 'error_message',
         'metadata', 'created_at'
     ]
-    date_hierarchy = 'created_at'
     list_select_related = ['user']
+    # The table grows without bound: estimate/cap the count rather than
+    # COUNT(*) it, skip the unfiltered total, page by id (Older/Newest)
+    # rather than deep OFFSETs, and no date_hierarchy (its drill-down
+    # runs a DISTINCT over every row)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ['-id']
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
 
     def cost_display(self, obj):
         """Format cost with color coding"""
@@ -271,8 +281,8 @@ class AIUsageLogAdmin(admin.ModelAdmin):
         else:
             color = 'green'
         return format_html(
-            '<span style="color: {};">${:.4f}</span>',
-            color, cost
+            '<span style="color: {};">${}</span>',
+            color, f"{cost:.4f}"
         )
     cost_display.short_description = "Cost"
     cost_display.admin_order_field = 'cost_usd'
@@ -294,3 +304,25 @@ class AIUsageLogAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser
+
+
+@admin.register(AIUsageDailyRollup)
+class AIUsageDailyRollupAdmin(admin.ModelAdmin):
+    """Admin for AI usage daily rollups - read-only (rebuilt by rollup_ai_usage)"""
+
+    list_display = [
+        'date', 'task_type', 'provider', 'model',
+        'calls', 'errors', 'cost_usd', 'total_tokens'
+    ]
+    list_filter = ['task_type', 'provider', 'date']
+    search_fields = ['model']
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -5,3 +5,7 @@ class AiServicesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai_services'
     verbose_name = 'AI Services'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
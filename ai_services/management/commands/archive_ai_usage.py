@@ -0,0 +1,194 @@
+"""
+Archive old AI usage logs
+
+Moves AIUsageLog rows older than the retention period, a whole month at a
+time, into gzipped JSON-lines files (one per month) and deletes them from
+the table, so the table - and admin listings over it - stop growing.
+Before a month's rows are deleted its daily rollups are rebuilt from them;
+the rollups are kept, so cost reports still cover archived months.
+
+Keeps AI_USAGE_RETENTION_DAYS (default 180) days, rounded back to the
+start of a month. Archives are written to AI_USAGE_ARCHIVE_DIR; a month
+archived twice (late rows) gets a second numbered file. Schedule monthly.
+
+Usage:
+    python manage.py archive_ai_usage                   # Archive past the retention period
+    python manage.py archive_ai_usage --days=90         # Keep 90 days instead
+    python manage.py archive_ai_usage --dry-run         # Show what would be archived
+    python manage.py archive_ai_usage --restore=archives/ai_usage/ai_usage-2026-01.jsonl.gz
+"""
+
+import gzip
+import os
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from core.management.mixins import ProfiledCommandMixin
+from core.profiling import phase
+from ai_services.models import AIUsageLog
+from ai_services.rollups import rebuild as rebuild_rollups
+
+
+class Command(ProfiledCommandMixin, BaseCommand):
+    help = 'Move AI usage logs past the retention period into compressed monthly archives'
+
+    BATCH_SIZE = 2000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.AI_USAGE_RETENTION_DAYS,
+            help=f'Keep at least this many days of logs (default: {settings.AI_USAGE_RETENTION_DAYS})',
+        )
+        parser.add_argument(
+            '--archive-dir',
+            type=str,
+            default=settings.AI_USAGE_ARCHIVE_DIR,
+            help='Where to write archives (default: AI_USAGE_ARCHIVE_DIR)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=self.BATCH_SIZE,
+            help=f'Logs read and deleted per query (default: {self.BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be archived without writing or deleting',
+        )
+        parser.add_argument(
+            '--restore',
+            type=str,
+            metavar='FILE',
+            help='Load an archive file back into the table (rollups already count it)',
+        )
+        self.add_profile_argument(parser)
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+
+        if options['restore']:
+            self._restore(Path(options['restore']), batch_size)
+            return
+
+        if options['days'] < 1:
+            raise CommandError("--days must be at least 1")
+
+        dry_run = options['dry_run']
+        archive_dir = Path(options['archive_dir'])
+        keep_from = (timezone.localdate() - timedelta(days=options['days'])).replace(day=1)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No changes will be made\n'))
+        self.stdout.write(f"Keeping logs from {keep_from} on")
+
+        oldest = AIUsageLog.objects.filter(
+            created_at__lt=self._start_of(keep_from)
+        ).aggregate(oldest=Min('created_at'))['oldest']
+        if oldest is None:
+            self.stdout.write("Nothing to archive")
+            return
+
+        total = 0
+        month = timezone.localdate(oldest).replace(day=1)
+        while month < keep_from:
+            next_month = (month + timedelta(days=32)).replace(day=1)
+            total += self._archive_month(month, next_month, archive_dir, batch_size, dry_run)
+            month = next_month
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would archive' if dry_run else 'Archived'}: {total} logs"
+        ))
+        if dry_run:
+            self.stdout.write(self.style.NOTICE("\nDRY RUN - No changes were made"))
+
+    def _archive_month(self, month: date, next_month: date, archive_dir: Path, batch_size: int, dry_run: bool) -> int:
+        logs = AIUsageLog.objects.filter(
+            created_at__gte=self._start_of(month),
+            created_at__lt=self._start_of(next_month),
+        ).order_by('pk')
+
+        if dry_run:
+            count = logs.count()
+            if count:
+                self.stdout.write(f"  {month:%Y-%m}: {count} logs")
+            return count
+
+        # Write the whole month before deleting anything; rows written
+        # meanwhile (higher pks) are left for the next run
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        path = self._archive_path(archive_dir, month)
+        tmp_path = path.with_name(f'.{path.name}.tmp')
+        pks = []
+        with phase('export'):
+            with open(tmp_path, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+                    last_pk = 0
+                    while True:
+                        chunk = list(logs.filter(pk__gt=last_pk)[:batch_size])
+                        if not chunk:
+                            break
+                        archive.write(''.join(log.to_json() + '\n' for log in chunk).encode('utf-8'))
+                        pks.extend(log.pk for log in chunk)
+                        last_pk = chunk[-1].pk
+                raw.flush()
+                os.fsync(raw.fileno())
+
+        if not pks:
+            tmp_path.unlink()
+            return 0
+        os.replace(tmp_path, path)
+
+        # Rollups for these days must come from the rows before they go
+        with phase('rollups'):
+            rebuild_rollups(month, next_month - timedelta(days=1))
+
+        with phase('delete'):
+            for start in range(0, len(pks), batch_size):
+                AIUsageLog.objects.filter(pk__in=pks[start:start + batch_size]).delete()
+
+        self.stdout.write(f"  {month:%Y-%m}: {len(pks)} logs -> {path}")
+        return len(pks)
+
+    def _restore(self, path: Path, batch_size: int):
+        if not path.is_file():
+            raise CommandError(f"No such archive: {path}")
+
+        read = 0
+        batch = []
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                if not line.strip():
+                    continue
+                batch.append(AIUsageLog.from_json(line))
+                if len(batch) >= batch_size:
+                    AIUsageLog.objects.bulk_create(batch, ignore_conflicts=True)
+                    read += len(batch)
+                    batch = []
+        if batch:
+            AIUsageLog.objects.bulk_create(batch, ignore_conflicts=True)
+            read += len(batch)
+
+        # Rows still in the table (same pk) are skipped, so restoring twice is safe
+        self.stdout.write(self.style.SUCCESS(f"Restored {read} logs from {path}"))
+
+    @staticmethod
+    def _archive_path(archive_dir: Path, month: date) -> Path:
+        base = f'ai_usage-{month:%Y-%m}'
+        path = archive_dir / f'{base}.jsonl.gz'
+        number = 2
+        while path.exists():
+            path = archive_dir / f'{base}-{number}.jsonl.gz'
+            number += 1
+        return path
+
+    @staticmethod
+    def _start_of(day: date) -> datetime:
+        return timezone.make_aware(datetime.combine(day, time.min))
@@ -0,0 +1,148 @@
+"""
+Recompute AIUsageLog costs from the price book in providers.yaml
+
+Run after changing a price (or adding a dated price) so logged costs and
+cost reports match the current price book. Each call is priced at the
+rate in effect on the day it was made; the daily rollups for days with
+changed costs are rebuilt afterwards.
+
+Usage:
+    python manage.py recompute_ai_costs                       # All logs
+    python manage.py recompute_ai_costs --since=2026-01-01    # Logs from a date on
+    python manage.py recompute_ai_costs --provider=xai --model=grok-3-fast
+    python manage.py recompute_ai_costs --dry-run             # Report the changes only
+"""
+
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.management.mixins import ProfiledCommandMixin
+from core.profiling import phase
+from ai_services.models import AIUsageLog
+from ai_services.pricing import clear_pricing_cache, usage_cost
+from ai_services.rollups import rebuild as rebuild_rollups
+
+
+class Command(ProfiledCommandMixin, BaseCommand):
+    help = 'Recompute AIUsageLog.cost_usd from the current price book'
+
+    BATCH_SIZE = 2000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Only logs created on or after this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--until',
+            type=str,
+            help='Only logs created before this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--provider',
+            type=str,
+            help='Only logs for this provider',
+        )
+        parser.add_argument(
+            '--model',
+            type=str,
+            help='Only logs for this model',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=self.BATCH_SIZE,
+            help=f'Logs read and updated per query (default: {self.BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would change without updating',
+        )
+        self.add_profile_argument(parser)
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        batch_size = max(1, options['batch_size'])
+
+        logs = AIUsageLog.objects.all()
+        if options['since']:
+            logs = logs.filter(created_at__gte=self._start_of(options['since']))
+        if options['until']:
+            logs = logs.filter(created_at__lt=self._start_of(options['until']))
+        if options['provider']:
+            logs = logs.filter(provider=options['provider'])
+        if options['model']:
+            logs = logs.filter(model=options['model'])
+        logs = logs.only(
+            'id', 'provider', 'model', 'input_tokens', 'output_tokens',
+            'total_tokens', 'cost_usd', 'created_at',
+        ).order_by('pk')
+
+        # Pick up edits made to providers.yaml since this process loaded it
+        clear_pricing_cache()
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('DRY RUN - No changes will be made\n'))
+
+        scanned = changed = 0
+        old_total = new_total = Decimal('0')
+        first_changed = last_changed = None
+        last_pk = 0
+        while True:
+            # Keyset pagination: each chunk is an index range scan on pk
+            with phase('read'):
+                chunk = list(logs.filter(pk__gt=last_pk)[:batch_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            scanned += len(chunk)
+
+            updates = []
+            for log in chunk:
+                cost = usage_cost(
+                    log.provider, log.model,
+                    log.input_tokens, log.output_tokens, log.total_tokens,
+                    at=log.created_at,
+                )
+                old_total += log.cost_usd
+                new_total += cost
+                if cost != log.cost_usd:
+                    log.cost_usd = cost
+                    updates.append(log)
+                    day = timezone.localdate(log.created_at)
+                    first_changed = min(first_changed or day, day)
+                    last_changed = max(last_changed or day, day)
+            changed += len(updates)
+
+            if updates and not dry_run:
+                with phase('write'):
+                    AIUsageLog.objects.bulk_update(updates, ['cost_usd'], batch_size=batch_size)
+
+        self.stdout.write(f"Scanned: {scanned} logs")
+        self.stdout.write(f"{'Would update' if dry_run else 'Updated'}: {changed} logs")
+        self.stdout.write(f"Total cost: ${old_total:.4f} -> ${new_total:.4f} ({new_total - old_total:+.4f})")
+
+        if changed and not dry_run:
+            # Cost reports read the daily rollups; bring the changed days in line
+            with phase('rollups'):
+                rows = rebuild_rollups(first_changed, last_changed)
+            self.stdout.write(f"Rebuilt rollups for {first_changed} to {last_changed}: {rows} rows")
+
+        if dry_run:
+            self.stdout.write(self.style.NOTICE("\nDRY RUN - No changes were made"))
+
+    @staticmethod
+    def _start_of(value: str) -> datetime:
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise CommandError(f"Invalid date: {value!r} (expected YYYY-MM-DD)")
+        return timezone.make_aware(datetime.combine(day, time.min))
@@ -0,0 +1,82 @@
+"""
+Rebuild the AI usage daily rollups from AIUsageLog
+
+Rollups are kept current as logs are written; this recomputes them from
+the raw logs for a range of days, replacing what's there. Safe to re-run.
+Schedule it nightly (the default range, yesterday and today, catches
+anything written past the usage buffer) and run it with --all to backfill.
+Days whose raw logs have been pruned are left alone.
+
+Usage:
+    python manage.py rollup_ai_usage                        # Yesterday and today
+    python manage.py rollup_ai_usage --days=30              # The last 30 days
+    python manage.py rollup_ai_usage --since=2026-01-01     # From a date to today
+    python manage.py rollup_ai_usage --since=2026-01-01 --until=2026-01-31
+    python manage.py rollup_ai_usage --all                  # Every day with logs
+"""
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.management.mixins import ProfiledCommandMixin
+from ai_services.rollups import rebuild
+
+
+class Command(ProfiledCommandMixin, BaseCommand):
+    help = 'Rebuild AI usage daily rollups from the raw usage logs'
+
+    DEFAULT_DAYS = 2
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=self.DEFAULT_DAYS,
+            help=f'Rebuild the last N days, today included (default: {self.DEFAULT_DAYS})',
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='First day to rebuild (YYYY-MM-DD); overrides --days',
+        )
+        parser.add_argument(
+            '--until',
+            type=str,
+            help='Last day to rebuild (YYYY-MM-DD, default: today)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild every day that has logs',
+        )
+        self.add_profile_argument(parser)
+
+    def handle(self, *args, **options):
+        end = self._parse_day(options['until']) if options['until'] else timezone.localdate()
+        if options['all']:
+            start = None
+        elif options['since']:
+            start = self._parse_day(options['since'])
+        else:
+            start = end - timedelta(days=max(options['days'], 1) - 1)
+
+        if start and start > end:
+            raise CommandError(f"--since ({start}) is after --until ({end})")
+
+        rows = rebuild(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rollups for {start or 'the first logged day'} to {end}: {rows} rows"
+        ))
+
+    @staticmethod
+    def _parse_day(value: str) -> date:
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise CommandError(f"Invalid date: {value!r} (expected YYYY-MM-DD)")
+        return day
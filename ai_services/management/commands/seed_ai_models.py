@@ -8,12 +8,14 @@ Usage:
 """
 
 from django.core.management.base import BaseCommand
+from core.management.mixins import ProfiledCommandMixin
+from core.profiling import phase
 from ai_services.models import AIProvider, AIModel, AIOperationConfig
 from ai_services.pricing import get_all_pricing
 from decimal import Decimal
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommandMixin, BaseCommand):
     help = 'Seed AI providers, models, and default operation configs from providers.yaml'
 
     def add_arguments(self, parser):
@@ -27,6 +29,7 @@ class Command(BaseCommand):
             action='store_true',
             help='Delete existing data before seeding (use with caution)'
         )
+        self.add_profile_argument(parser)
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
@@ -43,13 +46,16 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS('Existing data deleted.\n'))
 
         # Seed providers
-        providers = self._seed_providers(dry_run)
+        with phase('providers'):
+            providers = self._seed_providers(dry_run)
 
         # Seed models from providers.yaml pricing data
-        self._seed_models(providers, dry_run)
+        with phase('models'):
+            self._seed_models(providers, dry_run)
 
         # Seed default operation configs
-        self._seed_operation_configs(providers, dry_run)
+        with phase('operation configs'):
+            self._seed_operation_configs(providers, dry_run)
 
         self.stdout.write(self.style.SUCCESS('\nSeeding complete!'))
 
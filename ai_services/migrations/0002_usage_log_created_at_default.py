@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_services', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aiusagelog',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+    ]
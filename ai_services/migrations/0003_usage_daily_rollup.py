@@ -0,0 +1,78 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:04
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    """Roll up the existing logs (later days are kept by ai_services.rollups)."""
+    AIUsageLog = apps.get_model('ai_services', 'AIUsageLog')
+    AIUsageDailyRollup = apps.get_model('ai_services', 'AIUsageDailyRollup')
+    rows = (
+        AIUsageLog.objects
+        .annotate(date=TruncDate('created_at'))
+        .values('date', 'task_type', 'provider', 'model')
+        .annotate(
+            calls=Count('id'),
+            errors=Count('id', filter=Q(success=False)),
+            sum_cost_usd=Coalesce(Sum('cost_usd'), Decimal('0')),
+            sum_input_tokens=Coalesce(Sum('input_tokens'), 0),
+            sum_output_tokens=Coalesce(Sum('output_tokens'), 0),
+            sum_total_tokens=Coalesce(Sum('total_tokens'), 0),
+            sum_response_time_ms=Coalesce(Sum('response_time_ms'), 0),
+        )
+        .order_by()
+    )
+    AIUsageDailyRollup.objects.bulk_create([
+        AIUsageDailyRollup(
+            date=row['date'],
+            task_type=row['task_type'],
+            provider=row['provider'],
+            model=row['model'],
+            calls=row['calls'],
+            errors=row['errors'],
+            cost_usd=row['sum_cost_usd'],
+            input_tokens=row['sum_input_tokens'],
+            output_tokens=row['sum_output_tokens'],
+            total_tokens=row['sum_total_tokens'],
+            response_time_ms=row['sum_response_time_ms'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_services', '0002_usage_log_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIUsageDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Day the calls were made (local time)')),
+                ('task_type', models.CharField(choices=[('content_venue_description', 'Content: Venue Description'), ('content_city_description', 'Content: City Description'), ('content_refresh', 'Content: Refresh/Update'), ('research_events', 'Research: Event Discovery'), ('research_happenings', 'Research: Local Happenings'), ('research_fact_check', 'Research: Fact Checking'), ('search_venues', 'Search: Venue Recommendations'), ('general_assistant', 'General: Assistant'), ('other', 'Other')], max_length=50)),
+                ('provider', models.CharField(choices=[('openai', 'OpenAI'), ('anthropic', 'Anthropic'), ('xai', 'xAI'), ('blackforestlabs', 'Black Forest Labs'), ('google', 'Google')], max_length=50)),
+                ('model', models.CharField(max_length=100)),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('cost_usd', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=14)),
+                ('input_tokens', models.BigIntegerField(default=0)),
+                ('output_tokens', models.BigIntegerField(default=0)),
+                ('total_tokens', models.BigIntegerField(default=0)),
+                ('response_time_ms', models.BigIntegerField(default=0, help_text='Sum over calls; divide by calls for the average')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'AI Usage Daily Rollup',
+                'verbose_name_plural': 'AI Usage Daily Rollups',
+                'ordering': ['-date', 'task_type', 'provider', 'model'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'task_type', 'provider', 'model'), name='ai_usage_rollup_unique_key')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,10 @@ Central AI Model Selection Service
 Provides a single function to get the configured model for any operation.
 Supports fallback chain: global config -> hardcoded default.
 
+Operation configs are served from an in-process registry (see
+core.config_registry), loaded in one query and reloaded when a config,
+model or provider is saved, so lookups don't touch the database.
+
 Usage:
     from ai_services.model_selector import get_model_config, get_model_for_operation
 
@@ -23,7 +27,10 @@ Usage:
 
 import logging
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
+
+from core.config_registry import ConfigRegistry
+from .models import AIModel, AIOperationConfig, AIProvider
 
 logger = logging.getLogger(__name__)
 
@@ -105,6 +112,35 @@ HARDCODED_DEFAULTS: dict[str, ModelConfig] = {
 }
 
 
+# =============================================================================
+# Config Registry
+# =============================================================================
+
+def _load_operation_configs() -> Dict[str, ModelConfig]:
+    """Enabled AIOperationConfig rows as ModelConfigs, keyed by operation (one query)."""
+    configs = AIOperationConfig.objects.filter(is_enabled=True).select_related(
+        'model', 'model__provider', 'fallback_model', 'fallback_model__provider'
+    )
+    return {
+        config.operation: ModelConfig(
+            provider=config.model.provider.name,
+            model_id=config.model.model_id,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+            fallback_model_id=config.fallback_model.model_id if config.fallback_model else None,
+            fallback_provider=config.fallback_model.provider.name if config.fallback_model else None,
+        )
+        for config in configs
+    }
+
+
+operation_configs = ConfigRegistry(
+    'ai_operation_configs',
+    _load_operation_configs,
+    watched_models=(AIOperationConfig, AIModel, AIProvider),
+)
+
+
 # =============================================================================
 # Main Functions
 # =============================================================================
@@ -133,31 +169,10 @@ def get_model_config(operation: str) -> ModelConfig:
     """
     # Try database config first
     try:
-        from .models import AIOperationConfig
-
-        config = AIOperationConfig.objects.select_related(
-            'model', 'model__provider', 'fallback_model', 'fallback_model__provider'
-        ).get(operation=operation, is_enabled=True)
-
-        fallback_model_id = None
-        fallback_provider = None
-        if config.fallback_model:
-            fallback_model_id = config.fallback_model.model_id
-            fallback_provider = config.fallback_model.provider.name
-
-        logger.debug(
-            f"Using DB config for {operation}: {config.model.model_id}"
-        )
-
-        return ModelConfig(
-            provider=config.model.provider.name,
-            model_id=config.model.model_id,
-            temperature=config.temperature,
-            max_tokens=config.max_tokens,
-            fallback_model_id=fallback_model_id,
-            fallback_provider=fallback_provider,
-        )
-
+        config = operation_configs.get(operation)
+        if config:
+            logger.debug(f"Using DB config for {operation}: {config.model_id}")
+            return config
     except Exception as e:
         # Log but don't fail - fall back to hardcoded
         logger.debug(f"Using hardcoded default for {operation}: {e}")
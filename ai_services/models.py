@@ -3,9 +3,12 @@ AI Services Models for About Hampton Roads
 
 Tracks AI usage, costs, and provides model configuration management.
 """
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from decimal import Decimal
+import json
 import os
 
 User = get_user_model()
@@ -342,7 +345,9 @@ class AIUsageLog(models.Model):
         help_text="Additional context (venue_id, city_id, etc.)"
     )
 
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # When the call was logged; set explicitly (not auto_now_add) so rows
+    # written later by the usage buffer keep the time of the call
+    created_at = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
@@ -372,7 +377,7 @@ class AIUsageLog(models.Model):
         return calculate_cost(provider, model, input_tokens, output_tokens)
 
     @classmethod
-    def log_usage(
+    def build(
         cls,
         task_type: str,
         provider: str,
@@ -385,23 +390,17 @@ class AIUsageLog(models.Model):
         success: bool = True,
         error_message: str = "",
         metadata: dict = None
-    ):
+    ) -> 'AIUsageLog':
         """
-        Convenience method to log AI usage.
-        Automatically calculates cost from token counts.
+        An unsaved log for an AI call made now, with its cost calculated
+        from the token counts.
         """
-        # Calculate cost using centralized pricing
-        if input_tokens and output_tokens:
-            cost = cls.calculate_cost(model, input_tokens, output_tokens, provider=provider)
-        elif total_tokens:
-            # Estimate 70/30 split if only total provided
-            est_input = int(total_tokens * 0.7)
-            est_output = int(total_tokens * 0.3)
-            cost = cls.calculate_cost(model, est_input, est_output, provider=provider)
-        else:
-            cost = Decimal('0')
-
-        return cls.objects.create(
+        # Calculate cost using centralized pricing (70/30 split if only total provided)
+        from .pricing import usage_cost
+        created_at = timezone.now()
+        cost = usage_cost(provider, model, input_tokens, output_tokens, total_tokens, at=created_at)
+
+        return cls(
             user=user,
             task_type=task_type,
             provider=provider,
@@ -413,5 +412,75 @@ class AIUsageLog(models.Model):
             response_time_ms=response_time_ms,
             success=success,
             error_message=error_message,
-            metadata=metadata or {}
+            metadata=metadata or {},
+            created_at=created_at,
+        )
+
+    def to_json(self) -> str:
+        """One line of a spill or archive file (every column, pk included)."""
+        return json.dumps(
+            {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields},
+            cls=DjangoJSONEncoder,
         )
+
+    @classmethod
+    def from_json(cls, line: str) -> 'AIUsageLog':
+        """An unsaved log from a to_json() line (pk kept if it was set)."""
+        row = json.loads(line)
+        return cls(**{
+            field.attname: field.to_python(row[field.attname])
+            for field in cls._meta.concrete_fields if field.attname in row
+        })
+
+    @classmethod
+    def log_usage(cls, **kwargs) -> 'AIUsageLog':
+        """
+        Convenience method to log AI usage synchronously (see build()).
+        log_ai_usage() queues the log for a batched write instead.
+        """
+        from .rollups import record
+        log = cls.build(**kwargs)
+        with transaction.atomic():
+            log.save()
+            record([log])
+        return log
+
+
+class AIUsageDailyRollup(models.Model):
+    """
+    AIUsageLog totals per day x task type x provider x model.
+
+    Cost reports read these instead of aggregating raw logs, so a report
+    costs the same however many months of logs are kept. Maintained by
+    ai_services.rollups: incremented as logs are written and rebuilt from
+    the raw logs by `manage.py rollup_ai_usage`.
+    """
+
+    date = models.DateField(help_text="Day the calls were made (local time)")
+    task_type = models.CharField(max_length=50, choices=AIUsageLog.TASK_TYPE_CHOICES)
+    provider = models.CharField(max_length=50, choices=AIUsageLog.PROVIDER_CHOICES)
+    model = models.CharField(max_length=100)
+
+    calls = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    cost_usd = models.DecimalField(max_digits=14, decimal_places=6, default=Decimal('0'))
+    input_tokens = models.BigIntegerField(default=0)
+    output_tokens = models.BigIntegerField(default=0)
+    total_tokens = models.BigIntegerField(default=0)
+    response_time_ms = models.BigIntegerField(default=0, help_text="Sum over calls; divide by calls for the average")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date', 'task_type', 'provider', 'model']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'task_type', 'provider', 'model'],
+                name='ai_usage_rollup_unique_key',
+            ),
+        ]
+        verbose_name = "AI Usage Daily Rollup"
+        verbose_name_plural = "AI Usage Daily Rollups"
+
+    def __str__(self):
+        return f"{self.date} {self.task_type} - {self.model} - ${self.cost_usd:.4f}"
@@ -2,20 +2,159 @@
 Centralized AI Pricing Configuration
 
 Single source of truth for all AI provider/model pricing.
-Reads from providers.yaml and provides utilities for cost calculation.
+Reads the price book from providers.yaml and provides utilities for cost
+calculation; AIModel's price fields are a display copy written by
+seed_ai_models, and AIUsageLog costs can be recomputed with
+`manage.py recompute_ai_costs` after a price change.
+
+The price book is compiled once into a PricingEngine:
+- Per provider, an exact index of model names; a model that isn't listed
+  (e.g. 'gpt-4o-2024-05-13') resolves to its longest listed prefix
+  ('gpt-4o') by dict probes, not a scan of every model
+- Resolutions are memoized, so repeated lookups are a dict hit
+- A model may list several dated rates; a cost is priced at the rate in
+  effect when the call was made
 """
-import os
-import yaml
+import bisect
 import logging
-from decimal import Decimal
-from typing import Dict
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
 from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+import yaml
 
 logger = logging.getLogger(__name__)
 
 # Path to the config file
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config', 'providers.yaml')
 
+DEFAULT_RATES = {'input': 0.01, 'output': 0.03}
+
+COST_PLACES = Decimal('0.000001')  # AIUsageLog.cost_usd has 6 decimal places
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Prices per 1K tokens (or per image), in effect from `effective` on."""
+    input: Decimal
+    output: Decimal
+    per_image: Optional[Decimal] = None
+    effective: Optional[date] = None
+
+    def as_dict(self) -> Dict[str, float]:
+        rates = {'input': float(self.input), 'output': float(self.output)}
+        if self.per_image is not None:
+            rates['per_image'] = float(self.per_image)
+        return rates
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value)) if value is not None else Decimal('0')
+
+
+def _parse_rate(entry: dict) -> Rate:
+    effective = entry.get('effective')
+    if isinstance(effective, str):
+        effective = date.fromisoformat(effective)
+    return Rate(
+        input=_decimal(entry.get('input')),
+        output=_decimal(entry.get('output')),
+        per_image=_decimal(entry['per_image']) if entry.get('per_image') is not None else None,
+        effective=effective,
+    )
+
+
+class PricingEngine:
+    """Compiled price book (see module docstring)."""
+
+    def __init__(self, pricing: dict):
+        """
+        Args:
+            pricing: The 'pricing' section of providers.yaml: provider ->
+                model -> rates, where rates is a mapping or a list of
+                mappings with an 'effective' date
+        """
+        self.default = _parse_rate(pricing.get('default') or DEFAULT_RATES)
+        # provider -> model -> rates sorted by effective date (undated first)
+        self._index: Dict[str, Dict[str, List[Rate]]] = {}
+        self._dates: Dict[Tuple[str, str], List[date]] = {}
+        for provider, models in pricing.items():
+            if provider == 'default' or not isinstance(models, dict):
+                continue
+            index = self._index[provider.lower()] = {}
+            for model, entries in models.items():
+                if isinstance(entries, dict):
+                    entries = [entries]
+                rates = sorted((_parse_rate(e) for e in entries), key=lambda r: r.effective or date.min)
+                index[model] = rates
+                self._dates[(provider.lower(), model)] = [r.effective or date.min for r in rates]
+        self._resolved: Dict[Tuple[str, str], Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, provider: str, model: str) -> Optional[str]:
+        """The price book model a model id is priced as (exact, else longest prefix)."""
+        key = (provider, model)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        index = self._index.get(provider.lower(), {})
+        resolved = None
+        if model in index:
+            resolved = model
+        else:
+            for end in range(len(model) - 1, 0, -1):
+                if model[:end] in index:
+                    resolved = model[:end]
+                    logger.debug(f"Matched {model} to {resolved} for pricing")
+                    break
+        if resolved is None:
+            logger.warning(f"No pricing found for {provider}/{model}, using default rates")
+
+        with self._lock:
+            self._resolved[key] = resolved
+        return resolved
+
+    def rate(self, provider: str, model: str, at: Union[date, datetime, None] = None) -> Rate:
+        """Rate for a provider/model in effect at `at` (default: today)."""
+        resolved = self.resolve(provider, model)
+        if resolved is None:
+            return self.default
+        rates = self._index[provider.lower()][resolved]
+        if len(rates) == 1:
+            return rates[0]
+        day = at.date() if isinstance(at, datetime) else (at or date.today())
+        position = bisect.bisect_right(self._dates[(provider.lower(), resolved)], day)
+        # Before the first dated price, the earliest one applies
+        return rates[max(0, position - 1)]
+
+    def cost(
+        self,
+        provider: str,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        at: Union[date, datetime, None] = None
+    ) -> Decimal:
+        """Cost in USD of a call, at the rate in effect at `at`."""
+        rate = self.rate(provider, model, at)
+        cost = (Decimal(input_tokens or 0) * rate.input + Decimal(output_tokens or 0) * rate.output) / 1000
+        return cost.quantize(COST_PLACES, rounding=ROUND_HALF_UP)
+
+    def current_rates(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """provider -> model -> today's rates, plus 'default'."""
+        table = {
+            provider: {model: self.rate(provider, model).as_dict() for model in models}
+            for provider, models in self._index.items()
+        }
+        table['default'] = self.default.as_dict()
+        return table
+
 
 @lru_cache(maxsize=1)
 def _load_pricing_config() -> Dict:
@@ -29,41 +168,33 @@ def _load_pricing_config() -> Dict:
         return {}
 
 
-def get_pricing(provider: str, model: str) -> Dict[str, float]:
+@lru_cache(maxsize=1)
+def get_engine() -> PricingEngine:
+    """The compiled price book (cached)."""
+    return PricingEngine(_load_pricing_config())
+
+
+def get_pricing(provider: str, model: str, at: Union[date, datetime, None] = None) -> Dict[str, float]:
     """
     Get pricing rates for a provider/model combination.
 
     Args:
         provider: Provider name ('openai', 'anthropic', 'xai')
         model: Model name (e.g., 'gpt-4o', 'claude-haiku-4-5-20251001')
+        at: Date the rates should be in effect (default: today)
 
     Returns:
         Dict with 'input' and 'output' rates per 1K tokens
     """
-    pricing_config = _load_pricing_config()
-
-    # Try exact match first
-    provider_pricing = pricing_config.get(provider.lower(), {})
-    if model in provider_pricing:
-        return provider_pricing[model]
-
-    # Try partial model match (e.g., 'gpt-4o-2024-05-13' matches 'gpt-4o')
-    for known_model, rates in provider_pricing.items():
-        if model.startswith(known_model) or known_model.startswith(model):
-            logger.debug(f"Matched {model} to {known_model} for pricing")
-            return rates
-
-    # Fall back to default rates
-    default_rates = pricing_config.get('default', {'input': 0.01, 'output': 0.03})
-    logger.warning(f"No pricing found for {provider}/{model}, using defaults: {default_rates}")
-    return default_rates
+    return get_engine().rate(provider, model, at).as_dict()
 
 
 def calculate_cost(
     provider: str,
     model: str,
     input_tokens: int,
-    output_tokens: int
+    output_tokens: int,
+    at: Union[date, datetime, None] = None
 ) -> Decimal:
     """
     Calculate cost in USD from token counts.
@@ -73,21 +204,20 @@ def calculate_cost(
         model: Model name
         input_tokens: Number of input/prompt tokens
         output_tokens: Number of output/completion tokens
+        at: When the call was made (default: today)
 
     Returns:
         Cost in USD as Decimal
     """
-    rates = get_pricing(provider, model)
-    input_cost = (input_tokens / 1000) * rates['input']
-    output_cost = (output_tokens / 1000) * rates['output']
-    return Decimal(str(round(input_cost + output_cost, 6)))
+    return get_engine().cost(provider, model, input_tokens, output_tokens, at)
 
 
 def estimate_cost_from_total(
     provider: str,
     model: str,
     total_tokens: int,
-    input_ratio: float = 0.7
+    input_ratio: float = 0.7,
+    at: Union[date, datetime, None] = None
 ) -> Decimal:
     """
     Estimate cost when only total tokens are known.
@@ -97,20 +227,45 @@ def estimate_cost_from_total(
         model: Model name
         total_tokens: Total token count
         input_ratio: Assumed ratio of input to total (default 70%)
+        at: When the call was made (default: today)
 
     Returns:
         Estimated cost in USD as Decimal
     """
     input_tokens = int(total_tokens * input_ratio)
     output_tokens = total_tokens - input_tokens
-    return calculate_cost(provider, model, input_tokens, output_tokens)
+    return calculate_cost(provider, model, input_tokens, output_tokens, at)
+
+
+def usage_cost(
+    provider: str,
+    model: str,
+    input_tokens: Optional[int],
+    output_tokens: Optional[int],
+    total_tokens: Optional[int] = None,
+    at: Union[date, datetime, None] = None
+) -> Decimal:
+    """
+    Cost of a logged call (AIUsageLog), from whichever token counts it has.
+
+    Uses the input/output split when both are known, else estimates from
+    the total (70/30), else zero.
+    """
+    if input_tokens and output_tokens:
+        return calculate_cost(provider, model, input_tokens, output_tokens, at)
+    if total_tokens:
+        est_input = int(total_tokens * 0.7)
+        est_output = int(total_tokens * 0.3)
+        return calculate_cost(provider, model, est_input, est_output, at)
+    return Decimal('0')
 
 
 def get_all_pricing() -> Dict:
-    """Get the complete pricing configuration (for admin/display purposes)."""
-    return _load_pricing_config()
+    """Today's rates for every provider/model (for admin/display purposes)."""
+    return get_engine().current_rates()
 
 
 def clear_pricing_cache():
     """Clear the cached pricing config (call after config file changes)."""
     _load_pricing_config.cache_clear()
+    get_engine.cache_clear()
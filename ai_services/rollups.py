@@ -0,0 +1,159 @@
+"""
+AI Usage Daily Rollups
+
+Keeps AIUsageDailyRollup (per day x task type x provider x model totals)
+in step with AIUsageLog, so cost reports aggregate a few rows per day
+instead of every raw log:
+
+- record(logs) adds a batch of just-written logs to their rollup rows, in
+  the caller's transaction; the usage buffer calls it with each batch it
+  writes, and AIUsageLog.log_usage() with its row
+- rebuild(start, end) recomputes the rollups for a day range from the raw
+  logs and replaces them. It is idempotent, so it corrects any drift
+  (writes that bypassed record(), recompute_ai_costs) and backfills;
+  `manage.py rollup_ai_usage` runs it
+
+Days are local dates (TIME_ZONE), matching TruncDate in reports.
+
+Usage:
+    from ai_services.rollups import rollup_queryset
+
+    rows = rollup_queryset(days=30)
+    rows.aggregate(cost=Sum('cost_usd'), calls=Sum('calls'))
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import AIUsageDailyRollup, AIUsageLog
+
+logger = logging.getLogger(__name__)
+
+KEY_FIELDS = ('date', 'task_type', 'provider', 'model')
+SUM_FIELDS = ('calls', 'errors', 'cost_usd', 'input_tokens', 'output_tokens', 'total_tokens', 'response_time_ms')
+
+REBUILD_WINDOW_DAYS = 31  # days aggregated and replaced per transaction
+
+
+def _totals(logs: Iterable[AIUsageLog]) -> Dict[Tuple, Dict[str, object]]:
+    """Sum logs per rollup key, in Python."""
+    totals = defaultdict(lambda: dict.fromkeys(SUM_FIELDS, 0))
+    for log in logs:
+        key = (timezone.localdate(log.created_at), log.task_type, log.provider, log.model)
+        row = totals[key]
+        row['calls'] += 1
+        row['errors'] += 0 if log.success else 1
+        row['cost_usd'] += log.cost_usd or Decimal('0')
+        row['input_tokens'] += log.input_tokens or 0
+        row['output_tokens'] += log.output_tokens or 0
+        row['total_tokens'] += log.total_tokens or 0
+        row['response_time_ms'] += log.response_time_ms or 0
+    return totals
+
+
+def record(logs: Iterable[AIUsageLog]):
+    """
+    Add written logs to their rollup rows.
+
+    One UPDATE per distinct key in the batch (typically a handful for
+    hundreds of logs); a missing row is inserted, and a concurrent insert
+    of the same row falls back to the UPDATE.
+    """
+    for key, row in _totals(logs).items():
+        lookup = dict(zip(KEY_FIELDS, key))
+        increments = {field: F(field) + value for field, value in row.items()}
+        increments['updated_at'] = timezone.now()
+        with transaction.atomic():
+            if AIUsageDailyRollup.objects.filter(**lookup).update(**increments):
+                continue
+            try:
+                with transaction.atomic():
+                    AIUsageDailyRollup.objects.create(**lookup, **row)
+            except IntegrityError:
+                AIUsageDailyRollup.objects.filter(**lookup).update(**increments)
+
+
+def _start_of(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def rebuild(start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """
+    Recompute rollups for start..end (inclusive) from the raw logs.
+
+    start defaults to the day of the oldest log, end to today. Days before
+    the oldest log are never touched, so rollups for days whose raw logs
+    were pruned survive a rebuild. Returns the number of rollup rows
+    written.
+    """
+    oldest = AIUsageLog.objects.aggregate(oldest=Min('created_at'))['oldest']
+    if oldest is None:
+        return 0
+    oldest_day = timezone.localdate(oldest)
+    start = max(start or oldest_day, oldest_day)
+    end = end or timezone.localdate()
+
+    written = 0
+    window_start = start
+    while window_start <= end:
+        window_end = min(window_start + timedelta(days=REBUILD_WINDOW_DAYS - 1), end)
+        written += _rebuild_window(window_start, window_end)
+        window_start = window_end + timedelta(days=1)
+    return written
+
+
+def _rebuild_window(start: date, end: date) -> int:
+    rows = (
+        AIUsageLog.objects
+        .filter(created_at__gte=_start_of(start), created_at__lt=_start_of(end + timedelta(days=1)))
+        .annotate(date=TruncDate('created_at'))
+        .values(*KEY_FIELDS)
+        .annotate(
+            calls=Count('id'),
+            errors=Count('id', filter=Q(success=False)),
+            sum_cost_usd=Coalesce(Sum('cost_usd'), Decimal('0')),
+            sum_input_tokens=Coalesce(Sum('input_tokens'), 0),
+            sum_output_tokens=Coalesce(Sum('output_tokens'), 0),
+            sum_total_tokens=Coalesce(Sum('total_tokens'), 0),
+            sum_response_time_ms=Coalesce(Sum('response_time_ms'), 0),
+        )
+        .order_by()
+    )
+    # Read and replace in one transaction, so logs written meanwhile are
+    # either in the new rows or recorded on top of them
+    with transaction.atomic():
+        rollups = [
+            AIUsageDailyRollup(
+                **{field: row[field] for field in KEY_FIELDS},
+                calls=row['calls'],
+                errors=row['errors'],
+                cost_usd=row['sum_cost_usd'],
+                input_tokens=row['sum_input_tokens'],
+                output_tokens=row['sum_output_tokens'],
+                total_tokens=row['sum_total_tokens'],
+                response_time_ms=row['sum_response_time_ms'],
+            )
+            for row in rows
+        ]
+        AIUsageDailyRollup.objects.filter(date__gte=start, date__lte=end).delete()
+        AIUsageDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+    logger.info(f"Rebuilt AI usage rollups for {start}..{end}: {len(rollups)} rows")
+    return len(rollups)
+
+
+def first_day(days: int) -> date:
+    """First day of a report over the last `days` days, today included."""
+    return timezone.localdate() - timedelta(days=max(days, 1) - 1)
+
+
+def rollup_queryset(days: int = 30):
+    """Rollup rows for the last `days` days, today included."""
+    return AIUsageDailyRollup.objects.filter(date__gte=first_day(days))
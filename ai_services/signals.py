@@ -0,0 +1,11 @@
+"""
+AI Services Signal Handlers
+
+Connected in AiServicesConfig.ready().
+"""
+
+from .model_selector import operation_configs
+
+
+def connect():
+    operation_configs.connect()
@@ -0,0 +1,280 @@
+"""
+Buffered AI Usage Logging
+
+log_ai_usage() used to INSERT one AIUsageLog row on the caller's thread,
+inside whatever request or transaction made the AI call. Calls are now
+queued in-process and written by a background flusher thread with one
+bulk_create per batch:
+
+- The flusher wakes every FLUSH_INTERVAL seconds, or as soon as
+  BATCH_SIZE logs are waiting
+- The queue holds at most MAX_PENDING logs; past that (the database is
+  down or too slow to keep up) the queue spills to a JSON-lines file in
+  AI_USAGE_SPILL_DIR instead of growing memory
+- A batch the database rejects is spilled too, not dropped
+- Each batch updates the daily cost rollups (ai_services.rollups) in the
+  same transaction
+- Spill files are replayed on later flushes (by any process), each in one
+  transaction, after being claimed by rename so two processes never
+  replay the same file
+- The queue is flushed at interpreter exit (atexit), so a management
+  command's logs are written before the process ends
+
+created_at is set when the call is logged, not when the row is written.
+Set AI_USAGE_LOG_BUFFERED=False to write each log synchronously instead.
+
+Usage:
+    from ai_services.usage_buffer import usage_buffer
+
+    usage_buffer.add(AIUsageLog.build(...))
+    usage_buffer.flush()  # Write everything queued now (e.g. in a test)
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import List
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from . import rollups
+from .models import AIUsageLog
+
+logger = logging.getLogger(__name__)
+
+
+class UsageLogBuffer:
+    """In-process queue of unsaved AIUsageLog rows (see module docstring)."""
+
+    FLUSH_INTERVAL = 2.0  # seconds between flushes
+    BATCH_SIZE = 500  # rows per bulk_create; a full batch wakes the flusher early
+    MAX_PENDING = 10000  # queued rows before the queue spills to disk
+    STALE_CLAIM_AGE = 60 * 10  # seconds before a crashed replay's claim is retaken
+
+    def __init__(self, spill_dir: str = None):
+        self.spill_dir = Path(spill_dir or settings.AI_USAGE_SPILL_DIR)
+
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush (and replay) at a time
+        self._spill_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._atexit_registered = False
+
+    # -------------------------------------------------------------------------
+    # Producers
+    # -------------------------------------------------------------------------
+
+    def add(self, log: AIUsageLog):
+        """Queue an unsaved log for the next flush."""
+        if not getattr(settings, 'AI_USAGE_LOG_BUFFERED', True):
+            self._write([log])
+            return
+
+        overflow = None
+        with self._lock:
+            self._pending.append(log)
+            pending = len(self._pending)
+            if pending > self.MAX_PENDING:
+                # Move the whole queue to disk in one file rather than
+                # growing memory while the flusher can't keep up
+                overflow = list(self._pending)
+                self._pending.clear()
+        if overflow:
+            self._spill(overflow)
+            return
+
+        self._ensure_flusher()
+        if pending >= self.BATCH_SIZE:
+            self._wake.set()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # -------------------------------------------------------------------------
+    # Flushing
+    # -------------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """
+        Write queued logs (and any spill files) now.
+
+        Runs on the calling thread, so call it outside a transaction the
+        logs shouldn't join. Returns the number of rows written.
+        """
+        with self._flush_lock:
+            written = 0
+            db_ok = True
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.BATCH_SIZE, len(self._pending)))]
+                if not batch:
+                    break
+                if not db_ok:
+                    self._spill(batch)
+                    continue
+                try:
+                    self._write(batch)
+                    written += len(batch)
+                except Exception as e:
+                    # Keep the rest of the queue out of the database too, and
+                    # out of memory: it's replayed once writes work again
+                    logger.warning(f"Failed to write {len(batch)} AI usage logs, spilling to disk: {e}")
+                    db_ok = False
+                    self._spill(batch)
+
+            if db_ok:
+                written += self._replay_spills()
+            return written
+
+    def _write(self, logs: List[AIUsageLog]):
+        # Rows and their daily rollups commit together, so a batch that
+        # fails (and is spilled and replayed) is never counted twice
+        with transaction.atomic():
+            AIUsageLog.objects.bulk_create(logs, batch_size=self.BATCH_SIZE)
+            rollups.record(logs)
+
+    def close(self):
+        """Stop the flusher and write what's left (registered with atexit)."""
+        thread = self._thread
+        self._thread = None
+        if thread is not None and thread.is_alive():
+            self._wake.set()
+            thread.join(timeout=self.FLUSH_INTERVAL * 5)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush AI usage logs at exit: {e}")
+
+    def _ensure_flusher(self):
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            thread = self._thread
+            if thread is not None and thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='ai-usage-flusher', daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.close)
+                self._atexit_registered = True
+
+    def _run(self):
+        me = threading.current_thread()
+        while self._thread is me:
+            self._wake.wait(self.FLUSH_INTERVAL)
+            self._wake.clear()
+            if not self._pending and not self._has_spills():
+                continue
+            # The flusher owns its own connection; drop it when stale, as
+            # Django does around each request
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"AI usage log flush failed: {e}")
+            finally:
+                close_old_connections()
+
+    def _after_fork(self):
+        # Rows queued in the parent are the parent's to write, and its
+        # flusher thread doesn't exist in the child
+        self._pending.clear()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Spill files
+    # -------------------------------------------------------------------------
+
+    def _spill(self, logs: List[AIUsageLog]):
+        """Write logs to a new spill file (written whole, then renamed into place)."""
+        name = f'usage-{os.getpid()}-{uuid.uuid4().hex}.jsonl'
+        tmp_path = self.spill_dir / f'.{name}.tmp'
+        try:
+            with self._spill_lock:
+                self.spill_dir.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, 'w') as f:
+                    for log in logs:
+                        f.write(log.to_json() + '\n')
+                os.replace(tmp_path, self.spill_dir / name)
+        except OSError as e:
+            logger.error(f"Failed to spill {len(logs)} AI usage logs to {self.spill_dir}, dropping them: {e}")
+
+    def _has_spills(self) -> bool:
+        try:
+            return any(self.spill_dir.glob('usage-*'))
+        except OSError:
+            return False
+
+    def _replay_spills(self) -> int:
+        """Write spilled logs back to the database; returns rows written."""
+        if not self.spill_dir.is_dir():
+            return 0
+
+        written = 0
+        now = time.time()
+        for path in sorted(self.spill_dir.glob('usage-*')):
+            name = path.name
+            if '.claimed-' in name:
+                # A replay that died mid-file; retake it once it's clearly abandoned
+                try:
+                    if now - path.stat().st_mtime < self.STALE_CLAIM_AGE:
+                        continue
+                except OSError:
+                    continue
+                name = name.split('.claimed-')[0]
+            elif not name.endswith('.jsonl'):
+                continue
+
+            claimed = path.with_name(f'{name}.claimed-{os.getpid()}')
+            try:
+                os.rename(path, claimed)
+                os.utime(claimed)
+            except OSError:
+                continue  # Another process claimed it first
+
+            try:
+                logs = self._read_spill(claimed)
+                self._write(logs)
+            except Exception as e:
+                logger.warning(f"Failed to replay AI usage spill file {name}: {e}")
+                try:
+                    os.rename(claimed, path.with_name(name))
+                except OSError:
+                    pass
+                break  # The database is likely still unavailable; retry next flush
+
+            claimed.unlink(missing_ok=True)
+            written += len(logs)
+            logger.info(f"Replayed {len(logs)} AI usage logs from {name}")
+        return written
+
+    def _read_spill(self, path: Path) -> List[AIUsageLog]:
+        logs = []
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                logs.append(AIUsageLog.from_json(line))
+        return logs
+
+
+usage_buffer = UsageLogBuffer()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=usage_buffer._after_fork)
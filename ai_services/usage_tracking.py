@@ -27,6 +27,9 @@ def log_ai_usage(
     """
     Log an AI API call to the AIUsageLog model.
 
+    The row is queued and written in a batch by a background thread, so
+    the caller never waits on (or joins a transaction with) the INSERT.
+
     Args:
         task_type: One of the operation types (e.g., 'content_venue_description')
         provider: Provider name ('anthropic', 'xai', 'openai')
@@ -41,13 +44,15 @@ def log_ai_usage(
         metadata: Additional context dict (venue_id, city_id, etc.)
 
     Returns:
-        AIUsageLog instance or None if logging failed
+        The AIUsageLog (unsaved until the usage buffer flushes it; see
+        ai_services.usage_buffer) or None if logging failed
     """
     # Don't fail the main operation if logging fails
     try:
         from ai_services.models import AIUsageLog
+        from ai_services.usage_buffer import usage_buffer
 
-        return AIUsageLog.log_usage(
+        log = AIUsageLog.build(
             task_type=task_type,
             provider=provider,
             model=model,
@@ -60,6 +65,8 @@ def log_ai_usage(
             error_message=error_message,
             metadata=metadata
         )
+        usage_buffer.add(log)
+        return log
     except Exception as e:
         # Log but don't raise - usage tracking should never break main functionality
         logger.warning(f"Failed to log AI usage: {e}")
@@ -195,40 +202,39 @@ class AIUsageTimer:
 
 def get_usage_summary(days: int = 30) -> dict:
     """
-    Get a summary of AI usage for the last N days.
+    Get a summary of AI usage for the last N days (today included).
+
+    Reads the daily rollups (see ai_services.rollups), not the raw logs.
 
     Returns:
         Dict with total_cost, total_calls, by_task_type, by_provider
     """
-    from django.utils import timezone
-    from django.db.models import Sum, Count
-    from datetime import timedelta
+    from django.db.models import Sum
     from decimal import Decimal
 
     try:
-        from ai_services.models import AIUsageLog
+        from ai_services.rollups import rollup_queryset
 
-        start_date = timezone.now() - timedelta(days=days)
-        usage_qs = AIUsageLog.objects.filter(created_at__gte=start_date)
+        usage_qs = rollup_queryset(days)
 
         # Summary stats
         summary = usage_qs.aggregate(
             total_cost=Sum('cost_usd'),
-            total_calls=Count('id'),
+            total_calls=Sum('calls'),
             total_tokens=Sum('total_tokens'),
         )
 
         # By task type
         by_task = list(
             usage_qs.values('task_type')
-            .annotate(cost=Sum('cost_usd'), count=Count('id'))
+            .annotate(cost=Sum('cost_usd'), count=Sum('calls'))
             .order_by('-cost')
         )
 
         # By provider
         by_provider = list(
             usage_qs.values('provider')
-            .annotate(cost=Sum('cost_usd'), count=Count('id'))
+            .annotate(cost=Sum('cost_usd'), count=Sum('calls'))
             .order_by('-cost')
         )
 
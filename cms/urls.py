@@ -31,6 +31,8 @@ from cms.views import (
     # Settings
     SettingsView, ToggleAPIView, UpdateAPISettingsView,
     SyncVenuesView, RefreshVenueView, SyncCityVenuesView,
+    # Background Jobs
+    JobStatusView, RecentJobsView,
     # Drive Destinations
     DriveDestinationListView, DriveDestinationCreateView,
     DriveDestinationUpdateView, DriveDestinationDeleteView,
@@ -63,6 +65,10 @@ urlpatterns = [
     path('venues/<int:pk>/refresh/', RefreshVenueView.as_view(), name='venue_refresh'),
     path('cities/<slug:slug>/sync/<str:venue_type>/', SyncCityVenuesView.as_view(), name='city_sync_venues'),
 
+    # Background Jobs
+    path('jobs/', RecentJobsView.as_view(), name='job_list'),
+    path('jobs/<int:pk>/', JobStatusView.as_view(), name='job_status'),
+
     # Cities
     path('cities/', CityListView.as_view(), name='city_list'),
     path('cities/<slug:slug>/', CityDetailView.as_view(), name='city_detail'),
@@ -22,6 +22,7 @@ from .settings import (
     SettingsView, ToggleAPIView, UpdateAPISettingsView,
     SyncVenuesView, RefreshVenueView, SyncCityVenuesView
 )
+from .jobs import JobStatusView, RecentJobsView
 from .drive_destinations import (
     DriveDestinationListView, DriveDestinationCreateView,
     DriveDestinationUpdateView, DriveDestinationDeleteView
@@ -11,14 +11,15 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
-from django.db.models import Sum, Count, Avg
-from django.db.models.functions import TruncDate
+from django.db.models import Sum
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, time
 from decimal import Decimal
 
+from core.pagination import keyset_page
 from .mixins import CMSAccessMixin
 from ai_services.models import AIProvider, AIModel, AIOperationConfig, AIUsageLog
+from ai_services.rollups import first_day, rollup_queryset
 
 
 class AICostReportView(CMSAccessMixin, TemplateView):
@@ -30,7 +31,7 @@ class AICostReportView(CMSAccessMixin, TemplateView):
     - Cost breakdown by task type
     - Cost breakdown by provider
     - Daily cost trend
-    - Recent usage log
+    - Recent usage log (keyset paged)
     """
     template_name = 'cms/ai/cost_report.html'
 
@@ -39,37 +40,41 @@ class AICostReportView(CMSAccessMixin, TemplateView):
 
         # Get date range from query params (default: last 30 days)
         days = int(self.request.GET.get('days', 30))
-        start_date = timezone.now() - timedelta(days=days)
 
-        usage_qs = AIUsageLog.objects.filter(created_at__gte=start_date)
+        # Totals come from the daily rollups: a few rows per day, so the
+        # report costs the same however many months of logs are kept
+        rollup_qs = rollup_queryset(days)
+        start_date = timezone.make_aware(datetime.combine(first_day(days), time.min))
 
         # Summary statistics
-        summary = usage_qs.aggregate(
+        summary = rollup_qs.aggregate(
             total_cost=Sum('cost_usd'),
-            total_calls=Count('id'),
+            total_calls=Sum('calls'),
+            total_errors=Sum('errors'),
             total_tokens=Sum('total_tokens'),
-            avg_response_time=Avg('response_time_ms'),
+            total_response_time=Sum('response_time_ms'),
         )
 
         # Handle None values
         summary['total_cost'] = summary['total_cost'] or Decimal('0')
         summary['total_calls'] = summary['total_calls'] or 0
         summary['total_tokens'] = summary['total_tokens'] or 0
-        summary['avg_response_time'] = int(summary['avg_response_time'] or 0)
 
-        # Calculate success rate
+        # Average response time and success rate
         if summary['total_calls'] > 0:
-            success_count = usage_qs.filter(success=True).count()
+            summary['avg_response_time'] = int((summary['total_response_time'] or 0) / summary['total_calls'])
+            success_count = summary['total_calls'] - (summary['total_errors'] or 0)
             summary['success_rate'] = round((success_count / summary['total_calls']) * 100, 1)
         else:
+            summary['avg_response_time'] = 0
             summary['success_rate'] = 100
 
         # Cost by task type
         cost_by_task = list(
-            usage_qs.values('task_type')
+            rollup_qs.values('task_type')
             .annotate(
                 cost=Sum('cost_usd'),
-                count=Count('id'),
+                count=Sum('calls'),
                 tokens=Sum('total_tokens')
             )
             .order_by('-cost')
@@ -77,10 +82,10 @@ class AICostReportView(CMSAccessMixin, TemplateView):
 
         # Cost by provider
         cost_by_provider = list(
-            usage_qs.values('provider')
+            rollup_qs.values('provider')
             .annotate(
                 cost=Sum('cost_usd'),
-                count=Count('id'),
+                count=Sum('calls'),
                 tokens=Sum('total_tokens')
             )
             .order_by('-cost')
@@ -88,14 +93,17 @@ class AICostReportView(CMSAccessMixin, TemplateView):
 
         # Daily cost trend (for chart)
         daily_cost = list(
-            usage_qs.annotate(date=TruncDate('created_at'))
-            .values('date')
-            .annotate(cost=Sum('cost_usd'), count=Count('id'))
+            rollup_qs.values('date')
+            .annotate(cost=Sum('cost_usd'), count=Sum('calls'))
             .order_by('date')
         )
 
-        # Recent usage log (last 50 entries)
-        recent_usage = usage_qs.select_related('user').order_by('-created_at')[:50]
+        # Recent usage log, 50 at a time: keyset paging on the pk
+        # (?before=<id>), so older pages cost the same as the first
+        recent_page = keyset_page(
+            AIUsageLog.objects.filter(created_at__gte=start_date).select_related('user'),
+            before=self.request.GET.get('before'),
+        )
 
         # Task type labels for display
         task_type_labels = dict(AIUsageLog.TASK_TYPE_CHOICES)
@@ -109,7 +117,9 @@ class AICostReportView(CMSAccessMixin, TemplateView):
                 {'date': d['date'].isoformat(), 'cost': float(d['cost'] or 0)}
                 for d in daily_cost
             ]),
-            'recent_usage': recent_usage,
+            'recent_usage': recent_page.items,
+            'recent_next_cursor': recent_page.next_cursor,
+            'recent_is_first_page': not self.request.GET.get('before'),
             'task_type_labels': task_type_labels,
             'days': days,
             'start_date': start_date,
@@ -7,11 +7,8 @@ Main landing page for the CMS with content statistics.
 from django.views.generic import TemplateView
 from django.db.models import Count
 
-from guide.models import (
-    Region, City, Venue, MilitaryBase, Tunnel,
-    VacationDestination, VendorUtility, Testimonial, TeamMember
-)
-from guide.services import VenueEnrichmentService
+from guide.models import City, Venue, Testimonial
+from guide.services import VenueEnrichmentService, stats_service
 from .mixins import CMSAccessMixin
 
 
@@ -24,30 +21,30 @@ class DashboardView(CMSAccessMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Content counts
+        # Content counts (cached snapshot, invalidated on content changes)
+        snapshot = stats_service.snapshot()
+        content = snapshot['content']
         context['stats'] = {
-            'cities': City.objects.count(),
-            'cities_published': City.objects.filter(is_published=True).count(),
-            'venues': Venue.objects.count(),
-            'venues_published': Venue.objects.filter(is_published=True).count(),
-            'military_bases': MilitaryBase.objects.count(),
-            'tunnels': Tunnel.objects.count(),
-            'destinations': VacationDestination.objects.count(),
-            'testimonials': Testimonial.objects.count(),
-            'team_members': TeamMember.objects.count(),
+            'cities': content['cities']['total'],
+            'cities_published': content['cities']['published'],
+            'venues': snapshot['venues']['total'],
+            'venues_published': snapshot['venues']['published'],
+            'military_bases': content['military_bases']['total'],
+            'tunnels': content['tunnels']['total'],
+            'destinations': content['destinations']['total'],
+            'testimonials': content['testimonials']['total'],
+            'team_members': content['team_members']['total'],
         }
 
         # Venue breakdown by type
-        context['venue_counts'] = Venue.objects.values('venue_type').annotate(
-            count=Count('id')
-        ).order_by('venue_type')
+        context['venue_counts'] = snapshot['venue_counts']
 
         # Recent updates
-        context['recent_venues'] = Venue.objects.order_by('-updated_at')[:5]
+        context['recent_venues'] = Venue.objects.select_related('city').order_by('-updated_at')[:5]
         context['recent_testimonials'] = Testimonial.objects.order_by('-updated_at')[:3]
 
         # Cities with venue counts
-        context['cities_summary'] = City.objects.annotate(
+        context['cities_summary'] = City.objects.select_related('region').annotate(
             venue_count=Count('venues')
         ).order_by('region__order', 'order')[:5]
 
@@ -0,0 +1,45 @@
+"""
+CMS Background Job Views
+
+HTMX endpoints for watching queued jobs (venue syncs, refreshes, pulse
+regeneration) while `manage.py run_worker` runs them.
+"""
+
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+from django.views import View
+
+from core.models import Job
+from .mixins import CMSAccessMixin
+
+
+class JobStatusView(CMSAccessMixin, View):
+    """
+    HTMX endpoint with one job's progress.
+
+    The fragment re-polls itself while the job is active. When it isn't,
+    the response fires a `jobFinished` event so the page can reload.
+    """
+    def get(self, request, pk):
+        job = get_object_or_404(Job, pk=pk)
+        html = render_to_string('cms/components/job_status.html', {'job': job}, request=request)
+        response = HttpResponse(html)
+        if not job.is_active:
+            response['HX-Trigger'] = 'jobFinished'
+        return response
+
+
+class RecentJobsView(CMSAccessMixin, View):
+    """
+    HTMX endpoint listing recent jobs, polling while any are active.
+    """
+    LIMIT = 8
+
+    def get(self, request):
+        jobs = list(Job.objects.all()[:self.LIMIT])
+        html = render_to_string('cms/components/job_list.html', {
+            'jobs': jobs,
+            'any_active': any(job.is_active for job in jobs),
+        }, request=request)
+        return HttpResponse(html)
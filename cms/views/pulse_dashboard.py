@@ -11,8 +11,10 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods, require_POST
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
+from django.urls import reverse
 from django.utils import timezone
 
+from core.jobs import enqueue
 from .mixins import CMSAccessMixin
 from guide.models import PulseContent
 from guide.services.pulse_service import pulse_service
@@ -159,38 +161,27 @@ class PulseDashboardView(CMSAccessMixin, TemplateView):
 @require_POST
 def api_pulse_refresh(request):
     """
-    API endpoint to manually refresh pulse content.
+    API endpoint to queue a pulse content refresh.
+
+    The refresh runs in the background worker; the response includes a
+    status_url the dashboard polls (HTMX) for progress.
     """
     content_type = request.POST.get('content_type')  # 'trends', 'headlines', or None for both
-
-    try:
-        if content_type and content_type in ['trends', 'headlines']:
-            result = pulse_service.force_refresh(content_type)
-        else:
-            result = pulse_service.force_refresh()
-
-        success_count = sum(1 for v in result.values() if v == 'success')
-        fail_count = sum(1 for v in result.values() if v == 'failed')
-
-        if fail_count == 0:
-            return JsonResponse({
-                'success': True,
-                'message': f'Successfully refreshed {success_count} content type(s)',
-                'result': result,
-            })
-        else:
-            return JsonResponse({
-                'success': True,
-                'message': f'Refreshed with {fail_count} failure(s)',
-                'result': result,
-            })
-
-    except Exception as e:
-        logger.error(f"Error refreshing pulse: {e}")
-        return JsonResponse({
-            'success': False,
-            'error': str(e),
-        }, status=500)
+    if content_type not in ['trends', 'headlines']:
+        content_type = None
+
+    job = enqueue(
+        'guide.refresh_pulse',
+        {'content_type': content_type},
+        label=f"Refresh pulse {content_type or 'trends and headlines'}",
+        user=request.user,
+    )
+    return JsonResponse({
+        'success': True,
+        'message': 'Refresh queued',
+        'job_id': job.pk,
+        'status_url': reverse('cms:job_status', kwargs={'pk': job.pk}),
+    })
 
 
 @login_required
@@ -10,9 +10,9 @@ import os
 from django.contrib import messages
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
-from django.utils import timezone
 from django.views.generic import TemplateView, View
 
+from core.jobs import enqueue
 from guide.models import City, Venue, VenueAPIConfig
 from guide.services import VenueEnrichmentService
 from .mixins import CMSAccessMixin
@@ -62,7 +62,7 @@ class ToggleAPIView(CMSAccessMixin, View):
         config = VenueAPIConfig.objects.filter(provider=provider).first()
         if config:
             config.is_enabled = not config.is_enabled
-            config.save()
+            config.save(update_fields=['is_enabled', 'updated_at'])
             status = "enabled" if config.is_enabled else "disabled"
             messages.success(request, f"{config.get_provider_display()} API {status}.")
         else:
@@ -88,7 +88,7 @@ class UpdateAPISettingsView(CMSAccessMixin, View):
 
             config.daily_quota = max(100, min(100000, daily_quota))
             config.venues_per_city = max(5, min(100, venues_per_city))
-            config.save()
+            config.save(update_fields=['daily_quota', 'venues_per_city', 'updated_at'])
 
             messages.success(request, "Settings updated successfully.")
         except (ValueError, TypeError):
@@ -99,7 +99,7 @@ class UpdateAPISettingsView(CMSAccessMixin, View):
 
 class SyncVenuesView(CMSAccessMixin, View):
     """
-    Trigger venue sync for a single city.
+    Queue a venue sync for a single city (run by `manage.py run_worker`).
     For bulk syncs, use: python manage.py enrich_venues --all
     """
 
@@ -128,35 +128,21 @@ class SyncVenuesView(CMSAccessMixin, View):
             messages.error(request, f"City not found: {city_slug}")
             return redirect('cms:settings')
 
-        # Sync single city
-        results = service.match_and_enrich_city(city)
-        total_matched = results['matched']
-        total_added = 0
-
-        # Discover new if requested
-        if discover:
-            discover_results = service.discover_new_venues(
-                city,
-                limit=service.config.venues_per_city if service.config else 20
-            )
-            total_added = discover_results.get('added', 0)
-
-        # Update last sync time
-        if service.config:
-            service.config.last_full_sync = timezone.now()
-            service.config.save()
-
-        msg = f"Sync complete for {city.name}: {total_matched} venues enriched"
-        if discover:
-            msg += f", {total_added} new venues discovered"
-        messages.success(request, msg)
+        # Sync single city in the background
+        enqueue(
+            'guide.sync_city',
+            {'city_slug': city.slug, 'discover': discover, 'provider': provider, 'mark_full_sync': True},
+            label=f"Sync {city.name} venues" + (" + discover" if discover else ""),
+            user=request.user,
+        )
+        messages.info(request, f"Sync queued for {city.name}. Progress is shown under Background Jobs.")
 
         return redirect('cms:settings')
 
 
 class RefreshVenueView(CMSAccessMixin, View):
     """
-    Refresh a single venue from the API.
+    Queue a refresh of a single venue from the API.
     """
 
     def post(self, request, pk):
@@ -172,15 +158,14 @@ class RefreshVenueView(CMSAccessMixin, View):
             messages.error(request, "API provider is not enabled or out of quota.")
             return redirect('cms:city_detail', slug=venue.city.slug)
 
-        if venue.google_place_id:
-            success, message = service.refresh_venue(venue)
-        else:
-            success, message = service.match_and_enrich_venue(venue)
-
-        if success:
-            messages.success(request, f"Venue '{venue.name}' refreshed successfully.")
-        else:
-            messages.warning(request, f"Could not refresh venue: {message}")
+        enqueue(
+            'guide.refresh_venue',
+            {'venue_id': venue.pk},
+            label=f"Refresh {venue.name}",
+            user=request.user,
+            priority=10,  # single venue; quick and someone is waiting on it
+        )
+        messages.info(request, f"Refresh queued for '{venue.name}'.")
 
         # Redirect back to city detail
         return redirect(f"{reverse_lazy('cms:city_detail', kwargs={'slug': venue.city.slug})}?tab={self._get_tab_for_venue(venue)}")
@@ -199,7 +184,7 @@ class RefreshVenueView(CMSAccessMixin, View):
 
 class SyncCityVenuesView(CMSAccessMixin, View):
     """
-    Sync all venues of a type for a specific city.
+    Queue a sync of all venues of a type for a specific city.
     """
 
     def post(self, request, slug, venue_type):
@@ -215,26 +200,15 @@ class SyncCityVenuesView(CMSAccessMixin, View):
             messages.error(request, "API provider is not enabled or out of quota.")
             return redirect('cms:city_detail', slug=slug)
 
-        # Match and enrich
-        results = service.match_and_enrich_city(
-            city,
-            venue_types=[venue_type]
-        )
-
-        # Also discover if requested
+        # Match and enrich (and discover if requested) in the background
         discover = request.POST.get('discover') == 'on'
-        if discover:
-            discover_results = service.discover_new_venues(
-                city,
-                venue_types=[venue_type],
-                limit=service.config.venues_per_city if service.config else 20
-            )
-            messages.success(
-                request,
-                f"Synced {results['matched']} venues, discovered {discover_results.get('added', 0)} new."
-            )
-        else:
-            messages.success(request, f"Synced {results['matched']} venues.")
+        enqueue(
+            'guide.sync_city',
+            {'city_slug': slug, 'venue_types': [venue_type], 'discover': discover},
+            label=f"Sync {city.name} {venue_type} venues" + (" + discover" if discover else ""),
+            user=request.user,
+        )
+        messages.info(request, f"Sync queued for {city.name}.")
 
         tab_map = {
             'restaurant': 'restaurants',
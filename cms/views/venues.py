@@ -11,6 +11,7 @@ from django.http import JsonResponse, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.template.loader import render_to_string
+from django.utils import timezone
 
 from guide.models import City, Venue
 from .mixins import CMSAccessMixin
@@ -138,9 +139,11 @@ class VenueReorderView(CMSAccessMixin, View):
         try:
             data = json.loads(request.body)
             venue_ids = data.get('order', [])
+            now = timezone.now()
 
             for index, venue_id in enumerate(venue_ids):
-                Venue.objects.filter(pk=venue_id).update(order=index)
+                # updated_at moves so delta content syncs pick up the new order
+                Venue.objects.filter(pk=venue_id).update(order=index, updated_at=now)
 
             return JsonResponse({'success': True})
         except (json.JSONDecodeError, KeyError):
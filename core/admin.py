@@ -1,3 +1,15 @@
+"""
+Django Admin registration for Core models.
+"""
+
 from django.contrib import admin
+from .models import Job
+
 
-# Register your models here.
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['label', 'task', 'status', 'attempts', 'progress_percent', 'created_at', 'finished_at']
+    list_filter = ['status', 'task']
+    search_fields = ['label', 'task']
+    readonly_fields = ['locked_by', 'lease_expires_at', 'started_at', 'finished_at', 'created_by']
+    ordering = ['-created_at']
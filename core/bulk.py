@@ -0,0 +1,206 @@
+"""
+Bulk Upserts
+
+Insert-or-update batches of unsaved model instances matched on a natural
+key, in O(batches) queries instead of one update_or_create per row.
+
+    from core.bulk import upsert
+
+    created, updated = upsert(City, cities, unique_fields=['slug'],
+                              update_fields=['name', 'region', 'is_published'])
+
+When the natural key is backed by a unique constraint the batch is one
+INSERT ... ON CONFLICT DO UPDATE (bulk_create(update_conflicts=True));
+otherwise existing rows are looked up by key and written with
+bulk_update, the rest with bulk_create. Either way one query per batch
+first fetches the existing rows' keys and update_fields; rows whose
+fields already hold the new values aren't written at all, so re-running
+a seed leaves updated_at alone.
+
+Like every bulk write, no save() or model signals run.
+"""
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from django.db import models
+from django.utils import timezone
+
+
+def has_unique_constraint(model, field_names: Sequence[str]) -> bool:
+    """True if the model has a unique constraint on exactly these fields."""
+    wanted = set(field_names)
+    opts = model._meta
+    if len(wanted) == 1:
+        field = opts.get_field(next(iter(wanted)))
+        if field.unique:
+            return True
+    for fields in opts.unique_together:
+        if set(fields) == wanted:
+            return True
+    for constraint in opts.total_unique_constraints:
+        if set(constraint.fields) == wanted:
+            return True
+    return False
+
+
+def _auto_now_fields(model) -> List[str]:
+    return [
+        f.name for f in model._meta.concrete_fields
+        if isinstance(f, (models.DateField, models.DateTimeField)) and getattr(f, 'auto_now', False)
+    ]
+
+
+def existing_keys(model, unique_fields: Sequence[str], objs: Iterable[models.Model]) -> Dict[tuple, object]:
+    """
+    Map natural key -> pk for rows matching the given instances.
+
+    Filters on the first key field with __in and matches the full key in
+    Python, so put the most selective field first.
+    """
+    attnames = [model._meta.get_field(name).attname for name in unique_fields]
+    first_values = {getattr(obj, attnames[0]) for obj in objs}
+    if not first_values:
+        return {}
+    rows = model._default_manager.order_by().filter(
+        **{f'{attnames[0]}__in': first_values}
+    ).values_list('pk', *attnames)
+    return {tuple(row[1:]): row[0] for row in rows}
+
+
+def _existing_rows(
+    model, unique_fields: Sequence[str], objs: List[models.Model], attnames: Sequence[str]
+) -> Dict[tuple, Tuple[object, tuple]]:
+    """Map natural key -> (pk, values of attnames) for rows matching objs."""
+    key_attnames = [model._meta.get_field(name).attname for name in unique_fields]
+    first_values = {getattr(obj, key_attnames[0]) for obj in objs}
+    if not first_values:
+        return {}
+    rows = model._default_manager.order_by().filter(
+        **{f'{key_attnames[0]}__in': first_values}
+    ).values_list('pk', *key_attnames, *attnames)
+    width = len(key_attnames) + 1
+    return {tuple(row[1:width]): (row[0], tuple(row[width:])) for row in rows}
+
+
+def _field_values(obj, fields: Sequence[models.Field]) -> tuple:
+    """obj's values for fields, coerced as they come back from the database."""
+    values = []
+    for field in fields:
+        value = getattr(obj, field.attname)
+        if value is not None and not field.is_relation:
+            value = field.to_python(value)
+        values.append(value)
+    return tuple(values)
+
+
+def upsert(
+    model,
+    objs: List[models.Model],
+    unique_fields: Sequence[str],
+    update_fields: Sequence[str],
+    batch_size: int = 500
+) -> Tuple[int, int]:
+    """
+    Insert or update objs, matching existing rows on unique_fields.
+
+    Existing rows whose update_fields already match are left untouched
+    (and not counted as updated).
+
+    Args:
+        model: Model class
+        objs: Unsaved instances (pk not set)
+        unique_fields: Natural key field names (most selective first)
+        update_fields: Fields overwritten on existing rows; auto_now
+            fields (updated_at) are added automatically
+        batch_size: Rows per query
+
+    Returns:
+        (created, updated) counts
+    """
+    if not objs:
+        return 0, 0
+
+    attnames = [model._meta.get_field(name).attname for name in unique_fields]
+    auto_now = _auto_now_fields(model)
+    compared = [
+        model._meta.get_field(name) for name in dict.fromkeys(update_fields)
+        if name not in unique_fields and name not in auto_now
+    ]
+    update_fields = list(dict.fromkeys([*update_fields, *auto_now]))
+    fields = [f for f in update_fields if f not in unique_fields]
+    on_conflict = has_unique_constraint(model, unique_fields)
+
+    created = updated = 0
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        existing = _existing_rows(model, unique_fields, batch, [f.attname for f in compared])
+        to_update, to_create = [], []
+        for obj in batch:
+            row = existing.get(tuple(getattr(obj, name) for name in attnames))
+            if row is None:
+                to_create.append(obj)
+            elif row[1] != _field_values(obj, compared):
+                to_update.append((obj, row[0]))
+        created += len(to_create)
+        updated += len(to_update)
+
+        if on_conflict:
+            changed = to_create + [obj for obj, _ in to_update]
+            if changed and fields:
+                model._default_manager.bulk_create(
+                    changed, update_conflicts=True,
+                    unique_fields=list(unique_fields), update_fields=fields,
+                )
+            elif to_create:
+                model._default_manager.bulk_create(to_create, ignore_conflicts=True)
+            continue
+
+        if to_update and fields:
+            now = timezone.now()
+            for obj, pk in to_update:
+                obj.pk = pk
+                for name in auto_now:
+                    setattr(obj, name, now)
+            model._default_manager.bulk_update([obj for obj, _ in to_update], fields)
+        if to_create:
+            model._default_manager.bulk_create(to_create)
+
+    return created, updated
+
+
+def upsert_rows(
+    model,
+    rows: Iterable[dict],
+    unique_fields: Sequence[str],
+    batch_size: int = 500
+) -> Tuple[int, int]:
+    """
+    upsert() for field dicts, e.g. seed data.
+
+    Each row overwrites only the fields it names, so fields set elsewhere
+    (API enrichment, CMS edits) survive when a row leaves them out. Rows
+    repeating a natural key collapse into the last one.
+
+    Returns:
+        (created, updated) counts
+    """
+    attnames = [model._meta.get_field(name).attname for name in unique_fields]
+    unique = {}
+    for row in rows:
+        obj = model(**row)
+        unique[tuple(getattr(obj, name) for name in attnames)] = (obj, frozenset(row))
+
+    groups: Dict[frozenset, List[models.Model]] = {}
+    for obj, fields in unique.values():
+        groups.setdefault(fields, []).append(obj)
+
+    created = updated = 0
+    for fields, objs in groups.items():
+        group_created, group_updated = upsert(
+            model, objs, unique_fields,
+            update_fields=sorted(fields - set(unique_fields)),
+            batch_size=batch_size,
+        )
+        created += group_created
+        updated += group_updated
+    return created, updated
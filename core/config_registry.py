@@ -0,0 +1,110 @@
+"""
+Config Registry
+
+In-process copies of small, rarely edited configuration tables
+(AIOperationConfig, VenueAPIConfig), so hot paths that call an AI model or
+the Places API stop querying them on every call.
+
+A registry loads its whole table with one loader call and serves lookups
+from memory. Writers call invalidate(), which bumps a version stamp in the
+cache (the registry's watched models do this from post_save/post_delete,
+after the transaction commits). Every process re-reads the stamp at most
+every CHECK_INTERVAL seconds and reloads when it moved, so a CMS edit
+reaches all workers within seconds. With a per-process cache backend
+(locmem) the stamp only reaches the process that bumped it; MAX_AGE
+bounds staleness for the others and for writes that skip signals
+(queryset.update(), bulk writes that don't call invalidate()).
+
+Usage:
+    operation_configs = ConfigRegistry('ai_operation_configs', load_operation_configs,
+                                       watched_models=(AIOperationConfig, AIModel, AIProvider))
+
+    config = operation_configs.get('research_events')
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigRegistry:
+    """A table loaded once per process, reloaded when its version stamp moves."""
+
+    CHECK_INTERVAL = 5  # seconds between version stamp reads
+    MAX_AGE = 60 * 5  # seconds; reload even if the stamp never moved
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[], Dict[Any, Any]],
+        watched_models: Iterable = ()
+    ):
+        """
+        Args:
+            name: Registry name, used in the version stamp's cache key
+            loader: Returns the whole table as a dict (runs the queries)
+            watched_models: Models whose saves and deletes invalidate the
+                registry, once connect() is called
+        """
+        self.name = name
+        self.loader = loader
+        self.watched_models = tuple(watched_models)
+        self.version_key = f'config_registry:{name}:version'
+
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[Any, Any]] = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._next_check = 0.0
+
+    def all(self) -> Dict[Any, Any]:
+        """The whole table (shared; don't mutate)."""
+        now = time.monotonic()
+        data = self._data
+        if data is not None and now < self._next_check:
+            return data
+
+        with self._lock:
+            version = cache.get(self.version_key)
+            if (self._data is None or version != self._version
+                    or now - self._loaded_at > self.MAX_AGE):
+                # Read the stamp before loading: a bump during the load
+                # leaves us on the old stamp, so the next check reloads
+                self._data = self.loader()
+                self._version = version
+                self._loaded_at = now
+                logger.debug(f"Loaded config registry {self.name}: {len(self._data)} entries")
+            self._next_check = now + self.CHECK_INTERVAL
+            return self._data
+
+    def get(self, key, default=None):
+        return self.all().get(key, default)
+
+    def invalidate(self):
+        """Reload in this process now and in every other on its next check."""
+        cache.set(self.version_key, uuid.uuid4().hex, None)
+        with self._lock:
+            self._data = None
+
+    def _on_change(self, sender, **kwargs):
+        # Other processes must not reload before the change is visible to them
+        transaction.on_commit(self.invalidate)
+
+    def connect(self):
+        """Invalidate on post_save/post_delete of the watched models."""
+        for model in self.watched_models:
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    self._on_change,
+                    sender=model,
+                    weak=False,
+                    dispatch_uid=f'config_registry_{self.name}_{model._meta.label_lower}_{signal is post_save}',
+                )
@@ -0,0 +1,367 @@
+"""
+HTTP Client
+
+Shared outbound HTTP client. Every external call (Google Places, Yelp,
+Open-Meteo, RSS feeds, the photo proxy) goes through one requests.Session
+per host, so connections are kept alive and reused across calls and
+threads instead of re-handshaking TLS on every request.
+
+Provides:
+- Per-host connection pools
+- Named retry policies with jittered exponential backoff
+- Deadline propagation: `with deadline(5): ...` caps the timeout of every
+  request made inside the block (including nested calls and retries)
+- Per-host request/error/retry counters and latency percentiles, plus
+  listeners for instrumentation
+
+Metrics are per process and in memory.
+
+Usage:
+    from core.http_client import http_client, deadline
+
+    with deadline(10):
+        response = http_client.get(url, params=params, timeout=5)
+"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+def can_resend(method: str, error: Optional[Exception]) -> bool:
+    """
+    Whether a request that failed with a connection error/timeout may be sent again.
+
+    A non-idempotent request that may have reached the server could
+    already have been done (and billed), so only a failed connect is safe.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return False
+    return (method.upper() in IDEMPOTENT_METHODS
+            or isinstance(error, requests.exceptions.ConnectTimeout))
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a request.
+
+    Retries are done by HTTPClient rather than urllib3 so every attempt
+    and every backoff sleep stays inside the current deadline. A
+    non-idempotent request (POST) that may have reached the server - a
+    read timeout or a dropped connection - is never retried, since the
+    server may already have done (and billed) it; it is retried only if
+    the connection was never made.
+    """
+
+    def __init__(
+        self,
+        retries: int,
+        statuses=(),
+        methods=('GET', 'HEAD'),
+        backoff: float = 0.5,
+        max_backoff: float = 10.0
+    ):
+        """
+        Args:
+            retries: Retries after the first attempt
+            statuses: Response statuses worth retrying
+            methods: Methods safe to retry
+            backoff: Base delay in seconds, doubled each retry
+            max_backoff: Cap on a single delay
+        """
+        self.retries = retries
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        status: Optional[int] = None,
+        error: Optional[Exception] = None
+    ) -> bool:
+        """Retry after a failed attempt (status None = connection error/timeout)?"""
+        method = method.upper()
+        if attempt >= self.retries or method not in self.methods:
+            return False
+        if status is None:
+            return can_resend(method, error)
+        return status in self.statuses
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Jittered exponential backoff, or the server's Retry-After if it gave one."""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return min(self.max_backoff, self.backoff * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+
+# Both real policies retry connection failures, timeouts and gateway
+# errors. 'api' leaves 429/503 to the caller, whose rate limiter backs
+# off across processes, and allows POST because the provider search
+# endpoints we POST to are read-only - but they're paid per call, so a
+# POST that timed out after being sent isn't repeated (see RetryPolicy).
+RETRY_POLICIES = {
+    'default': RetryPolicy(retries=2, statuses=(502, 503, 504)),
+    'api': RetryPolicy(retries=2, statuses=(502, 504), methods=('GET', 'HEAD', 'POST')),
+    'none': RetryPolicy(retries=0),
+}
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('http_deadline', default=None)
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The enclosing deadline() expired before an attempt could start."""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Bound the total time of the HTTP calls made inside the block.
+
+    Nested deadlines keep the earlier one. Context variables don't follow
+    work into thread pools on their own; submit with
+    contextvars.copy_context().run to carry the deadline along.
+    """
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left on the current deadline, or None if there isn't one."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+class HostMetrics:
+    """Counters and recent latencies for one host."""
+
+    SAMPLE_SIZE = 500
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.statuses: Dict[int, int] = {}
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples = deque(maxlen=self.SAMPLE_SIZE)
+
+    def record(self, elapsed: float, status: Optional[int], retries: int, error: bool):
+        self.requests += 1
+        self.retries += retries
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        self.samples.append(elapsed)
+        if status is not None:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        if error:
+            self.errors += 1
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'statuses': dict(self.statuses),
+            'avg_ms': round(self.total_seconds / self.requests * 1000, 1) if self.requests else 0.0,
+            'p50_ms': round(self.percentile(50) * 1000, 1),
+            'p95_ms': round(self.percentile(95) * 1000, 1),
+            'max_ms': round(self.max_seconds * 1000, 1),
+        }
+
+
+class HTTPClient:
+    """
+    Pooled, instrumented requests wrapper.
+
+    Raises the usual requests exceptions, so callers keep their existing
+    `except requests.exceptions.RequestException` handling. A response is
+    counted as an error if it's 4xx/5xx or the request raised.
+    """
+
+    DEFAULT_TIMEOUT = 10  # seconds
+    POOL_MAXSIZE = 16  # connections kept per host (one per concurrent worker)
+    USER_AGENT = 'abouthr/1.0 (+https://abouthr.com)'
+
+    def __init__(self):
+        self._sessions: Dict[str, requests.Session] = {}
+        self._metrics: Dict[str, HostMetrics] = {}
+        self._listeners: List[Callable[..., None]] = []
+        self._lock = threading.Lock()
+
+    def _session(self, host: str) -> requests.Session:
+        """Session for a host, created on first use."""
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    session.headers['User-Agent'] = self.USER_AGENT
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.POOL_MAXSIZE)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._sessions[host] = session
+        return session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        retry: str = 'default',
+        **kwargs
+    ) -> requests.Response:
+        """
+        Send a request through the host's pool.
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            timeout: Seconds per attempt (default DEFAULT_TIMEOUT), capped
+                by the remaining deadline
+            retry: Name of a RETRY_POLICIES entry
+            **kwargs: Passed to requests (params, json, headers, ...)
+
+        Raises:
+            requests.exceptions.RequestException: after the last attempt
+                fails (DeadlineExceeded once the deadline has passed)
+        """
+        if retry not in RETRY_POLICIES:
+            raise ValueError(f"Unknown retry policy: {retry}")
+        policy = RETRY_POLICIES[retry]
+        host = urlsplit(url).netloc
+        session = self._session(host)
+        timeout = timeout or self.DEFAULT_TIMEOUT
+        start = time.monotonic()
+
+        attempt = 0
+        while True:
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                error = DeadlineExceeded(f"Deadline exceeded before {method} {host}")
+                self._record(host, method, time.monotonic() - start, None, attempt, error)
+                raise error
+            attempt_timeout = timeout if remaining is None else min(timeout, remaining)
+
+            try:
+                response = session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not self._sleep_before_retry(policy, method, attempt, None, e):
+                    self._record(host, method, time.monotonic() - start, None, attempt, e)
+                    raise
+            except requests.exceptions.RequestException as e:
+                self._record(host, method, time.monotonic() - start, None, attempt, e)
+                raise
+            else:
+                if (response.status_code not in policy.statuses
+                        or not self._sleep_before_retry(policy, method, attempt, response)):
+                    self._record(host, method, time.monotonic() - start, response.status_code, attempt, None)
+                    return response
+                response.close()
+            attempt += 1
+
+    @staticmethod
+    def _sleep_before_retry(
+        policy: RetryPolicy,
+        method: str,
+        attempt: int,
+        response: Optional[requests.Response],
+        error: Optional[Exception] = None
+    ) -> bool:
+        """Back off if another attempt is allowed and fits the deadline."""
+        status = response.status_code if response is not None else None
+        if not policy.should_retry(method, attempt, status, error):
+            return False
+        delay = policy.delay(attempt, response)
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            return False
+        time.sleep(delay)
+        return True
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def _record(
+        self,
+        host: str,
+        method: str,
+        elapsed: float,
+        status: Optional[int],
+        retries: int,
+        error: Optional[Exception]
+    ):
+        failed = error is not None or (status is not None and status >= 400)
+        with self._lock:
+            metrics = self._metrics.setdefault(host, HostMetrics())
+            metrics.record(elapsed, status, retries, failed)
+            listeners = list(self._listeners)
+
+        logger.debug(
+            f"{method} {host} -> {status or type(error).__name__} "
+            f"in {elapsed * 1000:.0f}ms" + (f" ({retries} retries)" if retries else "")
+        )
+        for listener in listeners:
+            try:
+                listener(host=host, method=method, status=status, elapsed=elapsed,
+                         retries=retries, error=error)
+            except Exception as e:
+                logger.warning(f"HTTP metrics listener failed: {e}")
+
+    def add_listener(self, listener: Callable[..., None]):
+        """
+        Call listener(host=, method=, status=, elapsed=, retries=, error=)
+        after every request.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[..., None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of per-host metrics."""
+        with self._lock:
+            return {host: metrics.as_dict() for host, metrics in self._metrics.items()}
+
+    def reset_metrics(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+# Process-wide client
+http_client = HTTPClient()
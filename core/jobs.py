@@ -0,0 +1,251 @@
+"""
+Background Jobs
+
+Database-backed job queue. The CMS enqueues long-running work and returns
+immediately; `python manage.py run_worker` claims and runs it.
+
+Tasks are plain functions registered by name, in a `tasks.py` module of
+any installed app (found with autodiscovery):
+
+    from core.jobs import task
+
+    @task('guide.sync_city')
+    def sync_city(job, city_slug, discover=False):
+        job.progress(0, 2, "Matching venues")
+        ...
+        return {'matched': 12}
+
+and queued with:
+
+    from core.jobs import enqueue
+    job = enqueue('guide.sync_city', {'city_slug': 'norfolk'}, label="Sync Norfolk")
+
+Claims are conditional UPDATEs (status/lease checked in the WHERE clause),
+so any number of workers can poll the same table safely on every backend.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS: Dict[str, Callable[..., Any]] = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a task for failures a retry won't fix (bad input, API disabled)."""
+
+
+def task(name: str):
+    """Register a function as a job task under `name`."""
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(
+    task_name: str,
+    payload: Optional[Dict[str, Any]] = None,
+    label: str = '',
+    user=None,
+    priority: int = 0,
+    max_attempts: int = 3,
+    dedupe: bool = True
+) -> Job:
+    """
+    Queue a job.
+
+    Args:
+        task_name: Registered task name
+        payload: JSON-serializable keyword arguments for the task
+        label: Description shown in the CMS
+        user: User who queued it (optional)
+        priority: Higher runs first
+        max_attempts: Total attempts before the job is marked failed
+        dedupe: Return the existing job if the same task and payload is
+            already queued or running (e.g. a double-clicked button)
+    """
+    payload = payload or {}
+    dedupe_key = ''
+    if dedupe:
+        dedupe_key = hashlib.sha256(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        existing = _active_job(task_name, dedupe_key)
+        if existing:
+            return existing
+
+    try:
+        # The partial unique constraint on (task, dedupe_key) settles two
+        # enqueues racing past the check above
+        with transaction.atomic():
+            return Job.objects.create(
+                task=task_name,
+                payload=payload,
+                dedupe_key=dedupe_key,
+                label=label or task_name,
+                priority=priority,
+                max_attempts=max_attempts,
+                run_after=timezone.now(),
+                created_by=user if user is not None and user.is_authenticated else None,
+            )
+    except IntegrityError:
+        existing = _active_job(task_name, dedupe_key) if dedupe else None
+        if existing is None:
+            raise
+        return existing
+
+
+def _active_job(task_name: str, dedupe_key: str) -> Optional[Job]:
+    return Job.objects.filter(
+        task=task_name, dedupe_key=dedupe_key, status__in=Job.ACTIVE_STATUSES
+    ).first()
+
+
+class JobContext:
+    """Handle passed to a running task for reporting progress."""
+
+    def __init__(self, job: Job, worker: 'Worker'):
+        self.job = job
+        self.worker = worker
+
+    @property
+    def id(self) -> int:
+        return self.job.pk
+
+    def progress(self, current: int, total: Optional[int] = None, message: Optional[str] = None):
+        """Record progress (also extends the lease)."""
+        fields = {'progress_current': current}
+        if total is not None:
+            fields['progress_total'] = total
+        if message is not None:
+            fields['progress_message'] = message[:255]
+        self.worker.extend_lease(self.job, **fields)
+
+
+class Worker:
+    """
+    Claims and runs queued jobs.
+
+    A heartbeat thread extends the lease of the running job every
+    LEASE_SECONDS / 3, so a lease only lapses when the worker process is
+    gone. Jobs whose lease lapsed are claimed again like queued ones (the
+    interrupted run counts as an attempt).
+    """
+
+    LEASE_SECONDS = 120
+    RETRY_BACKOFF_SECONDS = 30  # doubled per attempt
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        autodiscover_modules('tasks')
+
+    def _lease_expiry(self):
+        return timezone.now() + timedelta(seconds=self.LEASE_SECONDS)
+
+    def claim(self) -> Optional[Job]:
+        """Claim the next runnable job, or None if there isn't one."""
+        now = timezone.now()
+        runnable = Q(status='queued', run_after__lte=now) | Q(status='running', lease_expires_at__lt=now)
+        candidates = Job.objects.filter(runnable).order_by('-priority', 'run_after', 'pk')
+
+        for job in candidates.only('pk', 'status', 'lease_expires_at')[:10]:
+            # Claim only if nobody else changed the job since we read it
+            claimed = Job.objects.filter(
+                pk=job.pk, status=job.status, lease_expires_at=job.lease_expires_at
+            ).update(
+                status='running',
+                locked_by=self.worker_id,
+                lease_expires_at=self._lease_expiry(),
+                started_at=now,
+                finished_at=None,
+            )
+            if claimed:
+                return Job.objects.get(pk=job.pk)
+        return None
+
+    def extend_lease(self, job: Job, **fields):
+        """Push back the lease (and save any progress fields) if we still own the job."""
+        Job.objects.filter(pk=job.pk, locked_by=self.worker_id, status='running').update(
+            lease_expires_at=self._lease_expiry(), **fields
+        )
+
+    def _heartbeat(self, job: Job, stop: threading.Event):
+        try:
+            while not stop.wait(self.LEASE_SECONDS / 3):
+                self.extend_lease(job)
+        finally:
+            connection.close()
+
+    def run_job(self, job: Job) -> bool:
+        """Run a claimed job and record the outcome. Returns True on success."""
+        func = TASKS.get(job.task)
+        attempts = job.attempts + 1
+        Job.objects.filter(pk=job.pk).update(attempts=attempts)
+
+        if func is None:
+            self._finish(job, 'failed', error=f"Unknown task: {job.task}")
+            return False
+        if attempts > job.max_attempts:
+            # Reclaimed after its last attempt lost the worker (e.g. killed)
+            self._finish(job, 'failed', error=job.error or "Worker lost during final attempt")
+            return False
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop), daemon=True)
+        heartbeat.start()
+        logger.info(f"Job {job.pk} ({job.task}) started, attempt {attempts}/{job.max_attempts}")
+
+        try:
+            result = func(JobContext(job, self), **job.payload)
+        except PermanentJobError as e:
+            logger.warning(f"Job {job.pk} ({job.task}) failed: {e}")
+            self._finish(job, 'failed', error=str(e))
+            return False
+        except Exception:
+            error = traceback.format_exc()
+            logger.error(f"Job {job.pk} ({job.task}) failed: {error}")
+            if attempts < job.max_attempts:
+                delay = self.RETRY_BACKOFF_SECONDS * (2 ** (attempts - 1))
+                self._finish(job, 'queued', error=error,
+                             run_after=timezone.now() + timedelta(seconds=delay), finished_at=None)
+            else:
+                self._finish(job, 'failed', error=error)
+            return False
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        self._finish(job, 'succeeded', result=result, error='')
+        logger.info(f"Job {job.pk} ({job.task}) succeeded")
+        return True
+
+    def _finish(self, job: Job, status: str, **fields):
+        fields.setdefault('finished_at', timezone.now())
+        Job.objects.filter(pk=job.pk, locked_by=self.worker_id).update(
+            status=status, lease_expires_at=None, locked_by='', **fields
+        )
+
+    def run_once(self) -> bool:
+        """Claim and run one job. Returns False if the queue was empty."""
+        close_old_connections()
+        job = self.claim()
+        if job is None:
+            return False
+        self.run_job(job)
+        return True
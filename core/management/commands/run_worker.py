@@ -0,0 +1,85 @@
+"""
+Management Command: run_worker
+
+Run background jobs queued by the CMS (venue syncs, venue refreshes,
+pulse regeneration).
+
+Usage:
+    # Run until stopped, polling every 5 seconds when idle
+    python manage.py run_worker
+
+    # Run everything currently queued, then exit (e.g. from cron)
+    python manage.py run_worker --once
+
+    # Stop after 50 jobs (let systemd restart a fresh process)
+    python manage.py run_worker --max-jobs=50
+
+    # Poll every 2 seconds
+    python manage.py run_worker --poll-interval=2
+"""
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import TASKS, Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit when the queue is empty instead of polling',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=None,
+            help='Exit after running this many jobs',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help='Seconds to sleep when the queue is empty (default: 5)',
+        )
+        parser.add_argument(
+            '--worker-id',
+            type=str,
+            default=None,
+            help='Name recorded on claimed jobs (default: hostname:pid)',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(worker_id=options['worker_id'])
+        self._stopping = False
+
+        # Finish the current job on SIGTERM/SIGINT, then exit
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._request_stop)
+
+        self.stdout.write(f"Worker {worker.worker_id} started")
+        self.stdout.write(f"Tasks: {', '.join(sorted(TASKS))}")
+
+        processed = 0
+        while not self._stopping:
+            if options['max_jobs'] is not None and processed >= options['max_jobs']:
+                break
+            if worker.run_once():
+                processed += 1
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Worker stopped after {processed} jobs"))
+
+    def _request_stop(self, signum, frame):
+        if self._stopping:
+            raise KeyboardInterrupt
+        self._stopping = True
+        self.stdout.write(self.style.WARNING("Stopping after the current job..."))
@@ -0,0 +1,44 @@
+"""
+Management Command Mixins
+
+Options shared by management commands across apps.
+"""
+
+from django.conf import settings
+
+from core.profiling import Profiler
+
+
+class ProfiledCommandMixin:
+    """
+    Add --profile.
+
+    Profiles the whole run (see core.profiling): writes .pstats and
+    .collapsed files and prints SQL, HTTP and per-phase timings when the
+    command finishes, so they land in the journal next to its output.
+    The report goes to stderr, clear of data a command streams to stdout
+    (sync_content --export).
+    """
+
+    def add_profile_argument(self, parser):
+        parser.add_argument(
+            '--profile',
+            nargs='?',
+            const=settings.PROFILE_DIR,
+            default=None,
+            metavar='DIR',
+            help='Profile the run: print SQL/HTTP/phase timings and write '
+                 '.pstats/.collapsed files to DIR (default: PROFILE_DIR)',
+        )
+
+    def execute(self, *args, **options):
+        if not options.get('profile'):
+            return super().execute(*args, **options)
+
+        profiler = Profiler(self.__module__.rsplit('.', 1)[-1], options['profile'])
+        try:
+            with profiler:
+                return super().execute(*args, **options)
+        finally:
+            for line in ['', *profiler.report()]:
+                self.stderr.write(line, style_func=lambda text: text)
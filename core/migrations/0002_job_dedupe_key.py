@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 22:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='dedupe_key',
+            field=models.CharField(blank=True, help_text='Hash of the payload; one active job per task and key', max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running']), models.Q(('dedupe_key', ''), _negated=True)), fields=('task', 'dedupe_key'), name='core_job_active_dedupe'),
+        ),
+    ]
@@ -85,3 +85,85 @@ class UserTrackingModel(AccountScopedModel):
 
     class Meta:
         abstract = True
+
+
+class Job(BaseModel):
+    """
+    Background job, run by `python manage.py run_worker`.
+
+    Long API work (venue syncs, refreshes, pulse regeneration) is queued
+    here by the CMS instead of running inside the web request. A worker
+    claims a job with a lease it keeps extending while the job runs; if
+    the worker dies the lease lapses and another worker picks the job up.
+    Failed jobs are retried with backoff up to max_attempts.
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    task = models.CharField(max_length=100, db_index=True)
+    payload = models.JSONField(default=dict, blank=True)
+    dedupe_key = models.CharField(
+        max_length=64, blank=True,
+        help_text="Hash of the payload; one active job per task and key"
+    )
+    label = models.CharField(max_length=255, blank=True, help_text="Description shown in the CMS")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    priority = models.IntegerField(default=0, help_text="Higher runs first")
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(help_text="Not claimed before this time (retry backoff)")
+
+    locked_by = models.CharField(max_length=100, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+    progress_current = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='core_job_claim_idx'),
+        ]
+        constraints = [
+            # Makes enqueue()'s dedupe race-free: a second identical job
+            # can't be inserted while the first is queued or running
+            models.UniqueConstraint(
+                fields=['task', 'dedupe_key'],
+                condition=models.Q(status__in=['queued', 'running']) & ~models.Q(dedupe_key=''),
+                name='core_job_active_dedupe',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.label or self.task} ({self.status})"
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in self.ACTIVE_STATUSES
+
+    @property
+    def progress_percent(self) -> int:
+        if not self.progress_total:
+            return 100 if self.status == 'succeeded' else 0
+        return min(100, int(self.progress_current * 100 / self.progress_total))
@@ -0,0 +1,136 @@
+"""
+Pagination for Large Tables
+
+Listing a big, growing table (AIUsageLog) with Django's Paginator costs
+a COUNT(*) over every matching row on each page view, and page N is an
+OFFSET that reads and discards all the rows before it.
+
+- EstimatedCountPaginator: a drop-in Paginator (also for ModelAdmin) that
+  takes an unfiltered table's row count from the database's statistics
+  on PostgreSQL, and caps filtered counts at COUNT_LIMIT rows.
+- keyset_page(): "older"/"newer" paging on an indexed column with a
+  WHERE clause instead of an OFFSET, so every page costs the same.
+- KeysetChangeList: the same for an admin changelist ordered by -pk, as
+  "Older"/"Newest" links next to the page numbers (which stop at a capped
+  count); with a pagination.html that shows them and marks the count as
+  capped or estimated.
+
+Usage:
+    class AIUsageLogAdmin(admin.ModelAdmin):
+        paginator = EstimatedCountPaginator
+        show_full_result_count = False
+        ordering = ['-id']
+
+        def get_changelist(self, request, **kwargs):
+            return KeysetChangeList
+
+    page = keyset_page(AIUsageLog.objects.all(), before=request.GET.get('before'))
+    page.items, page.next_cursor
+"""
+
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose count is estimated (unfiltered) or capped (filtered)."""
+
+    ESTIMATE_ABOVE = 10000  # trust the table statistics above this many rows
+    COUNT_LIMIT = 10000  # filtered counts stop here; later pages aren't linked
+
+    estimated = False  # count came from the table statistics
+    capped = False  # count stopped at COUNT_LIMIT; there may be more rows
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        if not queryset.query.where:
+            estimate = self._estimated_rows(queryset)
+            if estimate is not None and estimate > self.ESTIMATE_ABOVE:
+                self.estimated = True
+                return estimate
+
+        # COUNT(*) over a LIMITed subquery: reads at most COUNT_LIMIT rows
+        count = queryset.order_by()[:self.COUNT_LIMIT].count()
+        self.capped = count >= self.COUNT_LIMIT
+        return count
+
+    @staticmethod
+    def _estimated_rows(queryset: QuerySet) -> Optional[int]:
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 for a table that was never analyzed
+        return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+@dataclass
+class KeysetPage:
+    items: List[Any]
+    next_cursor: Optional[int]  # pass as `before` for the following page
+
+
+def keyset_page(queryset: QuerySet, before=None, size: int = 50, field: str = 'pk') -> KeysetPage:
+    """
+    The `size` rows with the highest `field` below `before` (newest first).
+
+    `field` must be unique and indexed (the pk is); `before` comes from the
+    previous page's next_cursor and is ignored if it isn't an integer.
+    """
+    try:
+        before = int(before) if before not in (None, '') else None
+    except (TypeError, ValueError):
+        before = None
+    if before is not None:
+        queryset = queryset.filter(**{f'{field}__lt': before})
+
+    items = list(queryset.order_by(f'-{field}')[:size + 1])
+    has_more = len(items) > size
+    items = items[:size]
+    next_cursor = getattr(items[-1], field) if has_more else None
+    return KeysetPage(items=items, next_cursor=next_cursor)
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Admin changelist with keyset "Older"/"Newest" links.
+
+    "Older" filters on pk__lt the last row shown (a range scan on the
+    primary key, however deep), so rows past a capped count stay
+    reachable. Only offered while the list is in the admin's -pk
+    ordering; a column sort falls back to the page numbers.
+    """
+
+    def get_results(self, request):
+        super().get_results(request)
+        pk_name = self.lookup_opts.pk.attname
+        cursor_param = f'{pk_name}__lt'
+        self.count_capped = getattr(self.paginator, 'capped', False)
+        self.count_estimated = getattr(self.paginator, 'estimated', False)
+        self.older_url = self.newest_url = None
+
+        ordering = list(self.model_admin.get_ordering(request) or self.lookup_opts.ordering)
+        if ORDER_VAR in self.params or ordering[:1] not in (['-pk'], [f'-{pk_name}']):
+            return
+
+        # get_query_string() already leaves out the page number
+        rows = list(self.result_list)
+        if len(rows) >= self.list_per_page:
+            self.older_url = self.get_query_string({cursor_param: rows[-1].pk})
+        if cursor_param in self.params:
+            self.newest_url = self.get_query_string({cursor_param: None})
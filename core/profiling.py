@@ -0,0 +1,337 @@
+"""
+Command Profiling
+
+Where did a management command's time go: the database, the network or
+Python? A Profiler records, for one run:
+
+- cProfile stats of the main thread (.pstats, for pstats/snakeviz)
+- Stack samples of every thread (.collapsed, one "frame;frame;... count"
+  line per stack, for flamegraph.pl or speedscope)
+- Every SQL query: count and time, per phase and by statement
+- Every outbound HTTP call: count and time, per phase and by host. Calls
+  through core.http_client are recorded through its listener hook; the
+  AI SDKs' httpx calls by wrapping httpx.Client.send while profiling.
+- Wall time per phase, where code marks phases with `phase()`
+
+`phase()` is a no-op unless a profile is running, so services can mark
+their stages unconditionally. Phases nest ("match/write"); queries and
+calls made on worker threads count towards the phase the main thread is
+in at the time.
+
+Usage:
+    from core.profiling import Profiler, phase
+
+    with Profiler('refresh_venues', output_dir) as profiler:
+        with phase('refresh'):
+            ...
+    print('\\n'.join(profiler.report()))
+
+Management commands get this as --profile through
+core.management.mixins.ProfiledCommandMixin.
+"""
+
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from core.http_client import http_client
+
+try:
+    import httpx
+except ImportError:  # only installed alongside the AI SDKs
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# The running profiler (one per process)
+_active: Optional['Profiler'] = None
+
+
+@contextmanager
+def phase(name: str):
+    """Attribute the enclosed block to a named phase of the running profile."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
+
+
+class Timing:
+    """Count and total seconds of one kind of event."""
+
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+
+    def __str__(self):
+        return f"{self.count} in {self.seconds:.2f}s"
+
+
+class PhaseStats:
+    """Wall time plus the SQL and HTTP time spent inside one phase."""
+
+    def __init__(self):
+        self.wall = 0.0
+        self.entered = 0
+        self.sql = Timing()
+        self.http = Timing()
+
+
+class Profiler:
+    """Profile one command run (see module docstring)."""
+
+    # Seconds between stack samples
+    SAMPLE_INTERVAL = 0.005
+    # Statements listed in the report
+    TOP_QUERIES = 10
+    QUERY_WIDTH = 100
+
+    ROOT = '(total)'
+
+    def __init__(self, name: str, output_dir: Optional[str] = None):
+        """
+        Args:
+            name: Used in the output file names (e.g. the command name)
+            output_dir: Where to write .pstats/.collapsed files; None
+                records and reports without writing files
+        """
+        self.name = name
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.paths: List[Path] = []
+
+        self._lock = threading.Lock()
+        self._main_thread = threading.get_ident()
+        self._stack: List[str] = []
+        self._phases: Dict[str, PhaseStats] = defaultdict(PhaseStats)
+        self._queries: Dict[str, Timing] = defaultdict(Timing)
+        self._hosts: Dict[str, Timing] = defaultdict(Timing)
+        self._blocking = Timing()  # SQL + HTTP time on the main thread
+        self._samples: Counter = Counter()
+
+        self._cprofile = cProfile.Profile()
+        self._sampler: Optional[threading.Thread] = None
+        self._running = False
+        self._httpx_send = None
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError('A profile is already running in this process')
+        _active = self
+        self._running = True
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._phases[self.ROOT] = PhaseStats()
+
+        for connection in connections.all(initialized_only=True):
+            self._install_sql_wrapper(connection)
+        connection_created.connect(self._on_connection_created)
+        http_client.add_listener(self._on_http_client_call)
+        if httpx is not None:
+            self._patch_httpx()
+
+        self._sampler = threading.Thread(target=self._sample, name='profiler', daemon=True)
+        self._sampler.start()
+        self._cprofile.enable()
+
+    def stop(self):
+        global _active
+        self._cprofile.disable()
+        self._running = False
+        self.wall = time.perf_counter() - self._started
+        self.cpu = time.process_time() - self._cpu_started
+        self._phases[self.ROOT].wall = self.wall
+
+        self._sampler.join()
+        if self._httpx_send is not None:
+            httpx.Client.send = self._httpx_send
+        http_client.remove_listener(self._on_http_client_call)
+        connection_created.disconnect(self._on_connection_created)
+        for connection in connections.all(initialized_only=True):
+            if self._sql_wrapper in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self._sql_wrapper)
+        _active = None
+
+        if self.output_dir:
+            self._write_files()
+
+    def __enter__(self) -> 'Profiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @contextmanager
+    def phase(self, name: str):
+        if threading.get_ident() != self._main_thread:
+            # Phases describe what the main thread is doing
+            yield
+            return
+        self._stack.append(name)
+        stats = self._phases['/'.join(self._stack)]
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats.wall += time.perf_counter() - started
+            stats.entered += 1
+            self._stack.pop()
+
+    # -------------------------------------------------------------------------
+    # Recording
+    # -------------------------------------------------------------------------
+
+    def _current_phases(self) -> List[str]:
+        """The root and every enclosing phase path, outermost first."""
+        stack = list(self._stack)
+        return [self.ROOT] + ['/'.join(stack[:depth]) for depth in range(1, len(stack) + 1)]
+
+    def _record(self, kind: str, key: str, seconds: float):
+        phases = self._current_phases()
+        with self._lock:
+            for path in phases:
+                getattr(self._phases[path], kind).add(seconds)
+            (self._queries if kind == 'sql' else self._hosts)[key].add(seconds)
+            if threading.get_ident() == self._main_thread:
+                self._blocking.add(seconds)
+
+    def _install_sql_wrapper(self, connection):
+        if self._sql_wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self._sql_wrapper)
+
+    def _on_connection_created(self, sender, connection, **kwargs):
+        # Worker threads open their own connections
+        if self._running:
+            self._install_sql_wrapper(connection)
+
+    def _sql_wrapper(self, execute, sql, params, many, context):
+        if not self._running:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self._record('sql', sql, time.perf_counter() - started)
+
+    def _on_http_client_call(self, host, method, status, elapsed, retries, error):
+        self._record('http', host, elapsed)
+
+    def _patch_httpx(self):
+        original = self._httpx_send = httpx.Client.send
+        profiler = self
+
+        def send(client, request, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(client, request, *args, **kwargs)
+            finally:
+                profiler._record('http', request.url.host, time.perf_counter() - started)
+
+        httpx.Client.send = send
+
+    def _sample(self):
+        own = threading.get_ident()
+        while self._running:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._samples[';'.join(reversed(stack))] += 1
+            time.sleep(self.SAMPLE_INTERVAL)
+
+    # -------------------------------------------------------------------------
+    # Output
+    # -------------------------------------------------------------------------
+
+    def _write_files(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.name}-{timezone.localtime():%Y%m%d-%H%M%S}-{os.getpid()}"
+
+        pstats_path = self.output_dir / f"{stem}.pstats"
+        self._cprofile.dump_stats(pstats_path)
+
+        collapsed_path = self.output_dir / f"{stem}.collapsed"
+        with open(collapsed_path, 'w') as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        self.paths = [pstats_path, collapsed_path]
+
+    def report(self) -> List[str]:
+        """Human-readable summary lines."""
+        total = self._phases[self.ROOT]
+        python = max(0.0, self.wall - self._blocking.seconds)
+        lines = [
+            f"Profile: {self.wall:.2f}s wall, {self.cpu:.2f}s CPU (all threads)",
+            f"  SQL:    {total.sql.count} queries in {total.sql.seconds:.2f}s",
+            f"  HTTP:   {total.http.count} calls in {total.http.seconds:.2f}s",
+            f"  Python: {python:.2f}s (main thread wall time not spent waiting on SQL/HTTP)",
+        ]
+        if total.sql.seconds + total.http.seconds > self.wall:
+            lines.append("  (SQL/HTTP on worker threads overlaps the main thread, so totals can exceed wall time)")
+
+        if self._hosts:
+            lines.append("Hosts:")
+            for host, timing in sorted(self._hosts.items(), key=lambda kv: -kv[1].seconds):
+                lines.append(f"  {host}: {timing}")
+
+        if len(self._phases) > 1:
+            lines.append("Phases:")
+            lines.append(f"  {'phase':<32} {'wall':>8} {'SQL':>14} {'HTTP':>14}")
+            for path, stats in self._phases.items():
+                if path == self.ROOT:
+                    continue
+                indent = '  ' * path.count('/')
+                label = f"{indent}{path.rsplit('/', 1)[-1]}"
+                if stats.entered > 1:
+                    label += f" x{stats.entered}"
+                lines.append(
+                    f"  {label:<32} {stats.wall:>7.2f}s "
+                    f"{stats.sql.count:>5} {stats.sql.seconds:>7.2f}s "
+                    f"{stats.http.count:>5} {stats.http.seconds:>7.2f}s"
+                )
+
+        if self._queries:
+            lines.append(f"Top {self.TOP_QUERIES} queries by time:")
+            top = sorted(self._queries.items(), key=lambda kv: -kv[1].seconds)[:self.TOP_QUERIES]
+            for sql, timing in top:
+                statement = ' '.join(sql.split())
+                if len(statement) > self.QUERY_WIDTH:
+                    statement = statement[:self.QUERY_WIDTH - 3] + '...'
+                lines.append(f"  {timing.count:>5}x {timing.seconds:>7.3f}s  {statement}")
+
+        for path in self.paths:
+            lines.append(f"Wrote {path}")
+        return lines
@@ -1,3 +1,79 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from . import jobs
+from .jobs import Worker, enqueue
+from .models import Job
+
+
+class EnqueueTests(TestCase):
+    """enqueue() de-duplication of active jobs."""
+
+    def test_duplicate_active_enqueue_returns_existing_job(self):
+        first = enqueue('sync_city', {'city_slug': 'richmond', 'discover': True})
+        second = enqueue('sync_city', {'discover': True, 'city_slug': 'richmond'})
+
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_other_payload_or_no_dedupe_queues_new_job(self):
+        first = enqueue('sync_city', {'city_slug': 'richmond'})
+
+        self.assertNotEqual(enqueue('sync_city', {'city_slug': 'norfolk'}).pk, first.pk)
+        self.assertNotEqual(enqueue('sync_city', {'city_slug': 'richmond'}, dedupe=False).pk, first.pk)
+
+    def test_finished_job_does_not_block_enqueue(self):
+        first = enqueue('sync_city', {'city_slug': 'richmond'})
+        Job.objects.filter(pk=first.pk).update(status='succeeded')
+
+        self.assertNotEqual(enqueue('sync_city', {'city_slug': 'richmond'}).pk, first.pk)
+
+    def test_racing_enqueue_returns_winner(self):
+        first = enqueue('sync_city', {'city_slug': 'richmond'})
+        # The pre-check misses the job the other request just created, so
+        # the insert hits the unique constraint and falls back to a lookup
+        with mock.patch.object(jobs, '_active_job', side_effect=[None, first]) as active_job:
+            second = enqueue('sync_city', {'city_slug': 'richmond'})
+
+        self.assertEqual(active_job.call_count, 2)
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+
+class WorkerClaimTests(TestCase):
+    """Worker.claim() leases."""
+
+    def setUp(self):
+        self.job = enqueue('sync_city', {'city_slug': 'richmond'})
+        self.worker = Worker('worker-a')
+        self.other = Worker('worker-b')
+
+    def test_claim_leases_job(self):
+        job = self.worker.claim()
+
+        self.assertEqual(job.pk, self.job.pk)
+        self.assertEqual(job.status, 'running')
+        self.assertEqual(job.locked_by, 'worker-a')
+        self.assertGreater(job.lease_expires_at, timezone.now())
+
+    def test_claimed_job_cannot_be_claimed_twice(self):
+        self.assertIsNotNone(self.worker.claim())
+        self.assertIsNone(self.other.claim())
+
+    def test_expired_lease_is_reclaimed(self):
+        self.worker.claim()
+        Job.objects.filter(pk=self.job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        job = self.other.claim()
+
+        self.assertEqual(job.pk, self.job.pk)
+        self.assertEqual(job.locked_by, 'worker-b')
+        self.assertGreater(job.lease_expires_at, timezone.now())
+
+    def test_job_is_not_claimed_before_run_after(self):
+        Job.objects.filter(pk=self.job.pk).update(run_after=timezone.now() + timedelta(minutes=5))
 
-# Create your tests here.
+        self.assertIsNone(self.worker.claim())
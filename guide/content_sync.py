@@ -0,0 +1,192 @@
+"""
+Content Sync
+
+The models `manage.py sync_content` moves between environments, their
+natural keys, and the helpers shared by export, import and the
+post_delete handler that records tombstones for delta syncs.
+
+Rows never carry database ids between environments: each synced model is
+identified by a natural key (SYNC_MODELS), and foreign keys are written
+as the related row's natural key. A multi-field key is a tuple in Python
+and a list in JSON.
+"""
+
+import hashlib
+import json
+from typing import Dict, Iterable, List
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from core.bulk import existing_keys
+from guide.models import (
+    Region, City, Venue, MilitaryBase, Tunnel,
+    VacationDestination, VendorUtility, Testimonial, TeamMember,
+    DriveDestination
+)
+from ai_services.models import AIProvider, AIModel, AIOperationConfig
+
+
+FORMAT = 'sync_content'
+FORMAT_VERSION = 2
+
+# (label, model, natural key fields - most selective first, content type),
+# in import order: models come after the models they reference
+SYNC_MODELS = [
+    ('Region', Region, ('slug',), 'reference'),
+    ('AIProvider', AIProvider, ('name',), 'reference'),
+    ('AIModel', AIModel, ('model_id', 'provider'), 'reference'),
+    ('AIOperationConfig', AIOperationConfig, ('operation',), 'reference'),
+    ('DriveDestination', DriveDestination, ('slug',), 'reference'),
+    ('City', City, ('slug',), 'cms'),
+    ('MilitaryBase', MilitaryBase, ('slug',), 'cms'),
+    ('Tunnel', Tunnel, ('slug',), 'cms'),
+    ('VacationDestination', VacationDestination, ('slug',), 'cms'),
+    ('VendorUtility', VendorUtility, ('name', 'city'), 'cms'),
+    ('Testimonial', Testimonial, ('client_name',), 'cms'),
+    ('TeamMember', TeamMember, ('name',), 'cms'),
+    ('Venue', Venue, ('name', 'city', 'venue_type'), 'cms'),
+]
+
+SYNC_LABELS = {model: label for label, model, _, _ in SYNC_MODELS}
+SYNC_KEYS = {model: key_fields for _, model, key_fields, _ in SYNC_MODELS}
+
+# Fields to EXCLUDE when syncing (API-fetched or auto-generated)
+VENUE_EXCLUDE_FIELDS = [
+    'google_place_id', 'yelp_business_id', 'rating', 'rating_count', 'price_level',
+    'website', 'latitude', 'longitude', 'hours_json', 'photos_json',
+    'data_source', 'last_enriched_at', 'static_refreshed_at', 'enrichment_status',
+    'view_score', 'rating_volatility',
+    'match_attempts', 'next_match_attempt_at', 'match_query_fingerprint',
+]
+
+EXCLUDE_FIELDS = {
+    'Venue': VENUE_EXCLUDE_FIELDS,
+    'AIOperationConfig': ['updated_by'],  # user ids differ between databases
+}
+
+# Set by the target database on write
+TIMESTAMP_FIELDS = ['created_at', 'updated_at']
+
+
+def sync_fields(label: str, model) -> List[models.Field]:
+    """Concrete fields written for a model (no auto ids or timestamps)."""
+    excluded = set(EXCLUDE_FIELDS.get(label, [])) | set(TIMESTAMP_FIELDS)
+    return [
+        field for field in model._meta.concrete_fields
+        if field.name not in excluded and not isinstance(field, models.AutoField)
+    ]
+
+
+def checksum(record: dict) -> str:
+    """Content checksum of a serialized row (key order doesn't matter)."""
+    payload = json.dumps(record, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def json_key(key):
+    """Natural key as read back from JSON (lists) -> hashable Python form (tuples)."""
+    if isinstance(key, list):
+        return tuple(json_key(part) for part in key)
+    return key
+
+
+class NaturalKeys:
+    """Per-model pk <-> natural key maps, loaded once per model and cached."""
+
+    CHUNK_SIZE = 2000
+
+    def __init__(self):
+        self._keys: Dict[type, dict] = {}
+
+    def keys(self, model) -> dict:
+        """Map pk -> natural key for every row of the model."""
+        if model in self._keys:
+            return self._keys[model]
+
+        key_fields = [model._meta.get_field(name) for name in SYNC_KEYS[model]]
+        related_keys = {
+            field.name: self.keys(field.related_model)
+            for field in key_fields if field.is_relation
+        }
+        keys = {}
+        rows = model.objects.order_by().values_list('pk', *[f.attname for f in key_fields])
+        for pk, *values in rows.iterator(chunk_size=self.CHUNK_SIZE):
+            values = [
+                related_keys[field.name].get(value) if field.is_relation else value
+                for field, value in zip(key_fields, values)
+            ]
+            keys[pk] = values[0] if len(values) == 1 else tuple(values)
+        self._keys[model] = keys
+        return keys
+
+    def pks(self, model) -> dict:
+        """Map natural key -> pk (inverse of keys())."""
+        return {key: pk for pk, key in self.keys(model).items()}
+
+    def forget(self, model):
+        """Drop a cached map (after the model's rows changed)."""
+        self._keys.pop(model, None)
+
+    def serialize(self, fields: List[models.Field], row: Iterable) -> dict:
+        """Record for a values_list row of `fields`, with foreign keys as natural keys."""
+        record = {}
+        for field, value in zip(fields, row):
+            if field.is_relation and value is not None:
+                value = self.keys(field.related_model).get(value)
+            record[field.name] = value
+        return record
+
+    def existing(self, model, keys: Iterable) -> dict:
+        """
+        Map natural key -> pk for those of `keys` that exist.
+
+        Foreign key parts are resolved through the related model's map;
+        keys whose related row doesn't exist are left out.
+        """
+        key_fields = [model._meta.get_field(name) for name in SYNC_KEYS[model]]
+        related_pks = {
+            field.name: self.pks(field.related_model)
+            for field in key_fields if field.is_relation
+        }
+        probes = {}
+        for key in keys:
+            parts = key if len(key_fields) > 1 else (key,)
+            values = {}
+            for field, part in zip(key_fields, parts):
+                if field.is_relation and part is not None:
+                    part = related_pks[field.name].get(part)
+                    if part is None:
+                        break
+                values[field.attname] = part
+            else:
+                probes[tuple(values[f.attname] for f in key_fields)] = key
+        if not probes:
+            return {}
+
+        found = existing_keys(
+            model, SYNC_KEYS[model],
+            [model(**dict(zip([f.attname for f in key_fields], probe))) for probe in probes],
+        )
+        return {probes[probe]: pk for probe, pk in found.items() if probe in probes}
+
+
+def instance_natural_key(instance):
+    """
+    Natural key of a model instance, as written to JSON (lists, not
+    tuples). None if a related row it refers to is already gone.
+    """
+    parts = []
+    for name in SYNC_KEYS[type(instance)]:
+        field = instance._meta.get_field(name)
+        if field.is_relation:
+            try:
+                related = getattr(instance, name)
+            except ObjectDoesNotExist:
+                return None
+            part = instance_natural_key(related) if related is not None else None
+        else:
+            part = getattr(instance, name)
+        parts.append(part)
+    return parts[0] if len(parts) == 1 else parts
@@ -11,6 +11,9 @@ Usage:
     # Enrich + discover new top venues for Norfolk
     python manage.py enrich_venues --city=norfolk --discover --limit=20
 
+    # Discover within 10km of the city center using Nearby Search
+    python manage.py enrich_venues --city=norfolk --discover --nearby --radius=10000
+
     # Enrich all enrichable types
     python manage.py enrich_venues --all
 
@@ -19,17 +22,61 @@ Usage:
 
     # Flag unmatched venues for manual review
     python manage.py enrich_venues --flag-unmatched
+
+    # Search again for venues still in their no-match backoff
+    python manage.py enrich_venues --retry-unmatched
+
+    # Match against Google and Yelp together, merging the results
+    python manage.py enrich_venues --all --provider=composite
+
+    # Use 8 concurrent API calls (default: 4)
+    python manage.py enrich_venues --all --concurrency=8
+
+    # Flush DB writes every 250 venues (default: 100)
+    python manage.py enrich_venues --all --batch-size=250
+
+    # Continue the last run that stopped on quota or was interrupted
+    python manage.py enrich_venues --resume
+
+    # Split the run across 4 processes
+    python manage.py enrich_venues --all --discover --workers=4
+
+    # Run one quarter of the work (e.g. on each of 4 hosts)
+    python manage.py enrich_venues --all --shard=0/4
+
+    # Print SQL/HTTP/phase timings and write profiles to PROFILE_DIR
+    python manage.py enrich_venues --all --profile
+
+    # Record API responses, then re-run offline from the recording
+    python manage.py enrich_venues --city=norfolk --discover --dry-run --cache-mode=record
+    python manage.py enrich_venues --city=norfolk --discover --dry-run --cache-mode=replay
 """
 
 from django.core.management.base import BaseCommand, CommandError
 
+from core.management.mixins import ProfiledCommandMixin
+from core.profiling import phase
+from guide.management.mixins import ResumableRunMixin, ShardedCommandMixin
 from guide.models import City, Venue, VenueAPIConfig
 from guide.services import VenueEnrichmentService
+from guide.services.response_cache import ResponseCache
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommandMixin, ShardedCommandMixin, ResumableRunMixin, BaseCommand):
     help = 'Enrich venues with data from external APIs (Google Places, etc.)'
 
+    run_command = 'enrich'
+    run_options = (
+        'city', 'type', 'all', 'discover', 'limit', 'nearby', 'radius',
+        'retry_unmatched', 'flag_unmatched', 'shard',
+    )
+
+    # Environment variable holding each provider's key, for default configs
+    API_KEY_NAMES = {
+        'google': 'GOOGLE_PLACES_API_KEY',
+        'yelp': 'YELP_API_KEY',
+    }
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--city',
@@ -58,11 +105,27 @@ class Command(BaseCommand):
             default=20,
             help='Maximum venues to discover per city/type (default: 20)',
         )
+        parser.add_argument(
+            '--nearby',
+            action='store_true',
+            help='Discover with Nearby Search around city coordinates instead of text search',
+        )
+        parser.add_argument(
+            '--radius',
+            type=int,
+            default=None,
+            help='Nearby search radius in meters (default: 15000)',
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
             help='Show what would be done without making changes',
         )
+        parser.add_argument(
+            '--retry-unmatched',
+            action='store_true',
+            help='Ignore the no-match backoff and search again for previously unmatched venues',
+        )
         parser.add_argument(
             '--flag-unmatched',
             action='store_true',
@@ -72,11 +135,40 @@ class Command(BaseCommand):
             '--provider',
             type=str,
             default='google',
-            choices=['google'],
-            help='API provider to use (default: google)',
+            choices=VenueEnrichmentService.PROVIDERS,
+            help='API provider to use; composite queries Google and Yelp together (default: google)',
         )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=VenueEnrichmentService.MAX_WORKERS,
+            help=f'Concurrent API calls (default: {VenueEnrichmentService.MAX_WORKERS})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=VenueEnrichmentService.WRITE_BATCH_SIZE,
+            help=f'Venues per bulk DB write (default: {VenueEnrichmentService.WRITE_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--cache-mode',
+            type=str,
+            choices=ResponseCache.MODES,
+            default=None,
+            help='Google Places response cache: record responses, or replay them '
+                 'offline without API calls (default: GOOGLE_PLACES_CACHE_MODE)',
+        )
+        self.add_shard_arguments(parser)
+        self.add_resume_argument(parser)
+        self.add_profile_argument(parser)
 
     def handle(self, *args, **options):
+        if options['workers'] != 1:
+            self.run_workers(options)
+            return
+
+        run = self.start_run(options)
+        shard = self.parse_shard(options)
         dry_run = options['dry_run']
         discover = options['discover']
         limit = options['limit']
@@ -98,27 +190,36 @@ class Command(BaseCommand):
         else:
             cities = City.objects.filter(is_published=True)
 
-        # Check API configuration
-        config = VenueAPIConfig.objects.filter(provider=provider).first()
+        # Check API configuration (a composite is gated on its primary provider)
+        config_provider = 'google' if provider == 'composite' else provider
+        config = VenueAPIConfig.objects.filter(provider=config_provider).first()
         if not config:
             self.stdout.write(self.style.WARNING(
-                f"No {provider} API configuration found. Creating default..."
+                f"No {config_provider} API configuration found. Creating default..."
             ))
             config = VenueAPIConfig.objects.create(
-                provider=provider,
-                api_key_name='GOOGLE_PLACES_API_KEY',
+                provider=config_provider,
+                api_key_name=self.API_KEY_NAMES[config_provider],
             )
 
         if not config.is_enabled:
             self.stdout.write(self.style.WARNING(
-                f"API provider '{provider}' is not enabled. "
+                f"API provider '{config_provider}' is not enabled. "
                 "Enable it in CMS settings or update VenueAPIConfig."
             ))
             if not dry_run:
                 return
 
         # Initialize service
-        service = VenueEnrichmentService(provider=provider)
+        service = VenueEnrichmentService(
+            provider=provider,
+            workers=options['concurrency'],
+            batch_size=options['batch_size'],
+            cache_mode=options['cache_mode'],
+            shard=shard
+        )
+        if provider == 'composite':
+            self.stdout.write(f"Providers: {', '.join(service.service.order)}")
 
         if dry_run:
             self.stdout.write(self.style.NOTICE("DRY RUN - No changes will be made"))
@@ -126,83 +227,97 @@ class Command(BaseCommand):
         self.stdout.write(f"\nProcessing {cities.count()} cities...")
         self.stdout.write(f"Venue types: {', '.join(venue_types)}")
         self.stdout.write(f"Quota remaining: {config.quota_remaining}")
+        if shard:
+            self.stdout.write(f"Shard: {shard}")
         self.stdout.write("")
 
         total_matched = 0
         total_failed = 0
         total_added = 0
 
-        for city in cities:
-            self.stdout.write(f"\n{'=' * 50}")
-            self.stdout.write(self.style.HTTP_INFO(f"Processing: {city.name}"))
-            self.stdout.write(f"{'=' * 50}")
-
-            # Match and enrich existing venues
-            self.stdout.write("\nMatching existing venues...")
-            results = service.match_and_enrich_city(
-                city=city,
-                venue_types=venue_types,
-                dry_run=dry_run
-            )
-
-            total_matched += results['matched']
-            total_failed += results['failed']
-
-            for detail in results['details']:
-                if detail['success']:
-                    self.stdout.write(self.style.SUCCESS(
-                        f"  ✓ {detail['venue']}: {detail['message']}"
-                    ))
-                else:
-                    self.stdout.write(self.style.WARNING(
-                        f"  ✗ {detail['venue']}: {detail['message']}"
-                    ))
-
-            self.stdout.write(
-                f"\n  Matched: {results['matched']}, "
-                f"Failed: {results['failed']}, "
-                f"Skipped: {results['skipped']}"
-            )
+        with self.tracking_run(run):
+            for city in cities:
+                self.stdout.write(f"\n{'=' * 50}")
+                self.stdout.write(self.style.HTTP_INFO(f"Processing: {city.name}"))
+                self.stdout.write(f"{'=' * 50}")
+
+                # Match and enrich existing venues
+                self.stdout.write("\nMatching existing venues...")
+                with phase('match'):
+                    results = service.match_and_enrich_city(
+                        city=city,
+                        venue_types=venue_types,
+                        dry_run=dry_run,
+                        retry_unmatched=options['retry_unmatched'],
+                        run=run
+                    )
 
-            # Discover new venues if requested
-            if discover:
-                self.stdout.write("\nDiscovering new venues...")
-                discover_results = service.discover_new_venues(
-                    city=city,
-                    venue_types=venue_types,
-                    limit=limit,
-                    dry_run=dry_run
+                total_matched += results['matched']
+                total_failed += results['failed']
+
+                for detail in results['details']:
+                    if detail['success']:
+                        self.stdout.write(self.style.SUCCESS(
+                            f"  ✓ {detail['venue']}: {detail['message']}"
+                        ))
+                    else:
+                        self.stdout.write(self.style.WARNING(
+                            f"  ✗ {detail['venue']}: {detail['message']}"
+                        ))
+
+                self.stdout.write(
+                    f"\n  Matched: {results['matched']}, "
+                    f"Failed: {results['failed']}, "
+                    f"Skipped: {results['skipped']} ({results['backed_off']} in no-match backoff)"
                 )
-
-                if 'error' in discover_results:
+                self.stdout.write(f"  Throughput: {results['pipeline_summary']}")
+
+                # Discover new venues if requested
+                if discover:
+                    self.stdout.write("\nDiscovering new venues...")
+                    with phase('discover'):
+                        discover_results = service.discover_new_venues(
+                            city=city,
+                            venue_types=venue_types,
+                            limit=limit,
+                            dry_run=dry_run,
+                            nearby=options['nearby'],
+                            radius_m=options['radius'],
+                            run=run
+                        )
+
+                    if 'error' in discover_results:
+                        self.stdout.write(self.style.ERROR(
+                            f"  Error: {discover_results['error']}"
+                        ))
+                    else:
+                        total_added += discover_results['added']
+
+                        for detail in discover_results['details']:
+                            if detail['action'] == 'added':
+                                rating = detail.get('rating', 'N/A')
+                                self.stdout.write(self.style.SUCCESS(
+                                    f"  + {detail['name']} (rating: {rating})"
+                                ))
+                            elif detail['action'] == 'matched':
+                                self.stdout.write(self.style.HTTP_INFO(
+                                    f"  ~ {detail['name']}: {detail['reason']}"
+                                ))
+
+                        self.stdout.write(
+                            f"\n  Added: {discover_results['added']}, "
+                            f"Existing: {discover_results['existing']}"
+                        )
+                        self.stdout.write(f"  Throughput: {discover_results['pipeline_summary']}")
+
+                # Check quota
+                if not service.is_enabled():
                     self.stdout.write(self.style.ERROR(
-                        f"  Error: {discover_results['error']}"
+                        "\nQuota exhausted! Stopping."
                     ))
-                else:
-                    total_added += discover_results['added']
-
-                    for detail in discover_results['details']:
-                        if detail['action'] == 'added':
-                            rating = detail.get('rating', 'N/A')
-                            self.stdout.write(self.style.SUCCESS(
-                                f"  + {detail['name']} (rating: {rating})"
-                            ))
-                        elif detail['action'] == 'matched':
-                            self.stdout.write(self.style.HTTP_INFO(
-                                f"  ~ {detail['name']}: {detail['reason']}"
-                            ))
-
-                    self.stdout.write(
-                        f"\n  Added: {discover_results['added']}, "
-                        f"Existing: {discover_results['existing']}"
-                    )
-
-            # Check quota
-            if not service.is_enabled():
-                self.stdout.write(self.style.ERROR(
-                    "\nQuota exhausted! Stopping."
-                ))
-                break
+                    if run:
+                        run.finish('stopped', 'quota exhausted')
+                    break
 
         # Summary
         self.stdout.write(f"\n{'=' * 50}")
@@ -214,6 +329,8 @@ class Command(BaseCommand):
             self.stdout.write(f"Total added: {total_added}")
         self.stdout.write(f"Quota remaining: {service.config.quota_remaining if service.config else 'N/A'}")
 
+        self.write_run_footer(run)
+
         if dry_run:
             self.stdout.write(self.style.NOTICE("\nDRY RUN - No changes were made"))
 
@@ -221,7 +338,10 @@ class Command(BaseCommand):
         if options['flag_unmatched'] and not dry_run:
             unmatched = Venue.objects.filter(
                 venue_type__in=venue_types,
-                google_place_id='',
+                **{service.id_field: ''},
                 enrichment_status='none'
-            ).update(enrichment_status='manual_review')
+            )
+            if shard:
+                unmatched = shard.filter(unmatched)
+            unmatched = unmatched.update(enrichment_status='manual_review')
             self.stdout.write(f"\nFlagged {unmatched} venues for manual review")
@@ -7,12 +7,15 @@ Usage:
     python manage.py refresh_pulse --trends  # Refresh trends only
     python manage.py refresh_pulse --headlines  # Refresh headlines only
     python manage.py refresh_pulse --stats   # Show pulse statistics
+    python manage.py refresh_pulse --force --profile  # Print where the time went
 """
 from django.core.management.base import BaseCommand
+from ai_services.usage_buffer import usage_buffer
+from core.management.mixins import ProfiledCommandMixin
 from guide.services.pulse_service import pulse_service
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommandMixin, BaseCommand):
     help = 'Refresh Hampton Roads Pulse content (trends and headlines)'
 
     def add_arguments(self, parser):
@@ -36,6 +39,7 @@ class Command(BaseCommand):
             action='store_true',
             help='Show pulse statistics'
         )
+        self.add_profile_argument(parser)
 
     def handle(self, *args, **options):
         if options['stats']:
@@ -100,3 +104,7 @@ class Command(BaseCommand):
                 ))
             else:
                 self.stdout.write(self.style.WARNING("  Headlines: EMPTY"))
+
+        # Write this run's AI usage logs now rather than from the background
+        # flusher or at exit, so they're in the cost report when we return
+        usage_buffer.flush()
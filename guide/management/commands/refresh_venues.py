@@ -18,17 +18,62 @@ Usage:
 
     # Dry run
     python manage.py refresh_venues --days=7 --dry-run
+
+    # Ratings/hours every 2 days; address/photos once they're 60+ days old
+    python manage.py refresh_venues --days=2 --static-days=60
+
+    # Force a full (static) refresh of everything due
+    python manage.py refresh_venues --days=7 --tier=static
+
+    # Run the due windows of today's priority plan (what the timer runs)
+    python manage.py refresh_venues --scheduled
+
+    # Show today's plan without refreshing anything
+    python manage.py refresh_venues --show-plan
+
+    # Use 8 concurrent API calls (default: 4)
+    python manage.py refresh_venues --days=7 --concurrency=8
+
+    # Flush DB writes every 250 venues (default: 100)
+    python manage.py refresh_venues --days=7 --batch-size=250
+
+    # Refresh from Google and Yelp together, merging the results
+    python manage.py refresh_venues --days=7 --provider=composite
+
+    # Continue the last run that stopped on quota or was interrupted
+    python manage.py refresh_venues --resume
+
+    # Split the run across 4 processes
+    python manage.py refresh_venues --days=7 --workers=4
+
+    # Run one quarter of the work (e.g. on each of 4 hosts)
+    python manage.py refresh_venues --days=7 --shard=0/4
+
+    # Print SQL/HTTP/phase timings and write profiles to PROFILE_DIR
+    python manage.py refresh_venues --days=7 --profile
+
+    # Record API responses, then re-run offline from the recording
+    python manage.py refresh_venues --days=7 --dry-run --cache-mode=record
+    python manage.py refresh_venues --days=7 --dry-run --cache-mode=replay
 """
 
 from django.core.management.base import BaseCommand, CommandError
 
-from guide.models import Venue, VenueAPIConfig
+from core.management.mixins import ProfiledCommandMixin
+from core.profiling import phase
+from guide.management.mixins import ResumableRunMixin, ShardedCommandMixin
+from guide.models import Venue
 from guide.services import VenueEnrichmentService
+from guide.services.response_cache import ResponseCache
+from guide.services.refresh_scheduler import RefreshScheduler
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommandMixin, ShardedCommandMixin, ResumableRunMixin, BaseCommand):
     help = 'Refresh stale venue data from external APIs'
 
+    run_command = 'refresh'
+    run_options = ('days', 'static_days', 'tier', 'all', 'limit', 'shard')
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--days',
@@ -36,6 +81,30 @@ class Command(BaseCommand):
             default=7,
             help='Refresh venues not updated in N days (default: 7)',
         )
+        parser.add_argument(
+            '--static-days',
+            type=int,
+            default=VenueEnrichmentService.STATIC_REFRESH_DAYS,
+            help=f'Full refresh (address, phone, website, photos) when older than N days '
+                 f'(default: {VenueEnrichmentService.STATIC_REFRESH_DAYS})',
+        )
+        parser.add_argument(
+            '--tier',
+            type=str,
+            default='auto',
+            choices=['auto', 'volatile', 'static'],
+            help='Field tier to refresh: auto picks per venue (default: auto)',
+        )
+        parser.add_argument(
+            '--scheduled',
+            action='store_true',
+            help="Refresh the due entries of today's priority plan (built on first run)",
+        )
+        parser.add_argument(
+            '--show-plan',
+            action='store_true',
+            help="Show today's refresh plan and exit",
+        )
         parser.add_argument(
             '--venue-id',
             type=int,
@@ -60,32 +129,95 @@ class Command(BaseCommand):
             '--provider',
             type=str,
             default='google',
-            choices=['google'],
-            help='API provider to use (default: google)',
+            choices=VenueEnrichmentService.PROVIDERS,
+            help='API provider to use; composite queries Google and Yelp together (default: google)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=VenueEnrichmentService.MAX_WORKERS,
+            help=f'Concurrent API calls (default: {VenueEnrichmentService.MAX_WORKERS})',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=VenueEnrichmentService.WRITE_BATCH_SIZE,
+            help=f'Venues per bulk DB write (default: {VenueEnrichmentService.WRITE_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--cache-mode',
+            type=str,
+            choices=ResponseCache.MODES,
+            default=None,
+            help='Google Places response cache: record responses, or replay them '
+                 'offline without API calls (default: GOOGLE_PLACES_CACHE_MODE)',
         )
+        self.add_shard_arguments(parser)
+        self.add_resume_argument(parser)
+        self.add_profile_argument(parser)
 
     def handle(self, *args, **options):
+        batch = not (options['show_plan'] or options['venue_id'])
+        if batch and options['workers'] != 1:
+            if options['scheduled'] and not options['dry_run']:
+                # Build today's plan once, before the shards start running it
+                RefreshScheduler(VenueEnrichmentService(provider=options['provider'])).build_plan()
+            self.run_workers(options)
+            return
+
+        # Scheduled runs resume through their plan; single-venue and plan
+        # views don't need a run record
+        tracked = batch and not options['scheduled']
+        run = self.start_run(options) if tracked else None
         dry_run = options['dry_run']
         provider = options['provider']
         days = options['days']
         limit = options['limit']
+        shard = self.parse_shard(options)
 
-        # Check API configuration
-        config = VenueAPIConfig.objects.filter(provider=provider).first()
+        service = VenueEnrichmentService(
+            provider=provider,
+            workers=options['concurrency'],
+            batch_size=options['batch_size'],
+            cache_mode=options['cache_mode'],
+            shard=shard
+        )
+
+        # Check API configuration (a composite is gated on its primary provider)
+        config = service.config
         if not config or not config.is_enabled:
             self.stdout.write(self.style.ERROR(
-                f"API provider '{provider}' is not configured or enabled."
+                f"API provider '{service.primary_provider}' is not configured or enabled."
             ))
             return
 
-        service = VenueEnrichmentService(provider=provider)
-
         if dry_run:
             self.stdout.write(self.style.NOTICE("DRY RUN - No changes will be made"))
 
         self.stdout.write(f"Quota remaining: {config.quota_remaining}")
+        if shard:
+            self.stdout.write(f"Shard: {shard}")
         self.stdout.write("")
 
+        if options['show_plan']:
+            self._show_plan(RefreshScheduler(service))
+            return
+
+        if options['scheduled']:
+            scheduler = RefreshScheduler(service)
+            results = scheduler.run(limit=limit, dry_run=dry_run)
+            if results['planned']:
+                self.stdout.write(f"Built today's plan: {results['planned']} venues")
+            self.stdout.write(
+                f"Window {results['window']}: {results['due']} due, "
+                f"{results['refreshed']} refreshed "
+                f"({results['by_tier']['volatile']} volatile, {results['by_tier']['static']} static), "
+                f"{results['failed']} failed"
+            )
+            self.stdout.write(f"Throughput: {results['pipeline_summary']}")
+            self._show_plan(scheduler)
+            return
+
         # Refresh specific venue
         if options['venue_id']:
             try:
@@ -93,15 +225,16 @@ class Command(BaseCommand):
             except Venue.DoesNotExist:
                 raise CommandError(f"Venue not found: {options['venue_id']}")
 
-            if not venue.google_place_id:
+            if not getattr(venue, service.id_field):
                 self.stdout.write(self.style.WARNING(
-                    f"Venue '{venue.name}' has no Google Place ID. "
+                    f"Venue '{venue.name}' has no {service.primary_provider} ID. "
                     "Use enrich_venues to match it first."
                 ))
                 return
 
             self.stdout.write(f"Refreshing venue: {venue.name}")
-            success, message = service.refresh_venue(venue, dry_run)
+            tier = 'static' if options['tier'] == 'auto' else options['tier']
+            success, message = service.refresh_venue(venue, dry_run, tier=tier)
 
             if success:
                 self.stdout.write(self.style.SUCCESS(f"  ✓ {message}"))
@@ -116,11 +249,18 @@ class Command(BaseCommand):
         # Refresh stale venues
         self.stdout.write(f"Finding venues not updated in {days}+ days...")
 
-        results = service.refresh_stale_venues(
-            days_old=days,
-            limit=limit,
-            dry_run=dry_run
-        )
+        with self.tracking_run(run):
+            with phase('refresh'):
+                results = service.refresh_stale_venues(
+                    days_old=days,
+                    limit=limit,
+                    dry_run=dry_run,
+                    static_days=options['static_days'],
+                    tier=None if options['tier'] == 'auto' else options['tier'],
+                    run=run
+                )
+            if run and results['pipeline'].get('stop_reason'):
+                run.finish('stopped', results['pipeline']['stop_reason'])
 
         total = len(results['details'])
         self.stdout.write(f"Found {total} venues to refresh\n")
@@ -137,9 +277,24 @@ class Command(BaseCommand):
 
         # Summary
         self.stdout.write(f"\n{'=' * 40}")
-        self.stdout.write(f"Refreshed: {results['refreshed']}")
+        self.stdout.write(
+            f"Refreshed: {results['refreshed']} "
+            f"({results['by_tier']['volatile']} volatile, {results['by_tier']['static']} static)"
+        )
         self.stdout.write(f"Failed: {results['failed']}")
+        self.stdout.write(f"Throughput: {results['pipeline_summary']}")
         self.stdout.write(f"Quota remaining: {service.config.quota_remaining if service.config else 'N/A'}")
+        self.write_run_footer(run)
 
         if dry_run:
             self.stdout.write(self.style.NOTICE("\nDRY RUN - No changes were made"))
+
+    def _show_plan(self, scheduler):
+        summary = scheduler.plan_summary()
+        if not summary['total']:
+            self.stdout.write(f"No refresh plan for {summary['date']}")
+            return
+        statuses = ', '.join(f"{k}: {v}" for k, v in sorted(summary['by_status'].items()))
+        windows = ', '.join(f"w{k}: {v}" for k, v in sorted(summary['by_window'].items()))
+        self.stdout.write(f"Plan for {summary['date']}: {summary['total']} venues ({statuses})")
+        self.stdout.write(f"  By window: {windows}")
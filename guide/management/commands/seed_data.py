@@ -1,70 +1,114 @@
 """
 Seed data management command for About Hampton Roads.
 Seeds all content from the PDF relocation guide.
+
+Seeding is an idempotent bulk upsert keyed on each model's natural key
+(slug where the model has one; see guide.content_sync.SYNC_KEYS), in one
+transaction, so it's safe to re-run: changed rows are updated in place,
+rows that already match aren't written (their updated_at stays put), and
+fields the seed data doesn't set (venue enrichment, CMS edits) are kept.
+
+Usage:
+    python manage.py seed_data
+    python manage.py seed_data --reset  # delete all guide content first
 """
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.text import slugify
+from core.bulk import upsert_rows
+from core.management.mixins import ProfiledCommandMixin
+from core.profiling import phase
+from guide.content_sync import SYNC_KEYS
 from guide.models import (
     Region, City, Venue, MilitaryBase, Tunnel,
     VacationDestination, VendorUtility, Testimonial, TeamMember
 )
+from guide.services.stats_service import stats_service
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommandMixin, BaseCommand):
     help = 'Seeds the database with Hampton Roads relocation guide content'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Delete all existing guide content before seeding',
+        )
+        self.add_profile_argument(parser)
+
     def handle(self, *args, **options):
         self.stdout.write('Seeding database...')
 
-        # Clear existing data (optional - comment out if you want to preserve)
-        self.stdout.write('Clearing existing data...')
-        Venue.objects.all().delete()
-        VendorUtility.objects.all().delete()
-        MilitaryBase.objects.all().delete()
-        Tunnel.objects.all().delete()
-        VacationDestination.objects.all().delete()
-        Testimonial.objects.all().delete()
-        TeamMember.objects.all().delete()
-        City.objects.all().delete()
-        Region.objects.all().delete()
-
-        # Seed in order
-        self.seed_regions()
-        self.seed_cities()
-        self.seed_venues()
-        self.seed_military_bases()
-        self.seed_tunnels()
-        self.seed_vacation_destinations()
-        self.seed_vendor_utilities()
-        self.seed_testimonials()
-        self.seed_team_members()
-
+        with transaction.atomic():
+            if options['reset']:
+                self.stdout.write('Clearing existing data...')
+                Venue.objects.all().delete()
+                VendorUtility.objects.all().delete()
+                MilitaryBase.objects.all().delete()
+                Tunnel.objects.all().delete()
+                VacationDestination.objects.all().delete()
+                Testimonial.objects.all().delete()
+                TeamMember.objects.all().delete()
+                City.objects.all().delete()
+                Region.objects.all().delete()
+
+            # Seed in order
+            self.seed_regions()
+            self.seed_cities()
+            self.seed_venues()
+            self.seed_military_bases()
+            self.seed_tunnels()
+            self.seed_vacation_destinations()
+            self.seed_vendor_utilities()
+            self.seed_testimonials()
+            self.seed_team_members()
+
+        # Bulk writes don't send the signals that usually invalidate this
+        stats_service.invalidate()
         self.stdout.write(self.style.SUCCESS('Database seeded successfully!'))
 
+    def _seed(self, model, rows, label):
+        """Upsert rows keyed on the model's natural key and report the counts."""
+        has_slug = any(f.name == 'slug' for f in model._meta.fields)
+        if has_slug:
+            # model.save() would fill these in; bulk writes don't call it
+            rows = [row if row.get('slug') else {**row, 'slug': slugify(row['name'])} for row in rows]
+        with phase(label):
+            created, updated = upsert_rows(model, rows, SYNC_KEYS[model])
+        self.stdout.write(f'    {label}: {created} created, {updated} updated')
+
+    def _cities(self):
+        """Cities by slug (one query)."""
+        return {city.slug: city for city in City.objects.all()}
+
     def seed_regions(self):
         self.stdout.write('  Seeding regions...')
 
-        Region.objects.create(
-            name='Southside',
-            slug='southside',
-            description='The Southside of Hampton Roads includes Virginia Beach, Chesapeake, Norfolk, Portsmouth, Suffolk, and Smithfield - located south of the James River.',
-            order=1
-        )
-
-        Region.objects.create(
-            name='Peninsula',
-            slug='peninsula',
-            description='The Peninsula of Hampton Roads includes Hampton, Newport News, and Williamsburg/Yorktown - located north of the James River.',
-            order=2
-        )
+        regions_data = [
+            {
+                'name': 'Southside',
+                'slug': 'southside',
+                'description': 'The Southside of Hampton Roads includes Virginia Beach, Chesapeake, Norfolk, Portsmouth, Suffolk, and Smithfield - located south of the James River.',
+                'order': 1,
+            },
+            {
+                'name': 'Peninsula',
+                'slug': 'peninsula',
+                'description': 'The Peninsula of Hampton Roads includes Hampton, Newport News, and Williamsburg/Yorktown - located north of the James River.',
+                'order': 2,
+            },
+        ]
 
-        self.stdout.write(f'    Created {Region.objects.count()} regions')
+        self._seed(Region, regions_data, 'regions')
 
     def seed_cities(self):
         self.stdout.write('  Seeding cities...')
 
-        southside = Region.objects.get(slug='southside')
-        peninsula = Region.objects.get(slug='peninsula')
+        regions = {region.slug: region for region in Region.objects.all()}
+        southside = regions['southside']
+        peninsula = regions['peninsula']
 
         cities_data = [
             # Southside cities
@@ -143,24 +187,22 @@ class Command(BaseCommand):
             },
         ]
 
-        for city_data in cities_data:
-            City.objects.create(**city_data)
-
-        self.stdout.write(f'    Created {City.objects.count()} cities')
+        self._seed(City, cities_data, 'cities')
 
     def seed_venues(self):
         self.stdout.write('  Seeding venues...')
 
         # Get all cities
-        virginia_beach = City.objects.get(slug='virginia-beach')
-        chesapeake = City.objects.get(slug='chesapeake')
-        norfolk = City.objects.get(slug='norfolk')
-        portsmouth = City.objects.get(slug='portsmouth')
-        suffolk = City.objects.get(slug='suffolk')
-        smithfield = City.objects.get(slug='smithfield')
-        hampton = City.objects.get(slug='hampton')
-        newport_news = City.objects.get(slug='newport-news')
-        williamsburg = City.objects.get(slug='williamsburg-yorktown')
+        cities = self._cities()
+        virginia_beach = cities['virginia-beach']
+        chesapeake = cities['chesapeake']
+        norfolk = cities['norfolk']
+        portsmouth = cities['portsmouth']
+        suffolk = cities['suffolk']
+        smithfield = cities['smithfield']
+        hampton = cities['hampton']
+        newport_news = cities['newport-news']
+        williamsburg = cities['williamsburg-yorktown']
 
         venues_data = []
 
@@ -607,21 +649,18 @@ class Command(BaseCommand):
                 'name': beach['name'], 'address': beach['address']
             })
 
-        # Create all venues
-        for i, venue_data in enumerate(venues_data):
-            Venue.objects.create(order=i, **venue_data)
-
-        self.stdout.write(f'    Created {Venue.objects.count()} venues')
+        self._seed(Venue, [{**venue_data, 'order': i} for i, venue_data in enumerate(venues_data)], 'venues')
 
     def seed_military_bases(self):
         self.stdout.write('  Seeding military bases...')
 
-        norfolk = City.objects.get(slug='norfolk')
-        portsmouth = City.objects.get(slug='portsmouth')
-        virginia_beach = City.objects.get(slug='virginia-beach')
-        hampton = City.objects.get(slug='hampton')
-        newport_news = City.objects.get(slug='newport-news')
-        williamsburg = City.objects.get(slug='williamsburg-yorktown')
+        cities = self._cities()
+        norfolk = cities['norfolk']
+        portsmouth = cities['portsmouth']
+        virginia_beach = cities['virginia-beach']
+        hampton = cities['hampton']
+        newport_news = cities['newport-news']
+        williamsburg = cities['williamsburg-yorktown']
 
         bases_data = [
             # Navy
@@ -663,10 +702,7 @@ class Command(BaseCommand):
              'description': 'Located at Naval Weapons Station Yorktown.'},
         ]
 
-        for i, base_data in enumerate(bases_data):
-            MilitaryBase.objects.create(order=i, **base_data)
-
-        self.stdout.write(f'    Created {MilitaryBase.objects.count()} military bases')
+        self._seed(MilitaryBase, [{**base_data, 'order': i} for i, base_data in enumerate(bases_data)], 'military bases')
 
     def seed_tunnels(self):
         self.stdout.write('  Seeding tunnels...')
@@ -710,10 +746,7 @@ class Command(BaseCommand):
             },
         ]
 
-        for i, tunnel_data in enumerate(tunnels_data):
-            Tunnel.objects.create(order=i, **tunnel_data)
-
-        self.stdout.write(f'    Created {Tunnel.objects.count()} tunnels')
+        self._seed(Tunnel, [{**tunnel_data, 'order': i} for i, tunnel_data in enumerate(tunnels_data)], 'tunnels')
 
     def seed_vacation_destinations(self):
         self.stdout.write('  Seeding vacation destinations...')
@@ -789,10 +822,7 @@ class Command(BaseCommand):
             },
         ]
 
-        for i, dest_data in enumerate(destinations_data):
-            VacationDestination.objects.create(order=i, **dest_data)
-
-        self.stdout.write(f'    Created {VacationDestination.objects.count()} vacation destinations')
+        self._seed(VacationDestination, [{**dest_data, 'order': i} for i, dest_data in enumerate(destinations_data)], 'vacation destinations')
 
     def seed_vendor_utilities(self):
         self.stdout.write('  Seeding vendor utilities...')
@@ -866,12 +896,13 @@ class Command(BaseCommand):
             ],
         }
 
+        cities = self._cities()
+        utilities_data = []
         for city_slug, utilities in utilities_by_city.items():
-            city = City.objects.get(slug=city_slug)
             for i, utility_data in enumerate(utilities):
-                VendorUtility.objects.create(city=city, order=i, **utility_data)
+                utilities_data.append({**utility_data, 'city': cities[city_slug], 'order': i})
 
-        self.stdout.write(f'    Created {VendorUtility.objects.count()} vendor utilities')
+        self._seed(VendorUtility, utilities_data, 'vendor utilities')
 
     def seed_testimonials(self):
         self.stdout.write('  Seeding testimonials...')
@@ -914,10 +945,7 @@ class Command(BaseCommand):
             },
         ]
 
-        for i, testimonial_data in enumerate(testimonials_data):
-            Testimonial.objects.create(order=i, **testimonial_data)
-
-        self.stdout.write(f'    Created {Testimonial.objects.count()} testimonials')
+        self._seed(Testimonial, [{**testimonial_data, 'order': i} for i, testimonial_data in enumerate(testimonials_data)], 'testimonials')
 
     def seed_team_members(self):
         self.stdout.write('  Seeding team members...')
@@ -939,7 +967,4 @@ class Command(BaseCommand):
             },
         ]
 
-        for i, member_data in enumerate(team_data):
-            TeamMember.objects.create(order=i, **member_data)
-
-        self.stdout.write(f'    Created {TeamMember.objects.count()} team members')
+        self._seed(TeamMember, [{**member_data, 'order': i} for i, member_data in enumerate(team_data)], 'team members')
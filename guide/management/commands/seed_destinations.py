@@ -1,12 +1,17 @@
 """
 Seed DriveDestination data for the Drive Time Calculator.
 
+Idempotent: destinations are bulk upserted by slug in one transaction.
+
 Usage:
     python manage.py seed_destinations
     python manage.py seed_destinations --clear  # Clear existing and re-seed
 """
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.bulk import upsert_rows
+from core.management.mixins import ProfiledCommandMixin
 from guide.models import DriveDestination
 
 
@@ -374,7 +379,7 @@ DESTINATIONS = [
 ]
 
 
-class Command(BaseCommand):
+class Command(ProfiledCommandMixin, BaseCommand):
     help = 'Seed initial DriveDestination data for the Drive Time Calculator'
 
     def add_arguments(self, parser):
@@ -383,24 +388,15 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing destinations before seeding',
         )
+        self.add_profile_argument(parser)
 
     def handle(self, *args, **options):
-        if options['clear']:
-            deleted_count = DriveDestination.objects.all().delete()[0]
-            self.stdout.write(f'Cleared {deleted_count} existing destinations')
-
-        created_count = 0
-        updated_count = 0
+        with transaction.atomic():
+            if options['clear']:
+                deleted_count = DriveDestination.objects.all().delete()[0]
+                self.stdout.write(f'Cleared {deleted_count} existing destinations')
 
-        for dest_data in DESTINATIONS:
-            dest, created = DriveDestination.objects.update_or_create(
-                slug=dest_data['slug'],
-                defaults=dest_data
-            )
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
+            created_count, updated_count = upsert_rows(DriveDestination, DESTINATIONS, ['slug'])
 
         self.stdout.write(
             self.style.SUCCESS(
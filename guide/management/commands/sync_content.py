@@ -3,116 +3,432 @@ Content sync utilities for managing dev → prod data migration.
 
 Usage:
     # Export from dev
-    python manage.py sync_content --export --type=reference > reference_data.json
-    python manage.py sync_content --export --type=cms > cms_content.json
+    python manage.py sync_content --export --type=reference > reference_data.ndjson
+    python manage.py sync_content --export --type=cms > cms_content.ndjson
 
-    # Import to prod (after copying json file)
-    python manage.py sync_content --import reference_data.json
-    python manage.py sync_content --import cms_content.json --preview  # dry run
-    python manage.py sync_content --import cms_content.json
+    # Export only what changed since the last export (plus deletions)
+    python manage.py sync_content --export --type=cms --delta > cms_delta.ndjson
+
+    # Export what changed since a given time (doesn't move the watermarks)
+    python manage.py sync_content --export --type=cms --since=2025-06-01T00:00
+
+    # Import to prod (after copying the file)
+    python manage.py sync_content --import reference_data.ndjson
+    python manage.py sync_content --import cms_content.ndjson --preview  # dry run
+    python manage.py sync_content --import cms_content.ndjson
+
+    # Older single-document .json exports are still accepted by --import
 
 Content Types:
     reference - DriveDestination, AIModel, AIProvider, AIOperationConfig, Region
     cms       - City, Venue (base fields only), MilitaryBase, Tunnel,
                 VacationDestination, VendorUtility, Testimonial, TeamMember
     api       - Venue enrichment data (ratings, photos, hours) - NOT recommended to sync
+
+Format:
+    NDJSON, one JSON object per line, streamed in both directions so memory
+    stays flat however large the tables get. The first line is a file
+    header, then each model starts with a header record followed by one
+    line per row:
+
+        {"__format__": "sync_content", "version": 2, "type": "cms", "delta": false}
+        {"__model__": "City", "key": ["slug"], "count": 9}
+        {"name": "Norfolk", "slug": "norfolk", "region": "southside", ..., "__checksum__": "3f1c..."}
+        {"__deleted__": "old-city"}
+
+    Rows carry no database ids. Foreign keys are written as the related
+    row's natural key (a list for multi-field keys), and rows are matched
+    on their own natural key (guide.content_sync.SYNC_MODELS) when
+    imported, so a file can be imported into any database repeatedly.
+
+Delta sync:
+    Each --delta export records a per-model watermark (SyncWatermark) and
+    exports rows whose updated_at is past the previous one, and a
+    "__deleted__" line for each row deleted since (SyncTombstone, recorded
+    on delete); the first --delta for a model ships every row and every
+    tombstone. Only --delta moves the watermarks and prunes the tombstones
+    it shipped: a full export carries no deletions and a --since export
+    may not reach back far enough, so neither may drop them. Import
+    compares each row's checksum with the existing row and skips unchanged
+    rows without writing them, so updated_at (and anything cached on it)
+    only moves for rows that changed.
 """
 
 import json
 import sys
-from django.core.management.base import BaseCommand
-from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from core.bulk import upsert
+from core.management.mixins import ProfiledCommandMixin
+from core.profiling import phase
+from guide.content_sync import (
+    FORMAT, FORMAT_VERSION, SYNC_MODELS,
+    NaturalKeys, checksum, json_key, sync_fields,
+)
 from guide.models import (
     Region, City, Venue, MilitaryBase, Tunnel,
     VacationDestination, VendorUtility, Testimonial, TeamMember,
-    DriveDestination
+    DriveDestination, SyncTombstone, SyncWatermark
 )
+from guide.services.stats_service import stats_service
+from ai_services.model_selector import operation_configs
 from ai_services.models import AIProvider, AIModel, AIOperationConfig
 
 
-# Fields to EXCLUDE when syncing (API-fetched or auto-generated)
-VENUE_EXCLUDE_FIELDS = [
-    'google_place_id', 'rating', 'user_ratings_total', 'price_level',
-    'formatted_address', 'formatted_phone', 'website', 'latitude', 'longitude',
-    'hours_json', 'photos_json', 'last_enriched', 'enrichment_error'
-]
-
-
-class Command(BaseCommand):
+class Command(ProfiledCommandMixin, BaseCommand):
     help = 'Export or import content for dev/prod sync'
 
+    EXPORT_CHUNK_SIZE = 2000  # rows fetched per query while exporting
+    IMPORT_BATCH_SIZE = 500  # rows upserted per batch while importing
+
     def add_arguments(self, parser):
         parser.add_argument('--export', action='store_true', help='Export mode')
-        parser.add_argument('--import', dest='import_file', help='Import from JSON file')
+        parser.add_argument('--import', dest='import_file', help='Import from an NDJSON (or legacy JSON) file')
         parser.add_argument('--type', choices=['reference', 'cms', 'all'],
                           help='Content type to export')
+        parser.add_argument('--delta', action='store_true',
+                          help='Export only rows changed (and deleted) since the last export')
+        parser.add_argument('--since', type=str, default=None,
+                          help='Export only rows changed (and deleted) since this ISO datetime')
         parser.add_argument('--preview', action='store_true',
                           help='Preview import without making changes')
+        self.add_profile_argument(parser)
 
     def handle(self, *args, **options):
+        self.natural_keys = NaturalKeys()
         if options['export']:
-            self.export_content(options['type'])
+            if not options['type']:
+                raise CommandError('--export requires --type')
+            since = None
+            if options['since']:
+                if options['delta']:
+                    raise CommandError("--since and --delta can't be combined")
+                since = parse_datetime(options['since'])
+                if since is None:
+                    raise CommandError(f"Invalid --since datetime: {options['since']}")
+                if timezone.is_naive(since):
+                    since = timezone.make_aware(since)
+            self.export_content(options['type'], delta=options['delta'], since=since)
         elif options['import_file']:
             self.import_content(options['import_file'], options['preview'])
         else:
             self.stderr.write('Use --export or --import <file>')
 
-    def export_content(self, content_type):
-        """Export content to JSON (prints to stdout for redirection)."""
-        data = {'type': content_type, 'models': {}}
-
-        if content_type in ['reference', 'all']:
-            data['models']['Region'] = self._serialize_model(Region)
-            data['models']['DriveDestination'] = self._serialize_model(DriveDestination)
-            data['models']['AIProvider'] = self._serialize_model(AIProvider)
-            data['models']['AIModel'] = self._serialize_model(AIModel)
-            data['models']['AIOperationConfig'] = self._serialize_model(AIOperationConfig)
-
-        if content_type in ['cms', 'all']:
-            data['models']['City'] = self._serialize_model(City)
-            data['models']['Venue'] = self._serialize_model(
-                Venue, exclude_fields=VENUE_EXCLUDE_FIELDS
-            )
-            data['models']['MilitaryBase'] = self._serialize_model(MilitaryBase)
-            data['models']['Tunnel'] = self._serialize_model(Tunnel)
-            data['models']['VacationDestination'] = self._serialize_model(VacationDestination)
-            data['models']['VendorUtility'] = self._serialize_model(VendorUtility)
-            data['models']['Testimonial'] = self._serialize_model(Testimonial)
-            data['models']['TeamMember'] = self._serialize_model(TeamMember)
-
-        # Output JSON to stdout
-        print(json.dumps(data, indent=2, default=str))
-        self.stderr.write(self.style.SUCCESS(f'Exported {content_type} content'))
-
-    def _serialize_model(self, model, exclude_fields=None):
-        """Serialize a model's data to dict format."""
-        records = []
-        for obj in model.objects.all():
-            record = {}
-            for field in obj._meta.fields:
-                if exclude_fields and field.name in exclude_fields:
-                    continue
-                value = getattr(obj, field.name)
-                # Handle foreign keys
-                if field.is_relation and value is not None:
-                    if hasattr(value, 'slug'):
-                        record[f'{field.name}_slug'] = value.slug
-                    elif hasattr(value, 'pk'):
-                        record[f'{field.name}_id'] = value.pk
-                else:
-                    record[field.name] = value
-            records.append(record)
-        return records
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def _write(self, record):
+        sys.stdout.write(json.dumps(record, cls=DjangoJSONEncoder) + '\n')
+
+    def export_content(self, content_type, delta=False, since=None):
+        """
+        Stream content as NDJSON to stdout (for redirection).
+
+        With delta (per-model watermark) or since (one cutoff for all
+        models), only rows changed after the cutoff and tombstones recorded
+        after it are written.
+        """
+        # Taken before reading, so rows changed during the export are sent again next time
+        started_at = timezone.now()
+        exported = [m for m in SYNC_MODELS if content_type in (m[3], 'all')]
+        watermarks = {}
+        if delta:
+            watermarks = dict(SyncWatermark.objects.filter(
+                model_label__in=[label for label, *_ in exported]
+            ).values_list('model_label', 'exported_at'))
+
+        self._write({
+            '__format__': FORMAT, 'version': FORMAT_VERSION, 'type': content_type,
+            'delta': bool(delta or since), 'exported_at': started_at,
+        })
+
+        totals = {'rows': 0, 'deleted': 0}
+        for label, model, key_fields, _ in exported:
+            cutoff = watermarks.get(label) if delta else since
+            with phase(label):
+                rows, deleted = self._export_model(label, model, key_fields, cutoff, deletions=delta)
+            totals['rows'] += rows
+            totals['deleted'] += deleted
+
+        sys.stdout.flush()
+
+        if delta:
+            labels = [label for label, *_ in exported]
+            for label in labels:
+                SyncWatermark.objects.update_or_create(
+                    model_label=label, defaults={'exported_at': started_at}
+                )
+            # Shipped with this export; later deltas start after it
+            SyncTombstone.objects.filter(model_label__in=labels, deleted_at__lte=started_at).delete()
+
+        mode = 'delta ' if delta or since else ''
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {content_type} {mode}content ({totals['rows']} records, {totals['deleted']} deletions)"
+        ))
+
+    def _export_model(self, label, model, key_fields, cutoff, deletions=False):
+        """
+        Write one model's section. Returns (rows, deletions) written.
+
+        Tombstones are written after cutoff, or all of them with deletions
+        and no cutoff (a model's first delta export).
+        """
+        fields = sync_fields(label, model)
+        rows = model.objects.order_by('pk')
+        tombstones = []
+        if cutoff is not None:
+            rows = rows.filter(updated_at__gt=cutoff)
+        if cutoff is not None or deletions:
+            tombstones = self._live_tombstones(model, label, cutoff)
+
+        header = {'__model__': label, 'key': list(key_fields), 'count': rows.count()}
+        if cutoff is not None or deletions:
+            header.update(since=cutoff, deleted=len(tombstones))
+        self._write(header)
+
+        for key in tombstones:
+            self._write({'__deleted__': key})
+
+        count = 0
+        for row in rows.values_list(*[f.attname for f in fields]).iterator(chunk_size=self.EXPORT_CHUNK_SIZE):
+            record = self.natural_keys.serialize(fields, row)
+            record['__checksum__'] = checksum(record)
+            self._write(record)
+            count += 1
+        return count, len(tombstones)
+
+    def _live_tombstones(self, model, label, cutoff):
+        """Keys deleted after cutoff (ever, if None) that haven't been re-created since."""
+        keys = {}
+        deleted = SyncTombstone.objects.filter(model_label=label)
+        if cutoff is not None:
+            deleted = deleted.filter(deleted_at__gt=cutoff)
+        deleted = deleted.values_list('natural_key', flat=True)
+        for key in deleted:
+            keys[json_key(key)] = key
+        recreated = self.natural_keys.existing(model, keys)
+        return [key for hashable, key in keys.items() if hashable not in recreated]
+
+    # ------------------------------------------------------------------
+    # Import
+    # ------------------------------------------------------------------
 
     def import_content(self, filepath, preview=False):
-        """Import content from JSON file."""
+        """Import content from an NDJSON export (or a legacy JSON export)."""
         try:
             with open(filepath, 'r') as f:
-                data = json.load(f)
+                first_line = f.readline()
         except FileNotFoundError:
             self.stderr.write(self.style.ERROR(f'File not found: {filepath}'))
             return
 
+        try:
+            header = json.loads(first_line)
+        except ValueError:
+            header = None
+        if not isinstance(header, dict) or header.get('__format__') != FORMAT:
+            return self.import_legacy_json(filepath, preview)
+
+        kind = f"{header.get('type')} {'delta ' if header.get('delta') else ''}content"
+        self.stdout.write(f"\n{'PREVIEW MODE - ' if preview else ''}Importing {kind}\n")
+        self.stdout.write('=' * 50)
+
+        stats = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0, 'skipped': 0}
+        # Preview runs the real import and rolls it back, so its counts
+        # (and related-row resolution) match what a real import would do
+        with transaction.atomic():
+            with open(filepath, 'r') as f:
+                f.readline()
+                self._import_sections(f, stats)
+            if preview:
+                transaction.set_rollback(True)
+
+        # Bulk writes don't send the signals that usually invalidate these
+        if not preview:
+            stats_service.invalidate()
+            operation_configs.invalidate()
+
+        self.stdout.write('\n' + '=' * 50)
+        if preview:
+            self.stdout.write(self.style.WARNING('PREVIEW COMPLETE - No changes made'))
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would import' if preview else 'Import complete'}: "
+            f"{stats['created']} created, {stats['updated']} updated, {stats['unchanged']} unchanged, "
+            f"{stats['deleted']} deleted, {stats['skipped']} skipped"
+        ))
+
+    def _import_sections(self, lines, stats):
+        """Read records line by line, upserting each model's rows in batches."""
+        section = None
+        for line_no, line in enumerate(lines, start=2):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise CommandError(f'Line {line_no}: invalid JSON ({e})')
+
+            if '__model__' in record:
+                if section:
+                    self._end_section(section, stats)
+                section = self._start_section(record)
+                continue
+            if section is None:
+                raise CommandError(f'Line {line_no}: record before any model header')
+
+            if '__deleted__' in record:
+                section['deleted_keys'].append(json_key(record['__deleted__']))
+                continue
+
+            row_checksum = record.pop('__checksum__', None)
+            obj = self._build(section, record, line_no)
+            if obj is None:
+                section['skipped'] += 1
+                continue
+            section['batch'].append((obj, record, row_checksum))
+            if len(section['batch']) >= self.IMPORT_BATCH_SIZE:
+                self._flush(section)
+
+        if section:
+            self._end_section(section, stats)
+
+    def _start_section(self, header):
+        label = header['__model__']
+        entry = next((m for m in SYNC_MODELS if m[0] == label), None)
+        if entry is None:
+            raise CommandError(f'Unknown model in file: {label}')
+        _, model, key_fields, _ = entry
+        fields = {f.name: f for f in sync_fields(label, model)}
+
+        self.stdout.write(f"\n{label}: {header.get('count', '?')} records"
+                          + (f", {header['deleted']} deletions" if header.get('deleted') else ''))
+        return {
+            'label': label,
+            'model': model,
+            'key_fields': key_fields,
+            'fields': fields,
+            # Related rows are already imported (parents come first in the file)
+            'pk_lookups': {
+                name: self.natural_keys.pks(field.related_model)
+                for name, field in fields.items() if field.is_relation
+            },
+            'seen_fields': set(),
+            'ignored_fields': set(),
+            'batch': [],
+            'deleted_keys': [],
+            'created': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'deleted': 0,
+            'skipped': 0,
+        }
+
+    def _build(self, section, record, line_no):
+        """Model instance for a record, or None if a related row is missing."""
+        values = {}
+        for name, value in record.items():
+            field = section['fields'].get(name)
+            if field is None:
+                if name not in section['ignored_fields']:
+                    section['ignored_fields'].add(name)
+                    self.stderr.write(f"  Ignoring field not synced for {section['label']}: {name}")
+                continue
+            if field.is_relation:
+                if value is not None:
+                    key = json_key(value)
+                    value = section['pk_lookups'][name].get(key)
+                    if value is None:
+                        self.stderr.write(f"  Line {line_no}: {name} {key!r} not found, skipping")
+                        return None
+                values[field.attname] = value
+            else:
+                values[name] = value
+            section['seen_fields'].add(name)
+        return section['model'](**values)
+
+    def _unchanged(self, section, batch):
+        """
+        Indexes of batch rows whose checksum matches the existing row.
+
+        Existing rows are read in one query and serialized the same way
+        export does, limited to the fields the incoming record carries.
+        """
+        if not any(row_checksum for _, _, row_checksum in batch):
+            return set()
+
+        model = section['model']
+        key_attnames = [model._meta.get_field(name).attname for name in section['key_fields']]
+        fields = [f for name, f in section['fields'].items() if name in section['seen_fields']]
+        attnames = [f.attname for f in fields]
+        first_values = {getattr(obj, key_attnames[0]) for obj, _, _ in batch}
+
+        current = {}
+        rows = model.objects.order_by().filter(
+            **{f'{key_attnames[0]}__in': first_values}
+        ).values(*dict.fromkeys(key_attnames + attnames))
+        for row in rows:
+            key = tuple(row[name] for name in key_attnames)
+            current[key] = self.natural_keys.serialize(fields, [row[name] for name in attnames])
+
+        unchanged = set()
+        for index, (obj, record, row_checksum) in enumerate(batch):
+            existing = current.get(tuple(getattr(obj, name) for name in key_attnames))
+            if row_checksum and existing is not None:
+                existing = {name: value for name, value in existing.items() if name in record}
+                if checksum(existing) == row_checksum:
+                    unchanged.add(index)
+        return unchanged
+
+    def _flush(self, section):
+        batch, section['batch'] = section['batch'], []
+        if not batch:
+            return
+        with phase(section['label']):
+            unchanged = self._unchanged(section, batch)
+            section['unchanged'] += len(unchanged)
+            created, updated = upsert(
+                section['model'],
+                [obj for index, (obj, _, _) in enumerate(batch) if index not in unchanged],
+                unique_fields=section['key_fields'],
+                update_fields=sorted(section['seen_fields']),
+                batch_size=self.IMPORT_BATCH_SIZE,
+            )
+        section['created'] += created
+        section['updated'] += updated
+
+    def _delete(self, section):
+        """Delete rows named by the section's tombstones."""
+        if not section['deleted_keys']:
+            return
+        model = section['model']
+        with phase(f"{section['label']} deletions"):
+            existing = self.natural_keys.existing(model, section['deleted_keys'])
+            if existing:
+                model.objects.filter(pk__in=list(existing.values())).delete()
+        section['deleted'] += len(existing)
+
+    def _end_section(self, section, stats):
+        self._flush(section)
+        self._delete(section)
+        # Later sections resolve references to this model against its new rows
+        self.natural_keys.forget(section['model'])
+        for name in ('created', 'updated', 'unchanged', 'deleted', 'skipped'):
+            stats[name] += section[name]
+        self.stdout.write(
+            f"  {section['created']} created, {section['updated']} updated, "
+            f"{section['unchanged']} unchanged, {section['deleted']} deleted, {section['skipped']} skipped"
+        )
+
+    def import_legacy_json(self, filepath, preview=False):
+        """Import content from a single-document JSON export (pre-NDJSON format)."""
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+
         content_type = data.get('type', 'unknown')
         models_data = data.get('models', {})
 
@@ -0,0 +1,205 @@
+"""
+Management Command Mixins
+
+Shared options for the venue enrichment commands.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from guide.models import EnrichmentRun
+from guide.services.sharding import Shard
+
+
+class ResumableRunMixin:
+    """
+    Record a command's progress in an EnrichmentRun and add --resume.
+
+    Every non-dry run gets a run record. --resume continues the latest
+    unfinished run (or --resume=ID) with the options it was started with,
+    skipping venues its cursor already covers.
+    """
+    run_command = None  # EnrichmentRun.command value
+    run_options = ()  # option names saved with the run and restored on resume
+
+    def add_resume_argument(self, parser):
+        parser.add_argument(
+            '--resume',
+            nargs='?',
+            type=int,
+            const=0,
+            default=None,
+            metavar='RUN_ID',
+            help='Continue the latest unfinished run (or RUN_ID) where it stopped, '
+                 'with its original options',
+        )
+
+    def start_run(self, options) -> Optional[EnrichmentRun]:
+        """Resume or create the run; on resume, options are replaced by the saved ones."""
+        if options['resume'] is None:
+            if options['dry_run']:
+                return None
+            return EnrichmentRun.objects.create(
+                command=self.run_command,
+                provider=options['provider'],
+                options={name: options[name] for name in self.run_options},
+            )
+
+        if options['dry_run']:
+            raise CommandError("--resume can't be combined with --dry-run")
+        run = EnrichmentRun.resumable(self.run_command, options['resume'] or None, options.get('shard'))
+        if run is None:
+            raise CommandError(f"No unfinished {self.run_command} run to resume")
+
+        options.update(run.options)
+        options['provider'] = run.provider
+        run.status = 'running'
+        run.stop_reason = ''
+        run.finished_at = None
+        run.save(update_fields=['status', 'stop_reason', 'finished_at', 'updated_at'])
+
+        saved = ', '.join(f"{k}={v}" for k, v in run.options.items() if v not in (None, False))
+        self.stdout.write(self.style.NOTICE(
+            f"Resuming run #{run.pk} from {run.created_at:%Y-%m-%d %H:%M} ({saved or 'defaults'})"
+        ))
+        if run.stats:
+            done = ', '.join(f"{k}: {v}" for k, v in sorted(run.stats.items()))
+            self.stdout.write(f"Already done: {done}")
+        return run
+
+    @contextmanager
+    def tracking_run(self, run: Optional[EnrichmentRun]):
+        """Mark the run finished when the block exits (completed unless stopped earlier)."""
+        if run is None:
+            yield
+            return
+        try:
+            yield
+        except KeyboardInterrupt:
+            # Batch writers flush on the way out, so the cursor is safe to keep
+            run.finish('stopped', 'Interrupted')
+            raise
+        except Exception as e:
+            run.finish('failed', str(e)[:255], save_progress=False)
+            raise
+        if run.status == 'running':
+            run.finish('completed')
+
+    def write_run_footer(self, run: Optional[EnrichmentRun]):
+        if run is None:
+            return
+        self.stdout.write(f"Run #{run.pk}: {run.get_status_display()}"
+                          + (f" ({run.stop_reason})" if run.stop_reason else ""))
+        if run.status != 'completed':
+            shard = f" --shard={run.options['shard']}" if run.options.get('shard') else ''
+            self.stdout.write(f"Continue with: python manage.py {run.get_command_display()}{shard} --resume")
+
+
+class ShardedCommandMixin:
+    """
+    Add --shard i/N and --workers K.
+
+    --shard runs one deterministic slice of the work (see
+    guide.services.sharding), for splitting a run across hosts. --workers
+    runs the command in K subprocesses, one per sub-shard of --shard (or
+    of everything), with their output prefixed by shard.
+    """
+
+    # Django's own options, handled through the environment instead
+    NOT_FORWARDED = ('settings', 'pythonpath', 'skip_checks', 'workers', 'shard')
+
+    def add_shard_arguments(self, parser):
+        parser.add_argument(
+            '--shard',
+            type=str,
+            default=None,
+            metavar='I/N',
+            help='Only process shard I of N (zero-based, e.g. 0/4), by hash of venue id',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Split the run across this many worker processes (default: 1)',
+        )
+
+    def parse_shard(self, options) -> Optional[Shard]:
+        try:
+            return Shard.parse(options['shard'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+    def _command_name(self) -> str:
+        return self.__module__.rsplit('.', 1)[-1]
+
+    def forward_arguments(self, options) -> list:
+        """Command-line arguments reproducing `options` (non-default values only)."""
+        parser = self.create_parser('manage.py', self._command_name())
+        args = []
+        for action in parser._actions:
+            if not action.option_strings or action.dest in self.NOT_FORWARDED:
+                continue
+            value = options.get(action.dest, action.default)
+            if value == action.default or value is None:
+                continue
+            flag = max(action.option_strings, key=len)
+            if isinstance(action, argparse._StoreTrueAction) or (action.nargs == '?' and value == action.const):
+                args.append(flag)
+            else:
+                args.append(f'{flag}={value}')
+        return args
+
+    def run_workers(self, options):
+        """Run the command in --workers subprocesses and wait for them."""
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers must be at least 1')
+        if options.get('resume'):
+            raise CommandError("--resume RUN_ID can't be combined with --workers; "
+                               "use --resume to continue every shard's latest run")
+
+        shard = self.parse_shard(options) or Shard(0, 1)
+        base = [sys.executable, str(settings.BASE_DIR / 'manage.py'), self._command_name()]
+        base += self.forward_arguments(options)
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+
+        lock = threading.Lock()
+
+        def pump(sub, stream):
+            for line in stream:
+                with lock:
+                    self.stdout.write(f"[{sub}] {line.rstrip()}")
+
+        self.stdout.write(f"Starting {workers} workers for shard {shard}")
+        procs = []
+        for sub in shard.split(workers):
+            proc = subprocess.Popen(
+                base + [f'--shard={sub}'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                env=env,
+                cwd=settings.BASE_DIR,
+            )
+            thread = threading.Thread(target=pump, args=(sub, proc.stdout), daemon=True)
+            thread.start()
+            procs.append((sub, proc, thread))
+
+        failed = []
+        for sub, proc, thread in procs:
+            proc.wait()
+            thread.join()
+            if proc.returncode:
+                failed.append(f"{sub} (exit {proc.returncode})")
+
+        if failed:
+            raise CommandError(f"Workers failed: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS(f"All {workers} workers finished"))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_last_enriched(apps, schema_editor):
+    """Existing enrichments were full refreshes, so start the static clock there."""
+    Venue = apps.get_model('guide', 'Venue')
+    Venue.objects.filter(last_enriched_at__isnull=False).update(
+        static_refreshed_at=F('last_enriched_at')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guide', '0006_drivedestination'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='static_refreshed_at',
+            field=models.DateTimeField(blank=True, help_text='When address, phone, website and photos were last refreshed', null=True),
+        ),
+        migrations.RunPython(copy_last_enriched, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guide', '0007_venue_static_refreshed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='rating_volatility',
+            field=models.FloatField(default=0, help_text='Moving average of rating change per refresh'),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='view_score',
+            field=models.FloatField(default=0, help_text='Decayed page/photo view count, used for refresh priority'),
+        ),
+        migrations.CreateModel(
+            name='VenueRefreshPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('plan_date', models.DateField(db_index=True)),
+                ('window', models.PositiveSmallIntegerField(help_text='Time window of the day this refresh is scheduled for')),
+                ('score', models.FloatField(default=0)),
+                ('tier', models.CharField(choices=[('volatile', 'Volatile (ratings, hours)'), ('static', 'Static (full record)')], default='volatile', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='refresh_plan_entries', to='guide.venue')),
+            ],
+            options={
+                'verbose_name': 'Venue Refresh Plan Entry',
+                'verbose_name_plural': 'Venue Refresh Plan',
+                'ordering': ['plan_date', 'window', '-score'],
+                'indexes': [models.Index(fields=['plan_date', 'status', 'window'], name='guide_venue_plan_da_15dd92_idx')],
+                'constraints': [models.UniqueConstraint(fields=('plan_date', 'venue'), name='unique_refresh_plan_venue')],
+            },
+        ),
+    ]
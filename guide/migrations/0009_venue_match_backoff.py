@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guide', '0008_venue_refresh_plan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='match_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='match_query_fingerprint',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='next_match_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guide', '0009_venue_match_backoff'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnrichmentRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('command', models.CharField(choices=[('enrich', 'enrich_venues'), ('refresh', 'refresh_venues')], max_length=20)),
+                ('provider', models.CharField(default='google', max_length=20)),
+                ('options', models.JSONField(blank=True, default=dict, help_text='Command options, reused on resume')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('stopped', 'Stopped'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('stop_reason', models.CharField(blank=True, max_length=255)),
+                ('cursor', models.JSONField(blank=True, default=dict)),
+                ('discovered', models.JSONField(blank=True, default=list, help_text='city_id:venue_type pairs already discovered')),
+                ('stats', models.JSONField(blank=True, default=dict)),
+                ('last_checkpoint_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Enrichment Run',
+                'verbose_name_plural': 'Enrichment Runs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
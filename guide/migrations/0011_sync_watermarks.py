@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-18 21:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guide', '0010_enrichment_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('model_label', models.CharField(max_length=50, unique=True)),
+                ('exported_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Sync Watermark',
+                'verbose_name_plural': 'Sync Watermarks',
+                'ordering': ['model_label'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=50)),
+                ('natural_key', models.JSONField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['deleted_at'],
+                'indexes': [models.Index(fields=['model_label', 'deleted_at'], name='guide_synct_model_l_978cda_idx')],
+            },
+        ),
+    ]
@@ -6,6 +6,8 @@ These are single-tenant (shared) models - not scoped per account.
 All models inherit from BaseModel for timestamps.
 """
 
+import threading
+
 from django.db import models
 from django.utils.text import slugify
 from core.models import BaseModel
@@ -197,6 +199,26 @@ class Venue(BaseModel):
         default='manual'
     )
     last_enriched_at = models.DateTimeField(null=True, blank=True)
+    static_refreshed_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="When address, phone, website and photos were last refreshed"
+    )
+
+    # Refresh scheduling signals
+    view_score = models.FloatField(
+        default=0,
+        help_text="Decayed page/photo view count, used for refresh priority"
+    )
+    rating_volatility = models.FloatField(
+        default=0,
+        help_text="Moving average of rating change per refresh"
+    )
+
+    # Negative match backoff: unmatched venues aren't searched again until
+    # next_match_attempt_at unless their name/address (fingerprint) changes
+    match_attempts = models.PositiveSmallIntegerField(default=0)
+    next_match_attempt_at = models.DateTimeField(null=True, blank=True)
+    match_query_fingerprint = models.CharField(max_length=40, blank=True)
     enrichment_status = models.CharField(
         max_length=20,
         choices=ENRICHMENT_STATUS_CHOICES,
@@ -502,19 +524,93 @@ class VenueAPIConfig(BaseModel):
         verbose_name = "Venue API Configuration"
         verbose_name_plural = "Venue API Configurations"
 
+    # What quota gating reads; see refresh_quota()
+    QUOTA_FIELDS = ['is_enabled', 'daily_quota', 'requests_today', 'quota_reset_date']
+
     def __str__(self):
         status = "enabled" if self.is_enabled else "disabled"
         return f"{self.get_provider_display()} ({status})"
 
-    def increment_requests(self):
-        """Increment the daily request counter, resetting if needed."""
+    def refresh_quota(self):
+        """
+        Re-read the enabled flag and today's usage from the database.
+
+        Configs from the registry (guide.services.api_configs) can be
+        minutes old; call this before deciding whether a provider may be
+        used.
+        """
+        self.refresh_from_db(fields=self.QUOTA_FIELDS)
+
+    def _roll_quota_day(self):
+        """Reset the counter in the DB on the first call of a new day."""
         from django.utils import timezone
         today = timezone.now().date()
+        VenueAPIConfig.objects.filter(
+            pk=self.pk, quota_reset_date__lt=today
+        ).update(requests_today=0, quota_reset_date=today)
         if self.quota_reset_date != today:
             self.requests_today = 0
             self.quota_reset_date = today
-        self.requests_today += 1
-        self.save(update_fields=['requests_today', 'quota_reset_date'])
+        return today
+
+    def increment_requests(self, count=1):
+        """
+        Record API calls against today's quota.
+
+        Uses a single F() UPDATE so concurrent processes (CMS sync and the
+        refresh timer) never lose counts.
+        """
+        from django.db.models import F
+        today = self._roll_quota_day()
+        VenueAPIConfig.objects.filter(
+            pk=self.pk, quota_reset_date=today
+        ).update(requests_today=F('requests_today') + count)
+        self.requests_today += count
+
+    def reserve_requests(self, units=1, partial=False):
+        """
+        Atomically reserve quota units for upcoming API calls.
+
+        The reservation is a single UPDATE guarded by the daily limit, so
+        concurrent workers can never reserve past daily_quota between them.
+
+        Args:
+            units: Number of API calls to reserve
+            partial: If True, settle for whatever is left (down to 1 unit)
+
+        Returns:
+            QuotaReservation to commit or refund, or None if out of quota
+        """
+        from django.db.models import F
+        today = self._roll_quota_day()
+
+        while units > 0:
+            reserved = VenueAPIConfig.objects.filter(
+                pk=self.pk,
+                quota_reset_date=today,
+                requests_today__lte=F('daily_quota') - units,
+            ).update(requests_today=F('requests_today') + units)
+            if reserved:
+                self.requests_today += units
+                return QuotaReservation(self, units, today)
+            if not partial:
+                return None
+            # Someone else may have spent quota; size the request to what's left
+            self.refresh_from_db(fields=['requests_today', 'daily_quota', 'quota_reset_date'])
+            units = min(units, self.quota_remaining)
+        return None
+
+    def refund_requests(self, units, day):
+        """Return unused reserved units, if the quota day hasn't rolled over."""
+        from django.db.models import F, Value
+        from django.db.models.functions import Greatest
+        if units <= 0:
+            return
+        VenueAPIConfig.objects.filter(
+            pk=self.pk, quota_reset_date=day
+        ).update(requests_today=Greatest(F('requests_today') - units, Value(0)))
+        if self.quota_reset_date == day:
+            self.requests_today = max(0, self.requests_today - units)
 
     @property
     def quota_remaining(self):
@@ -531,6 +627,238 @@ class VenueAPIConfig(BaseModel):
         return self.quota_remaining > 0
 
 
+class QuotaReservation:
+    """
+    Quota units reserved up front by VenueAPIConfig.reserve_requests().
+
+    Callers consume units with use() and finish with commit(), which refunds
+    whatever wasn't used, or refund() to give everything back. Works as a
+    context manager that commits on exit.
+    """
+
+    def __init__(self, config, units, day):
+        self.config = config
+        self.units = units
+        self.day = day
+        self.used = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"QuotaReservation({self.config.provider}, {self.used}/{self.units})"
+
+    @property
+    def remaining(self):
+        return self.units - self.used
+
+    def use(self, count=1):
+        """Consume reserved units. Returns False if not enough remain."""
+        with self._lock:
+            if self.closed or self.used + count > self.units:
+                return False
+            self.used += count
+            return True
+
+    def commit(self, used=None):
+        """Keep the used units and refund the rest."""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            if used is not None:
+                self.used = min(used, self.units)
+            unused = self.units - self.used
+        self.config.refund_requests(unused, self.day)
+
+    def refund(self):
+        """Give back every unit of the reservation."""
+        self.commit(used=0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.commit()
+        return False
+
+
+class VenueRefreshPlan(BaseModel):
+    """
+    One venue's slot in a day's refresh plan.
+
+    The scheduler ranks venues once per day, spreads the day's refresh
+    budget across time windows and stores the plan here, so each timer
+    run only processes its due, still-pending entries.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    TIER_CHOICES = [
+        ('volatile', 'Volatile (ratings, hours)'),
+        ('static', 'Static (full record)'),
+    ]
+
+    plan_date = models.DateField(db_index=True)
+    window = models.PositiveSmallIntegerField(
+        help_text="Time window of the day this refresh is scheduled for"
+    )
+    venue = models.ForeignKey(
+        Venue,
+        on_delete=models.CASCADE,
+        related_name='refresh_plan_entries'
+    )
+    score = models.FloatField(default=0)
+    tier = models.CharField(max_length=10, choices=TIER_CHOICES, default='volatile')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['plan_date', 'window', '-score']
+        verbose_name = "Venue Refresh Plan Entry"
+        verbose_name_plural = "Venue Refresh Plan"
+        constraints = [
+            models.UniqueConstraint(fields=['plan_date', 'venue'], name='unique_refresh_plan_venue'),
+        ]
+        indexes = [
+            models.Index(fields=['plan_date', 'status', 'window']),
+        ]
+
+    def __str__(self):
+        return f"{self.plan_date} w{self.window}: {self.venue_id} ({self.status})"
+
+
+class EnrichmentRun(BaseModel):
+    """
+    Progress record for an enrich_venues or refresh_venues run.
+
+    The cursor holds, per "city_id:venue_type", the highest venue id
+    below which every selected venue has been processed and written, plus
+    the city/type pairs whose discovery search has finished. A run that
+    stopped (quota, Ctrl-C, crash) can be resumed with --resume and skips
+    everything the cursor covers.
+    """
+    COMMAND_CHOICES = [
+        ('enrich', 'enrich_venues'),
+        ('refresh', 'refresh_venues'),
+    ]
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('stopped', 'Stopped'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    RESUMABLE_STATUSES = ('running', 'stopped', 'failed')
+
+    command = models.CharField(max_length=20, choices=COMMAND_CHOICES)
+    provider = models.CharField(max_length=20, default='google')
+    options = models.JSONField(default=dict, blank=True, help_text="Command options, reused on resume")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    stop_reason = models.CharField(max_length=255, blank=True)
+    cursor = models.JSONField(default=dict, blank=True)
+    discovered = models.JSONField(default=list, blank=True, help_text="city_id:venue_type pairs already discovered")
+    stats = models.JSONField(default=dict, blank=True)
+    last_checkpoint_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Enrichment Run"
+        verbose_name_plural = "Enrichment Runs"
+
+    def __str__(self):
+        return f"{self.get_command_display()} #{self.pk} ({self.status})"
+
+    @classmethod
+    def resumable(cls, command: str, run_id=None, shard=None):
+        """
+        The run to resume: the given one, or the latest unfinished one
+        (of the same shard, e.g. "0/4", when sharded).
+        """
+        runs = cls.objects.filter(command=command, status__in=cls.RESUMABLE_STATUSES)
+        if run_id:
+            return runs.filter(pk=run_id).first()
+        if shard:
+            return runs.filter(options__shard=shard).first()
+        return runs.filter(options__shard__isnull=True).first()
+
+    @staticmethod
+    def cursor_key(city_id, venue_type: str) -> str:
+        return f"{city_id}:{venue_type}"
+
+    def exclude_processed(self, queryset):
+        """Drop venues at or below the cursor for their city and type."""
+        processed = models.Q(pk__in=[])
+        for key, last_id in self.cursor.items():
+            city_id, venue_type = key.split(':', 1)
+            processed |= models.Q(city_id=city_id, venue_type=venue_type, pk__lte=last_id)
+        return queryset.exclude(processed)
+
+    def bump(self, stat: str, count: int = 1):
+        self.stats[stat] = self.stats.get(stat, 0) + count
+
+    def checkpoint(self):
+        """Persist cursor and stats."""
+        from django.utils import timezone
+        self.last_checkpoint_at = timezone.now()
+        self.save(update_fields=['cursor', 'discovered', 'stats', 'last_checkpoint_at', 'updated_at'])
+
+    def finish(self, status: str, reason: str = '', save_progress: bool = True):
+        """
+        Close the run. Pass save_progress=False when writes may not have
+        been flushed, so the saved cursor can't get ahead of the data.
+        """
+        from django.utils import timezone
+        self.status = status
+        self.stop_reason = reason
+        self.finished_at = timezone.now()
+        if save_progress:
+            self.save()
+        else:
+            self.save(update_fields=['status', 'stop_reason', 'finished_at', 'updated_at'])
+
+
+class SyncWatermark(BaseModel):
+    """
+    When each model was last exported by sync_content.
+
+    A --delta export ships only rows whose updated_at is past the model's
+    watermark, plus tombstones recorded since then.
+    """
+    model_label = models.CharField(max_length=50, unique=True)
+    exported_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['model_label']
+        verbose_name = "Sync Watermark"
+        verbose_name_plural = "Sync Watermarks"
+
+    def __str__(self):
+        return f"{self.model_label} @ {self.exported_at:%Y-%m-%d %H:%M}"
+
+
+class SyncTombstone(models.Model):
+    """
+    A deleted content row, kept so delta syncs can delete it downstream.
+
+    Rows are identified by sync_content's natural key, since database ids
+    differ between environments. Pruned once a delta export has shipped them.
+    """
+    model_label = models.CharField(max_length=50)
+    natural_key = models.JSONField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['model_label', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} {self.natural_key} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
 class DriveDestination(BaseModel):
     """
     Preset destinations for the Drive Time Calculator.
@@ -10,6 +10,7 @@ from .weather_service import WeatherService, weather_service
 from .trends_service import TrendsService, trends_service
 from .headlines_service import HeadlinesService, headlines_service
 from .pulse_service import PulseService, pulse_service
+from .stats_service import ContentStatsService, stats_service
 
 __all__ = [
     'GooglePlacesService',
@@ -22,4 +23,6 @@ __all__ = [
     'headlines_service',
     'PulseService',
     'pulse_service',
+    'ContentStatsService',
+    'stats_service',
 ]
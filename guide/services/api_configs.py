@@ -0,0 +1,35 @@
+"""
+Venue API Configs
+
+VenueAPIConfig rows served from an in-process registry (see
+core.config_registry) instead of a query per lookup. Loaded in one query
+and reloaded when a config is saved (the CMS toggle and settings views).
+
+Lookups return a private copy, so reserve_requests()/increment_requests()
+bookkeeping on one caller's instance never leaks into the shared table.
+The copy's requests_today (and is_enabled) is as of the last load: quota
+itself is enforced by the atomic UPDATE in reserve_requests(), which
+doesn't rely on it, and gating checks call refresh_quota() first. Save a
+copy only with update_fields, or its stale counters overwrite the row.
+"""
+
+import copy
+from typing import Dict, Optional
+
+from core.config_registry import ConfigRegistry
+from guide.models import VenueAPIConfig
+
+
+def _load_api_configs() -> Dict[str, VenueAPIConfig]:
+    return {config.provider: config for config in VenueAPIConfig.objects.all()}
+
+
+api_configs = ConfigRegistry('venue_api_configs', _load_api_configs, watched_models=(VenueAPIConfig,))
+
+
+def get_api_config(provider: str, enabled_only: bool = False) -> Optional[VenueAPIConfig]:
+    """A copy of the provider's config, or None (also if disabled, with enabled_only)."""
+    config = api_configs.get(provider)
+    if config is None or (enabled_only and not config.is_enabled):
+        return None
+    return copy.copy(config)
@@ -0,0 +1,63 @@
+"""
+API Call Meter
+
+Counts the provider API calls actually sent inside a block of code, so
+quota reserved up front for a worst-case estimate (every search page,
+every Google type) can be settled against what was really spent.
+
+Provider services call record_call() just before each HTTP request to a
+paid API - never for a response served from a cache. The meter lives in
+a context variable, so calls made on threads started with
+contextvars.copy_context() (per-type searches, composite fan-out) are
+counted by the enclosing block. Blocks nest: a call counts in every
+enclosing meter.
+
+Usage:
+    with metered() as meter:
+        service.search_nearby(...)
+    meter.count('google')
+"""
+
+import contextvars
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+_meter = contextvars.ContextVar('api_call_meter', default=None)
+
+
+class CallMeter:
+    """API calls recorded per provider inside one metered() block."""
+
+    def __init__(self, parent: 'CallMeter' = None):
+        self.parent = parent
+        self._calls = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, count: int = 1):
+        with self._lock:
+            self._calls[provider] += count
+        if self.parent is not None:
+            self.parent.record(provider, count)
+
+    def count(self, provider: str) -> int:
+        with self._lock:
+            return self._calls[provider]
+
+
+@contextmanager
+def metered():
+    """Count API calls made in this block (and threads copying its context)."""
+    meter = CallMeter(parent=_meter.get())
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+
+
+def record_call(provider: str, count: int = 1):
+    """Count a paid API request against the enclosing metered() block, if any."""
+    meter = _meter.get()
+    if meter is not None:
+        meter.record(provider, count)
@@ -0,0 +1,176 @@
+"""
+Composite Venue Service
+
+Fans match and detail lookups out to several providers (Google Places
+and Yelp) concurrently and merges the results field by field, so a
+lookup takes as long as the slowest provider rather than the sum, and
+one provider fills the gaps in the other.
+"""
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any
+
+from .base_venue_service import BaseVenueService
+from .call_meter import metered
+
+logger = logging.getLogger(__name__)
+
+
+class CompositeVenueService(BaseVenueService):
+    """
+    Merge venue data from several providers.
+
+    Providers are given in priority order; the first is the primary
+    provider (its ids drive refresh selection and discovery searches).
+    For each field the value comes from the first provider in
+    FIELD_PRECEDENCE (or the provider order) that returned a non-empty
+    value. API calls per provider (cache hits excluded) are counted so the
+    caller can charge secondary providers' quotas.
+    """
+
+    # Per-field source order; fields not listed follow the provider order
+    FIELD_PRECEDENCE = {
+        'google_place_id': ('google',),
+        'yelp_business_id': ('yelp',),
+        'photos_json': ('google',),
+        'website': ('google',),
+        'rating': ('google', 'yelp'),
+        'rating_count': ('google', 'yelp'),
+        'price_level': ('google', 'yelp'),
+        'hours_json': ('google', 'yelp'),
+        'phone': ('google', 'yelp'),
+        'address': ('google', 'yelp'),
+    }
+
+    def __init__(self, providers: List[BaseVenueService]):
+        """
+        Args:
+            providers: Provider services in priority order (at least one)
+        """
+        if not providers:
+            raise ValueError("CompositeVenueService needs at least one provider")
+        self.providers = {p.provider_name: p for p in providers}
+        self.order = [p.provider_name for p in providers]
+        self._calls = {name: 0 for name in self.order}
+        self._lock = threading.Lock()
+        self.VENUE_TYPE_MAP = providers[0].VENUE_TYPE_MAP
+
+    @property
+    def provider_name(self) -> str:
+        return 'composite'
+
+    @property
+    def primary(self) -> str:
+        return self.order[0]
+
+    def drain_call_counts(self) -> Dict[str, int]:
+        """API calls made per provider since the last drain."""
+        with self._lock:
+            counts, self._calls = self._calls, {name: 0 for name in self.order}
+        return counts
+
+    def _fan_out(self, calls: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Run {provider: callable} concurrently; failures become None."""
+        def run(name):
+            with metered() as meter:
+                try:
+                    return calls[name]()
+                except Exception as e:
+                    logger.error(f"{name} lookup failed: {e}")
+                    return None
+                finally:
+                    with self._lock:
+                        self._calls[name] += meter.count(name)
+
+        names = [name for name in self.order if name in calls]
+        if len(names) == 1:
+            return {names[0]: run(names[0])}
+        with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix='venue-fanout') as pool:
+            # Copy the context per task so an enclosing deadline() applies
+            futures = [pool.submit(contextvars.copy_context().run, run, name) for name in names]
+            return {name: future.result() for name, future in zip(names, futures)}
+
+    def merge(self, results: Dict[str, Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Combine normalized provider results with per-field precedence."""
+        results = {name: data for name, data in results.items() if data}
+        if not results:
+            return None
+
+        merged: Dict[str, Any] = {}
+        sources: Dict[str, str] = {}
+        fields = {field for data in results.values() for field in data}
+        for field in fields:
+            for name in self.FIELD_PRECEDENCE.get(field, self.order):
+                value = results.get(name, {}).get(field)
+                if value not in (None, '', [], {}):
+                    merged[field] = value
+                    sources[field] = name
+                    break
+        merged['_sources'] = sources
+        return merged
+
+    def search_nearby(
+        self,
+        city_name: str,
+        state: str = 'VA',
+        venue_type: str = 'restaurant',
+        limit: int = 20,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        Search with the primary provider only.
+
+        Search results from different providers can't be merged without
+        entity resolution, so discovery stays single-provider.
+        """
+        return self.providers[self.primary].search_nearby(
+            city_name=city_name, state=state, venue_type=venue_type, limit=limit, **kwargs
+        )
+
+    def estimate_search_calls(self, venue_type: str, limit: int = 20, nearby: bool = False) -> int:
+        estimate = getattr(self.providers[self.primary], 'estimate_search_calls', None)
+        return estimate(venue_type, limit, nearby=nearby) if estimate else 1
+
+    def get_place_details(
+        self,
+        place_id: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        tier: str = 'static',
+        ids: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch details from every provider the venue has an id for.
+
+        Args:
+            place_id: Primary provider's id (used if ids isn't given)
+            fields: Passed through to each provider
+            tier: Field tier passed through to each provider
+            ids: Provider name -> id (e.g. {'google': ..., 'yelp': ...})
+        """
+        ids = ids or {self.primary: place_id}
+        calls = {
+            name: (lambda name=name: self.providers[name].get_place_details(
+                ids[name], fields=fields, tier=tier))
+            for name in self.order if ids.get(name)
+        }
+        if not calls:
+            return None
+        return self.merge(self._fan_out(calls))
+
+    def find_match(
+        self,
+        name: str,
+        address: str,
+        city_name: str,
+        state: str = 'VA'
+    ) -> Optional[Dict[str, Any]]:
+        """Search every provider for the venue and merge what matches."""
+        calls = {
+            provider: (lambda provider=provider: self.providers[provider].find_match(
+                name=name, address=address, city_name=city_name, state=state))
+            for provider in self.order
+        }
+        return self.merge(self._fan_out(calls))
@@ -0,0 +1,333 @@
+"""
+Enrichment Pipeline
+
+Two-stage pipeline used by VenueEnrichmentService for batch runs:
+
+- Fetch stage: a bounded worker pool making the (blocking) provider API calls
+- Write stage: the calling thread applying results to the database
+
+A QuotaGovernor shared by the workers enforces the day's remaining quota
+and a client-side QPS ceiling, and stops the run gracefully once the
+budget is spent. Fetch functions must not touch the database - all DB
+work happens in the write stage on the caller's thread.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.db import connections
+
+from core.http_client import deadline
+from core.profiling import phase
+
+from .call_meter import metered
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaGovernor:
+    """
+    API budget and rate governor shared by pipeline workers.
+
+    The pipeline reserves units for each item before submitting it and
+    workers pace themselves to max_qps before calling the API. Once the
+    budget is spent (or stop() is called) every further reservation fails
+    and the pipeline drains in-flight work and stops.
+
+    With a VenueAPIConfig, the budget is drawn from the shared daily quota
+    in blocks of block_size via atomic reservations, so concurrent runs
+    can't overspend and the quota row is written once per block rather
+    than once per call. Items reserved at a worst-case estimate are
+    settled to the calls they really made (settle()), and close() refunds
+    whatever wasn't used.
+    """
+
+    def __init__(
+        self,
+        budget: int = 0,
+        max_qps: Optional[float] = None,
+        config=None,
+        block_size: int = 10,
+    ):
+        """
+        Args:
+            budget: Fixed API call budget (ignored when config is given)
+            max_qps: Optional ceiling on calls per second across all workers
+            config: VenueAPIConfig to reserve quota from
+            block_size: Units reserved from config at a time
+        """
+        self.config = config
+        self.block_size = max(1, block_size)
+        self.budget = 0 if config is not None else max(0, budget)
+        self.max_qps = max_qps
+        self.used = 0
+        self.stop_reason = ''
+        self.reservations = []
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.budget - self.used)
+
+    @property
+    def stopped(self) -> bool:
+        return bool(self.stop_reason)
+
+    def stop(self, reason: str = 'stopped'):
+        """Refuse all further reservations."""
+        with self._lock:
+            if not self.stop_reason:
+                self.stop_reason = reason
+
+    def reserve(self, units: int = 1) -> bool:
+        """
+        Take units from the budget, topping up from the quota if needed.
+
+        Called from the pipeline's submitting thread (it may hit the DB).
+
+        Returns:
+            False if the run is stopped or the budget is exhausted
+        """
+        with self._lock:
+            if self.stop_reason:
+                return False
+            if self.used + units > self.budget and self.config is not None:
+                reservation = self.config.reserve_requests(
+                    max(self.block_size, units), partial=True
+                )
+                if reservation:
+                    self.reservations.append(reservation)
+                    self.budget += reservation.units
+            if self.used + units > self.budget:
+                self.stop_reason = 'quota exhausted'
+                return False
+            self.used += units
+            return True
+
+    def settle(self, reserved: int, used: int):
+        """Replace an item's reserved units with the calls it actually made."""
+        with self._lock:
+            self.used += used - reserved
+
+    def pace(self, units: int = 1):
+        """Sleep as needed to keep all workers under max_qps."""
+        if not self.max_qps:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + units / self.max_qps
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def close(self):
+        """Commit used units against the reservations and refund the rest."""
+        with self._lock:
+            unused = self.budget - self.used
+            reservations, self.reservations = self.reservations, []
+        if unused < 0 and self.config is not None:
+            # Calls beyond the estimates (e.g. retries) still count
+            self.config.increment_requests(-unused)
+            unused = 0
+        # Refund from the most recent blocks first
+        for reservation in reversed(reservations):
+            refund = min(unused, reservation.units)
+            reservation.commit(used=reservation.units - refund)
+            unused -= refund
+
+
+@dataclass
+class StageStats:
+    """Counters for one pipeline stage."""
+    name: str
+    count: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+
+    def record(self, seconds: float, error: bool = False):
+        self.count += 1
+        self.busy_seconds += seconds
+        if error:
+            self.errors += 1
+
+    def throughput(self, wall_seconds: float) -> float:
+        """Items per second of wall-clock time."""
+        return self.count / wall_seconds if wall_seconds > 0 else 0.0
+
+    def as_dict(self, wall_seconds: float) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'per_second': round(self.throughput(wall_seconds), 2),
+        }
+
+
+@dataclass
+class PipelineStats:
+    """Per-stage throughput for a pipeline run."""
+    fetch: StageStats = field(default_factory=lambda: StageStats('fetch'))
+    write: StageStats = field(default_factory=lambda: StageStats('write'))
+    workers: int = 0
+    wall_seconds: float = 0.0
+    stop_reason: str = ''
+
+    def merge(self, other: 'PipelineStats'):
+        """Accumulate another run's counters (e.g. one per city)."""
+        for mine, theirs in ((self.fetch, other.fetch), (self.write, other.write)):
+            mine.count += theirs.count
+            mine.errors += theirs.errors
+            mine.busy_seconds += theirs.busy_seconds
+        self.workers = max(self.workers, other.workers)
+        self.wall_seconds += other.wall_seconds
+        self.stop_reason = self.stop_reason or other.stop_reason
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'wall_seconds': round(self.wall_seconds, 3),
+            'stop_reason': self.stop_reason,
+            'fetch': self.fetch.as_dict(self.wall_seconds),
+            'write': self.write.as_dict(self.wall_seconds),
+        }
+
+    def summary(self) -> str:
+        """One-line throughput report for command output."""
+        parts = []
+        for stage in (self.fetch, self.write):
+            parts.append(
+                f"{stage.name}: {stage.count} in {stage.busy_seconds:.1f}s busy "
+                f"({stage.throughput(self.wall_seconds):.1f}/s"
+                f"{f', {stage.errors} errors' if stage.errors else ''})"
+            )
+        line = f"{self.wall_seconds:.1f}s wall, {self.workers} workers | " + ' | '.join(parts)
+        if self.stop_reason:
+            line += f" | stopped: {self.stop_reason}"
+        return line
+
+
+class EnrichmentPipeline:
+    """
+    Run fetch(item) on a worker pool and write(item, result) on the caller.
+
+    Items are pulled lazily from the input iterable so that at most
+    workers * 2 fetches are in flight; the writer sees results in
+    completion order. A fetch that raises is logged and handed to the
+    writer as None, matching how the provider services report API errors.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Any], Any],
+        write: Callable[[Any, Any], None],
+        governor: QuotaGovernor,
+        workers: int = 4,
+        cost: Optional[Callable[[Any], int]] = None,
+        provider: Optional[str] = None,
+        fetch_deadline: Optional[float] = None,
+    ):
+        """
+        Args:
+            fetch: Called on a worker thread; must not touch the database
+            write: Called on the calling thread with (item, fetch result)
+            governor: Shared quota/QPS governor
+            workers: Size of the fetch worker pool
+            cost: Estimated API calls per item (default: 1); evaluated on
+                the calling thread before the item is submitted
+            provider: Settle each item's reserved cost to the calls it
+                made to this provider (see call_meter); without it the
+                estimate is kept
+            fetch_deadline: Seconds each fetch's HTTP calls may take in
+                total, retries included (see core.http_client.deadline)
+        """
+        self.fetch = fetch
+        self.write = write
+        self.governor = governor
+        self.workers = max(1, workers)
+        self.cost = cost or (lambda item: 1)
+        self.provider = provider
+        self.fetch_deadline = fetch_deadline
+
+    def _fetch_one(self, item, units):
+        """Worker body: pace, fetch, and time it; returns the calls made too."""
+        try:
+            self.governor.pace(units)
+            start = time.perf_counter()
+            limit = deadline(self.fetch_deadline) if self.fetch_deadline else nullcontext()
+            with metered() as meter, limit:
+                try:
+                    result = self.fetch(item)
+                    error = False
+                except Exception as e:
+                    logger.error(f"Enrichment fetch failed for {item!r}: {e}")
+                    result = None
+                    error = True
+            calls = meter.count(self.provider) if self.provider else units
+            return result, time.perf_counter() - start, error, calls
+        finally:
+            # Fetches shouldn't query the DB, but never leak a connection
+            # from a pool thread if one slipped through.
+            connections.close_all()
+
+    def run(self, items: Iterable) -> PipelineStats:
+        """Process items until exhausted or the governor stops the run."""
+        stats = PipelineStats(workers=self.workers)
+        started = time.perf_counter()
+        source = iter(items)
+        input_done = False
+        pending: Dict[Any, Any] = {}
+        units_for: Dict[Any, int] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix='enrich') as pool:
+
+            def fill():
+                nonlocal input_done
+                while (not input_done and not self.governor.stopped
+                       and len(pending) < self.workers * 2):
+                    try:
+                        item = next(source)
+                    except StopIteration:
+                        input_done = True
+                        break
+                    units = self.cost(item)
+                    if not self.governor.reserve(units):
+                        break
+                    future = pool.submit(self._fetch_one, item, units)
+                    pending[future] = item
+                    units_for[future] = units
+
+            fill()
+            while pending:
+                with phase('wait for fetches'):
+                    done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    result, seconds, error, calls = future.result()
+                    stats.fetch.record(seconds, error)
+                    self.governor.settle(units_for.pop(future), calls)
+
+                    start = time.perf_counter()
+                    try:
+                        with phase('write'):
+                            self.write(item, result)
+                        write_error = False
+                    except Exception as e:
+                        logger.exception(f"Enrichment write failed for {item!r}: {e}")
+                        write_error = True
+                    stats.write.record(time.perf_counter() - start, write_error)
+                fill()
+
+        stats.wall_seconds = time.perf_counter() - started
+        stats.stop_reason = self.governor.stop_reason
+        if stats.stop_reason:
+            logger.warning(f"Enrichment pipeline stopped: {stats.stop_reason}")
+        return stats
+
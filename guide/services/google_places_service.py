@@ -5,12 +5,20 @@ Client for Google Places API (New) to fetch venue data.
 Uses field masks to control costs per the API pricing tiers.
 """
 
+import contextvars
 import logging
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from django.conf import settings
 
+from core.http_client import can_resend, http_client, remaining_time
+
 from .base_venue_service import BaseVenueService
+from .call_meter import record_call
+from .rate_limiter import google_places_limiter, retry_after_seconds
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
@@ -53,26 +61,52 @@ class GooglePlacesService(BaseVenueService):
         'places.photos',
     ]
 
-    def __init__(self, api_key: Optional[str] = None):
+    # Place Details masks by refresh tier. 'volatile' covers what changes
+    # week to week and is cheap to fetch; 'static' is the full record.
+    # Both take hours_json from regularOpeningHours (currentOpeningHours
+    # folds in this week's holiday exceptions), so the tiers never
+    # overwrite each other's hours.
+    FIELD_TIERS = {
+        'volatile': ['id', 'rating', 'userRatingCount', 'regularOpeningHours'],
+        'static': [f.replace('places.', '') for f in BASIC_FIELDS + ADVANCED_FIELDS],
+    }
+
+    # Throttling: retries after 429/503 (and gateway errors and failed
+    # connections) and how long to wait for a token
+    MAX_RETRIES = 3
+    RATE_LIMIT_TIMEOUT = 60
+    REQUEST_TIMEOUT = 30
+    RETRY_STATUS_CODES = (429, 503)
+    GATEWAY_STATUS_CODES = (502, 504)
+
+    # Search paging: the API returns at most 20 per page and 60 in total
+    SEARCH_PAGE_SIZE = 20
+    MAX_SEARCH_PAGES = 3
+    NEARBY_RADIUS_METERS = 15000
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        response_cache: Optional[ResponseCache] = None
+    ):
         """
         Initialize the Google Places service.
 
         Args:
             api_key: Google Places API key. If not provided, reads from settings.
+            response_cache: Record/replay cache (default: from settings)
         """
+        self.response_cache = response_cache or ResponseCache.from_settings('GOOGLE_PLACES')
         self.api_key = api_key or self._get_api_key()
-        if not self.api_key:
+        if not self.api_key and not self.response_cache.replay:
             logger.warning("Google Places API key not configured")
 
     def _get_api_key(self) -> Optional[str]:
         """Get API key from settings or environment."""
         # Try to get from VenueAPIConfig model first
         try:
-            from guide.models import VenueAPIConfig
-            config = VenueAPIConfig.objects.filter(
-                provider='google',
-                is_enabled=True
-            ).first()
+            from .api_configs import get_api_config
+            config = get_api_config('google', enabled_only=True)
             if config:
                 import os
                 key_name = config.api_key_name
@@ -106,6 +140,16 @@ class GooglePlacesService(BaseVenueService):
         Returns:
             Response JSON or None on error
         """
+        cache_key = None
+        if self.response_cache.enabled:
+            cache_key = self.response_cache.key(method, endpoint, data, field_mask)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            if self.response_cache.replay:
+                logger.error(f"Google Places replay miss: {method} {endpoint}")
+                return None
+
         if not self.api_key:
             logger.error("Google Places API key not configured")
             return None
@@ -119,79 +163,221 @@ class GooglePlacesService(BaseVenueService):
         if field_mask:
             headers['X-Goog-FieldMask'] = ','.join(field_mask)
 
-        try:
-            if method == 'POST':
-                response = requests.post(url, json=data, headers=headers, timeout=30)
-            else:
-                response = requests.get(url, headers=headers, timeout=30)
+        endpoint_class = self._endpoint_class(endpoint)
+
+        # Every attempt is one request (retry='none'): retries happen in
+        # this loop, so each takes a rate limiter token and is metered
+        for attempt in range(self.MAX_RETRIES + 1):
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                logger.error(f"Google Places deadline passed before {endpoint_class} request")
+                return None
+            if not google_places_limiter.acquire(endpoint_class, timeout=self.RATE_LIMIT_TIMEOUT):
+                logger.error(f"Google Places rate limit wait timed out for {endpoint_class}")
+                return None
+
+            record_call(self.provider_name)
+            try:
+                response = http_client.request(
+                    method, url,
+                    json=data if method == 'POST' else None,
+                    headers=headers,
+                    timeout=self.REQUEST_TIMEOUT,
+                    retry='none',
+                )
+
+                if response.status_code in self.RETRY_STATUS_CODES and attempt < self.MAX_RETRIES:
+                    delay = retry_after_seconds(response, attempt)
+                    # Shared cooldown so other workers/processes back off too
+                    google_places_limiter.penalize(endpoint_class, delay)
+                    logger.warning(
+                        f"Google Places {response.status_code} on {endpoint_class}, "
+                        f"retrying in {delay:.1f}s (attempt {attempt + 1}/{self.MAX_RETRIES})"
+                    )
+                    time.sleep(delay)
+                    continue
+
+                if response.status_code in self.GATEWAY_STATUS_CODES and attempt < self.MAX_RETRIES:
+                    delay = retry_after_seconds(response, attempt)
+                    logger.warning(
+                        f"Google Places {response.status_code} on {endpoint_class}, "
+                        f"retrying in {delay:.1f}s (attempt {attempt + 1}/{self.MAX_RETRIES})"
+                    )
+                    time.sleep(delay)
+                    continue
+
+                response.raise_for_status()
+                result = response.json()
+                if cache_key:
+                    self.response_cache.put(
+                        cache_key, result,
+                        method=method, endpoint=endpoint, data=data, field_mask=field_mask,
+                    )
+                return result
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # A search POST that may have reached Google isn't resent
+                if attempt < self.MAX_RETRIES and can_resend(method, e):
+                    delay = retry_after_seconds(None, attempt)
+                    logger.warning(
+                        f"Google Places {type(e).__name__} on {endpoint_class}, "
+                        f"retrying in {delay:.1f}s (attempt {attempt + 1}/{self.MAX_RETRIES})"
+                    )
+                    time.sleep(delay)
+                    continue
+                logger.error(f"Google Places API error: {e}")
+                return None
+
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Google Places API error: {e}")
+                return None
 
-            response.raise_for_status()
-            return response.json()
+        return None
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Google Places API error: {e}")
-            return None
+    @staticmethod
+    def _endpoint_class(endpoint: str) -> str:
+        """Rate-limit bucket for an endpoint: 'search', 'photo' or 'details'."""
+        if endpoint.startswith('places:'):
+            return 'search'
+        if endpoint.endswith('/media'):
+            return 'photo'
+        return 'details'
 
     def search_nearby(
         self,
         city_name: str,
         state: str = 'VA',
         venue_type: str = 'restaurant',
-        limit: int = 20
+        limit: int = 20,
+        location: Optional[Dict[str, float]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Search for top-rated venues near a city using Text Search.
-
-        Uses Text Search (New) to find venues by type in a city,
-        sorted by relevance/prominence.
+        Search for top-rated venues in a city.
+
+        Each Google type mapped to the venue type is searched concurrently.
+        By default this uses Text Search (New), following nextPageToken
+        until `limit` results per type; with `location` ({'lat', 'lon',
+        'radius'} in meters) it uses Nearby Search (New) restricted to that
+        circle instead (one page, max 20 per type). Results are merged by
+        place id before sorting, so a place returned under several types
+        is counted once.
         """
         google_types = self.VENUE_TYPE_MAP.get(venue_type, ['restaurant'])
 
-        all_results = []
-        for place_type in google_types:
-            query = f"best {place_type}s in {city_name}, {state}"
+        def search(place_type):
+            if location:
+                return self._search_nearby_type(place_type, location, limit)
+            return self._search_text_type(place_type, city_name, state, limit)
+
+        with ThreadPoolExecutor(max_workers=len(google_types),
+                                thread_name_prefix='places-search') as pool:
+            # Copy the context per task so an enclosing deadline() applies
+            futures = [pool.submit(contextvars.copy_context().run, search, t) for t in google_types]
+            per_type = [future.result() for future in futures]
+
+        # Merge by place id, keeping the first type that returned it
+        merged = {}
+        for place_type, places in zip(google_types, per_type):
+            for place in places:
+                normalized = self.normalize_venue_data(place)
+                key = normalized.get('google_place_id')
+                if key and key not in merged:
+                    normalized['_search_type'] = place_type
+                    merged[key] = normalized
 
-            data = {
-                'textQuery': query,
-                'includedType': place_type,
-                'maxResultCount': min(limit, 20),  # API max is 20 per request
-                'rankPreference': 'RELEVANCE',
-            }
+        # Sort by rating (descending) and return top N
+        all_results = sorted(merged.values(), key=lambda x: (x.get('rating') or 0), reverse=True)
+        return all_results[:limit]
 
-            # Use both basic and advanced fields for search results
-            field_mask = self.BASIC_FIELDS + self.ADVANCED_FIELDS
+    def _search_text_type(
+        self,
+        place_type: str,
+        city_name: str,
+        state: str,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Text Search for one Google type, following pages up to limit."""
+        data = {
+            'textQuery': f"best {place_type}s in {city_name}, {state}",
+            'includedType': place_type,
+            'pageSize': min(limit, self.SEARCH_PAGE_SIZE),
+            'rankPreference': 'RELEVANCE',
+        }
+        # Use both basic and advanced fields for search results
+        field_mask = self.BASIC_FIELDS + self.ADVANCED_FIELDS + ['nextPageToken']
 
+        places = []
+        for _ in range(self.MAX_SEARCH_PAGES):
             result = self._make_request(
                 'places:searchText',
                 method='POST',
                 data=data,
                 field_mask=field_mask
             )
-
-            if result and 'places' in result:
-                for place in result['places']:
-                    normalized = self.normalize_venue_data(place)
-                    normalized['_search_type'] = place_type
-                    all_results.append(normalized)
-
-            if len(all_results) >= limit:
+            if not result:
                 break
+            places.extend(result.get('places', []))
+            token = result.get('nextPageToken')
+            if not token or len(places) >= limit:
+                break
+            data = {**data, 'pageToken': token}
+        return places[:limit]
 
-        # Sort by rating (descending) and return top N
-        all_results.sort(key=lambda x: (x.get('rating') or 0), reverse=True)
-        return all_results[:limit]
+    def _search_nearby_type(
+        self,
+        place_type: str,
+        location: Dict[str, float],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Nearby Search for one Google type within a circle (no paging)."""
+        data = {
+            'includedTypes': [place_type],
+            'maxResultCount': min(limit, self.SEARCH_PAGE_SIZE),
+            'rankPreference': 'POPULARITY',
+            'locationRestriction': {
+                'circle': {
+                    'center': {
+                        'latitude': location['lat'],
+                        'longitude': location['lon'],
+                    },
+                    'radius': float(location.get('radius', self.NEARBY_RADIUS_METERS)),
+                },
+            },
+        }
+        result = self._make_request(
+            'places:searchNearby',
+            method='POST',
+            data=data,
+            field_mask=self.BASIC_FIELDS + self.ADVANCED_FIELDS
+        )
+        return (result or {}).get('places', [])
+
+    def estimate_search_calls(
+        self,
+        venue_type: str,
+        limit: int = 20,
+        nearby: bool = False
+    ) -> int:
+        """Upper bound on API calls search_nearby makes for a venue type."""
+        types = len(self.VENUE_TYPE_MAP.get(venue_type, ['restaurant']))
+        if nearby:
+            return types
+        pages = min(self.MAX_SEARCH_PAGES, -(-max(1, limit) // self.SEARCH_PAGE_SIZE))
+        return types * pages
 
     def get_place_details(
         self,
         place_id: str,
-        fields: Optional[List[str]] = None
+        fields: Optional[List[str]] = None,
+        tier: str = 'static'
     ) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a specific place.
 
         Args:
             place_id: Google Place ID (format: places/XXXXX)
-            fields: Optional specific fields to retrieve
+            fields: Optional specific fields to retrieve (overrides tier)
+            tier: Field tier from FIELD_TIERS ('volatile' or 'static')
 
         Returns:
             Normalized place data or None
@@ -201,9 +387,7 @@ class GooglePlacesService(BaseVenueService):
             place_id = f'places/{place_id}'
 
         if fields is None:
-            # Request all relevant fields
-            field_mask = [f.replace('places.', '') for f in
-                         self.BASIC_FIELDS + self.ADVANCED_FIELDS]
+            field_mask = self.FIELD_TIERS[tier]
         else:
             field_mask = fields
 
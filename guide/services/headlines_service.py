@@ -11,6 +11,8 @@ from datetime import datetime
 import feedparser
 from anthropic import Anthropic
 
+from core.http_client import http_client
+
 logger = logging.getLogger(__name__)
 
 # Local news RSS feeds
@@ -93,7 +95,11 @@ class HeadlinesService:
 
         for feed_config in LOCAL_RSS_FEEDS:
             try:
-                feed = feedparser.parse(feed_config['url'])
+                # Fetch through the shared client (pooling, retries,
+                # timeout) rather than feedparser's own urllib fetch
+                response = http_client.get(feed_config['url'], timeout=15)
+                response.raise_for_status()
+                feed = feedparser.parse(response.content)
                 for entry in feed.entries[:10]:
                     # Clean up summary text
                     summary = entry.get('summary', entry.get('description', ''))
@@ -9,18 +9,15 @@ from decimal import Decimal
 from django.utils import timezone
 from django.db import transaction
 
+from ai_services.pricing import calculate_cost
+from ai_services.usage_tracking import log_ai_usage
+from core.profiling import phase
 from guide.models import PulseContent
 from .trends_service import trends_service
 from .headlines_service import headlines_service
 
 logger = logging.getLogger(__name__)
 
-# Pricing per 1M tokens
-PRICING = {
-    'grok-3-fast': {'input': 5.00, 'output': 25.00},
-    'claude-haiku-4-5-20251001': {'input': 1.00, 'output': 5.00},
-}
-
 # Cache durations
 CACHE_HOURS = {
     'trends': 4,
@@ -83,13 +80,14 @@ class PulseService:
 
     def _refresh_content(self, content_type: str) -> PulseContent | None:
         """Fetch fresh content and store it."""
-        if content_type == 'trends':
-            result = trends_service.fetch_trends()
-        elif content_type == 'headlines':
-            result = headlines_service.fetch_headlines()
-        else:
-            logger.error(f"Unknown content type: {content_type}")
-            return None
+        with phase(f'fetch {content_type}'):
+            if content_type == 'trends':
+                result = trends_service.fetch_trends()
+            elif content_type == 'headlines':
+                result = headlines_service.fetch_headlines()
+            else:
+                logger.error(f"Unknown content type: {content_type}")
+                return None
 
         if not result:
             logger.warning(f"Failed to fetch {content_type}")
@@ -103,12 +101,8 @@ class PulseService:
         input_tokens = usage.get('input_tokens', 0)
         output_tokens = usage.get('output_tokens', 0)
 
-        cost = Decimal('0')
-        if model in PRICING:
-            cost = Decimal(str(
-                (input_tokens / 1_000_000 * PRICING[model]['input']) +
-                (output_tokens / 1_000_000 * PRICING[model]['output'])
-            ))
+        provider = 'xai' if 'grok' in model else 'anthropic'
+        cost = calculate_cost(provider, model, input_tokens, output_tokens) if model else Decimal('0')
 
         # Deactivate old content
         with transaction.atomic():
@@ -128,24 +122,19 @@ class PulseService:
                 is_active=True
             )
 
-            # Log to AI usage tracking
-            if model:
-                try:
-                    from ai_services.models import AIUsageLog
-                    AIUsageLog.objects.create(
-                        task_type='research_happenings' if content_type == 'trends' else 'research_events',
-                        provider='xai' if 'grok' in model else 'anthropic',
-                        model=model,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                        total_tokens=input_tokens + output_tokens,
-                        cost_usd=cost,
-                        response_time_ms=0,  # Not tracked for background refreshes
-                        success=True,
-                        metadata={'content_type': content_type, 'source': 'pulse'}
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to log AI usage: {e}")
+        # Log to AI usage tracking (queued; written by the usage buffer)
+        if model:
+            log_ai_usage(
+                task_type='research_happenings' if content_type == 'trends' else 'research_events',
+                provider=provider,
+                model=model,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens,
+                response_time_ms=0,  # Not tracked for background refreshes
+                success=True,
+                metadata={'content_type': content_type, 'source': 'pulse'}
+            )
 
         logger.info(f"Created new {content_type} content, cost: ${cost:.6f}")
         return pulse
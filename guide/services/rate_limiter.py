@@ -0,0 +1,164 @@
+"""
+Rate Limiter
+
+Token-bucket rate limiting for outbound provider APIs, stored in the Django
+cache so every process sharing the cache (gunicorn workers, the refresh
+timer, management commands) draws from one budget per endpoint class.
+
+Configure a shared cache backend (CACHE_URL) in production - with the
+default local-memory cache each process gets its own bucket.
+"""
+
+import logging
+import random
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Cross-process token buckets keyed by provider and endpoint class.
+
+    Each endpoint class has a refill rate (requests per minute) and a burst
+    capacity. Bucket state is read-modify-written under a short cache lock
+    (cache.add is atomic on every Django backend), released only by the
+    holder that took it. A 429 from the provider
+    can put an endpoint class into a shared cooldown so all processes back
+    off together instead of each discovering the limit on its own.
+    """
+
+    LOCK_TTL = 2  # seconds; bounds how long a crashed holder can block others
+    KEY_PREFIX = 'ratelimit'
+
+    def __init__(self, provider: str, limits: Dict[str, Dict[str, float]]):
+        """
+        Args:
+            provider: Provider identifier used in cache keys (e.g., 'google')
+            limits: Map of endpoint class to {'per_minute': N, 'burst': M}
+        """
+        self.provider = provider
+        self.limits = limits
+
+    def _key(self, endpoint_class: str, suffix: str = '') -> str:
+        key = f"{self.KEY_PREFIX}:{self.provider}:{endpoint_class}"
+        return f"{key}:{suffix}" if suffix else key
+
+    def _take(self, endpoint_class: str) -> float:
+        """
+        Try to take one token.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        limit = self.limits.get(endpoint_class)
+        if not limit:
+            return 0.0
+
+        rate = limit['per_minute'] / 60.0
+        capacity = max(1.0, float(limit.get('burst', 1)))
+
+        cooldown_until = cache.get(self._key(endpoint_class, 'cooldown'))
+        if cooldown_until and cooldown_until > time.time():
+            return cooldown_until - time.time()
+
+        lock_key = self._key(endpoint_class, 'lock')
+        token = uuid.uuid4().hex
+        if not cache.add(lock_key, token, timeout=self.LOCK_TTL):
+            return 0.005  # another process is updating the bucket
+
+        try:
+            now = time.time()
+            state = cache.get(self._key(endpoint_class))
+            tokens, updated = state if state else (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+
+            # Keep state around long enough to refill a full bucket
+            ttl = int(capacity / rate) + 60
+            cache.set(self._key(endpoint_class), (tokens, now), timeout=ttl)
+            return wait
+        finally:
+            self._release(lock_key, token)
+
+    @staticmethod
+    def _release(lock_key: str, token: str):
+        # If we outlived LOCK_TTL the lock may since have been taken by
+        # another process; only delete it while it still holds our token
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+    def acquire(self, endpoint_class: str, timeout: float = 60.0) -> bool:
+        """
+        Block until a token is available for the endpoint class.
+
+        Args:
+            endpoint_class: e.g. 'search', 'details', 'photo'
+            timeout: Give up after this many seconds
+
+        Returns:
+            True if a token was taken, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._take(endpoint_class)
+            if wait <= 0:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(
+                    f"Rate limit wait timed out for {self.provider}/{endpoint_class}"
+                )
+                return False
+            time.sleep(min(wait, remaining))
+
+    def penalize(self, endpoint_class: str, seconds: float):
+        """Put an endpoint class into a shared cooldown (e.g. after a 429)."""
+        until = time.time() + seconds
+        current = cache.get(self._key(endpoint_class, 'cooldown'))
+        if not current or current < until:
+            cache.set(self._key(endpoint_class, 'cooldown'), until, timeout=int(seconds) + 1)
+
+
+def retry_after_seconds(response, attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """
+    Delay before retrying a throttled request.
+
+    Honors a Retry-After header (delta-seconds or HTTP date); otherwise
+    uses exponential backoff with full jitter.
+    """
+    header = response.headers.get('Retry-After') if response is not None else None
+    if header:
+        try:
+            return min(cap, max(0.0, float(header)))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(header)
+                return min(cap, max(0.0, retry_at.timestamp() - time.time()))
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# Google Places API (New) defaults to 600 QPM per method; stay under it.
+GOOGLE_PLACES_RATE_LIMITS = {
+    'search': {'per_minute': 300, 'burst': 10},
+    'details': {'per_minute': 500, 'burst': 20},
+    'photo': {'per_minute': 500, 'burst': 20},
+}
+
+google_places_limiter = RateLimiter(
+    'google',
+    getattr(settings, 'GOOGLE_PLACES_RATE_LIMITS', GOOGLE_PLACES_RATE_LIMITS),
+)
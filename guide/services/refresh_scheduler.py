@@ -0,0 +1,334 @@
+"""
+Refresh Scheduler
+
+Priority-based venue refresh planning. Once a day the scheduler scores
+every refreshable venue by traffic, featured status, rating volatility
+and staleness, takes the top N that fit the day's refresh budget and
+spreads them across time windows. The budget is the weekly cadence the
+refresh timer ran on before (every venue once per TARGET_AGE_DAYS), so
+the scheduler changes which venues are refreshed, not how many.
+
+The plan is stored in VenueRefreshPlan; each timer run refreshes the
+entries whose window has arrived and are still pending, so an
+interrupted run just picks up where it stopped.
+
+Traffic is counted in the cache by record_venue_view()/record_city_view()
+and folded into Venue.view_score (a decayed count) when a plan is built.
+"""
+
+import logging
+import math
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core.profiling import phase
+from guide.models import Venue, VenueRefreshPlan
+from .venue_enrichment_service import VenueEnrichmentService
+
+logger = logging.getLogger(__name__)
+
+VIEW_KEY_PREFIX = 'refresh_views'
+
+
+def _incr(key: str):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # First hit; add() keeps a concurrent first hit from being lost
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def record_venue_view(venue_id: int):
+    """Count a view of one venue (e.g. a photo request)."""
+    _incr(f"{VIEW_KEY_PREFIX}:venue:{venue_id}")
+
+
+def record_city_view(city_id: int):
+    """Count a city page view; shared across that city's venues."""
+    _incr(f"{VIEW_KEY_PREFIX}:city:{city_id}")
+
+
+class RefreshScheduler:
+    """
+    Builds and executes the daily venue refresh plan.
+
+    Scoring (higher refreshes sooner):
+        age         days since last refresh / TARGET_AGE_DAYS (capped)
+        traffic     log(1 + view_score)
+        featured    1 for featured venues
+        volatility  rating_volatility scaled so 0.1 stars/refresh ~= 1
+    """
+
+    # Most of the daily quota the scheduler may plan for, whatever the
+    # cadence asks; the rest is left for CMS syncs, matching and discovery.
+    QUOTA_SHARE = 0.8
+
+    # The day is split into this many equal windows
+    WINDOWS_PER_DAY = 6
+
+    # Venues refreshed more recently than this are never planned
+    MIN_AGE_DAYS = 3
+
+    TARGET_AGE_DAYS = 7
+    MAX_AGE_FACTOR = 3.0
+
+    WEIGHTS = {
+        'age': 1.0,
+        'traffic': 0.5,
+        'featured': 1.0,
+        'volatility': 10.0,
+    }
+
+    # Share of a city's page views credited to each of its venues
+    CITY_VIEW_SHARE = 0.1
+
+    # Decay applied to view_score each time a plan is built (daily)
+    VIEW_DECAY = 0.5
+
+    # Plans older than this are deleted when a new one is built
+    KEEP_PLAN_DAYS = 14
+
+    def __init__(self, service: Optional[VenueEnrichmentService] = None):
+        self.service = service or VenueEnrichmentService()
+
+    # -------------------------------------------------------------------------
+    # Planning
+    # -------------------------------------------------------------------------
+
+    def current_window(self, now: Optional[datetime] = None) -> int:
+        """Window index (0-based) for a local time."""
+        local = timezone.localtime(now or timezone.now())
+        minutes = local.hour * 60 + local.minute
+        return minutes * self.WINDOWS_PER_DAY // (24 * 60)
+
+    def daily_budget(self, candidates: int) -> int:
+        """
+        API calls the scheduler may plan for today.
+
+        One TARGET_AGE_DAYS-th of the candidates, the same daily spend as
+        refreshing every venue once per TARGET_AGE_DAYS, capped at
+        QUOTA_SHARE of the daily quota.
+        """
+        config = self.service.config
+        if not config or not config.is_enabled:
+            return 0
+        cadence = math.ceil(candidates / self.TARGET_AGE_DAYS)
+        return min(cadence, int(config.daily_quota * self.QUOTA_SHARE))
+
+    def candidates(self):
+        """Venues that can be refreshed (enrichable, matched)."""
+        return Venue.objects.filter(
+            venue_type__in=VenueEnrichmentService.ENRICHABLE_TYPES,
+        ).exclude(**{self.service.id_field: ''})
+
+    def collect_views(self, venues: List[Venue]) -> List[Venue]:
+        """
+        Fold cached view counters into view_score (decayed) and reset them.
+
+        Updates the given instances in place and saves view_score in bulk.
+        """
+        venue_keys = {v.pk: f"{VIEW_KEY_PREFIX}:venue:{v.pk}" for v in venues}
+        city_keys = {v.city_id: f"{VIEW_KEY_PREFIX}:city:{v.city_id}" for v in venues}
+        counts = cache.get_many(list(venue_keys.values()) + list(city_keys.values()))
+        for key, count in counts.items():
+            if not count:
+                continue
+            # Take away only what was read: views counted since get_many
+            # stay in the counter for the next plan
+            try:
+                cache.decr(key, count)
+            except ValueError:
+                pass  # Evicted meanwhile
+
+        changed = []
+        for venue in venues:
+            views = counts.get(venue_keys[venue.pk], 0)
+            views += counts.get(city_keys[venue.city_id], 0) * self.CITY_VIEW_SHARE
+            score = round(venue.view_score * self.VIEW_DECAY + views, 3)
+            if score != venue.view_score:
+                venue.view_score = score
+                changed.append(venue)
+        if changed:
+            Venue.objects.bulk_update(changed, ['view_score'], batch_size=500)
+        return venues
+
+    def score(self, venue: Venue, now: Optional[datetime] = None) -> float:
+        """Refresh priority for a venue."""
+        now = now or timezone.now()
+        if venue.last_enriched_at:
+            age_days = (now - venue.last_enriched_at).total_seconds() / 86400
+        else:
+            age_days = self.TARGET_AGE_DAYS * self.MAX_AGE_FACTOR
+        age = min(age_days / self.TARGET_AGE_DAYS, self.MAX_AGE_FACTOR)
+
+        w = self.WEIGHTS
+        return (
+            w['age'] * age
+            + w['traffic'] * math.log1p(venue.view_score)
+            + w['featured'] * (1 if venue.is_featured else 0)
+            + w['volatility'] * venue.rating_volatility
+        )
+
+    def plan_exists(self, plan_date: date) -> bool:
+        return VenueRefreshPlan.objects.filter(plan_date=plan_date).exists()
+
+    def build_plan(
+        self,
+        plan_date: Optional[date] = None,
+        budget: Optional[int] = None,
+        replace: bool = False,
+        now: Optional[datetime] = None
+    ) -> int:
+        """
+        Rank venues and store the day's plan (no-op if one exists).
+
+        Entries are spread over the windows remaining in the day, highest
+        scores first, so if the day runs short the most important
+        refreshes have already happened.
+
+        Returns:
+            Number of entries planned (0 if a plan already existed)
+        """
+        now = now or timezone.now()
+        plan_date = plan_date or timezone.localdate(now)
+        if self.plan_exists(plan_date) and not replace:
+            return 0
+
+        venues = self.collect_views(list(self.candidates()))
+        budget = self.daily_budget(len(venues)) if budget is None else budget
+        min_age = now - timedelta(days=self.MIN_AGE_DAYS)
+        due = [
+            v for v in venues
+            if not v.last_enriched_at or v.last_enriched_at < min_age
+        ]
+        ranked = sorted(due, key=lambda v: self.score(v, now), reverse=True)[:budget]
+
+        first = self.current_window(now) if plan_date == timezone.localdate(now) else 0
+        windows = self.WINDOWS_PER_DAY - first
+        per_window = max(1, math.ceil(len(ranked) / windows))
+        entries = [
+            VenueRefreshPlan(
+                plan_date=plan_date,
+                window=first + min(rank // per_window, windows - 1),
+                venue=venue,
+                score=round(self.score(venue, now), 4),
+                tier=self.service._refresh_tier(venue),
+            )
+            for rank, venue in enumerate(ranked)
+        ]
+
+        with transaction.atomic():
+            if replace:
+                VenueRefreshPlan.objects.filter(plan_date=plan_date, status='pending').delete()
+                planned = set(
+                    VenueRefreshPlan.objects.filter(plan_date=plan_date)
+                    .values_list('venue_id', flat=True)
+                )
+                entries = [e for e in entries if e.venue_id not in planned]
+            VenueRefreshPlan.objects.bulk_create(entries, batch_size=500)
+            VenueRefreshPlan.objects.filter(
+                plan_date__lt=plan_date - timedelta(days=self.KEEP_PLAN_DAYS)
+            ).delete()
+
+        logger.info(
+            f"Planned {len(entries)} venue refreshes for {plan_date} "
+            f"({len(due)} due, budget {budget}, {per_window}/window)"
+        )
+        return len(entries)
+
+    # -------------------------------------------------------------------------
+    # Execution
+    # -------------------------------------------------------------------------
+
+    def due_entries(self, now: Optional[datetime] = None):
+        """Pending entries of today's plan whose window has arrived."""
+        now = now or timezone.now()
+        entries = VenueRefreshPlan.objects.filter(
+            plan_date=timezone.localdate(now),
+            status='pending',
+            window__lte=self.current_window(now),
+        ).select_related('venue', 'venue__city').order_by('window', '-score')
+        if self.service.shard:
+            entries = self.service.shard.filter(entries, field='venue_id')
+        return entries
+
+    def run(
+        self,
+        now: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Build today's plan if needed and refresh everything due.
+
+        Returns:
+            refresh_venue_batch results plus 'planned' and 'window'
+        """
+        now = now or timezone.now()
+        # The plan is global (one ranking against one budget), so with
+        # shards only the first builds it; the others run their slice of it
+        shard = self.service.shard
+        builds_plan = not dry_run and (shard is None or shard.is_first)
+        with phase('build plan'):
+            planned = self.build_plan(now=now) if builds_plan else 0
+
+        with phase('load due entries'):
+            entries = list(self.due_entries(now)[:limit] if limit else self.due_entries(now))
+        by_venue = {entry.venue_id: entry for entry in entries}
+        processed = []
+
+        def on_result(venue, success):
+            # Entries not reached (e.g. quota ran out) stay pending
+            if dry_run:
+                return
+            entry = by_venue[venue.pk]
+            entry.status = 'done' if success else 'failed'
+            entry.processed_at = timezone.now()
+            processed.append(entry)
+            if len(processed) >= self.service.batch_size:
+                self._save_entries(processed)
+                processed.clear()
+
+        try:
+            results = self.service.refresh_venue_batch(
+                [(entry.venue, entry.tier) for entry in entries],
+                dry_run=dry_run,
+                on_result=on_result,
+            )
+        finally:
+            if processed:
+                self._save_entries(processed)
+
+        results['planned'] = planned
+        results['window'] = self.current_window(now)
+        results['due'] = len(entries)
+        return results
+
+    @staticmethod
+    def _save_entries(entries: List[VenueRefreshPlan]):
+        now = timezone.now()
+        for entry in entries:
+            entry.updated_at = now
+        VenueRefreshPlan.objects.bulk_update(
+            entries, ['status', 'processed_at', 'updated_at'], batch_size=500
+        )
+
+    def plan_summary(self, plan_date: Optional[date] = None) -> Dict[str, Any]:
+        """Counts by status and window for a day's plan."""
+        from django.db.models import Count
+
+        plan_date = plan_date or timezone.localdate()
+        rows = VenueRefreshPlan.objects.filter(plan_date=plan_date).values(
+            'window', 'status'
+        ).annotate(count=Count('id'))
+        summary = {'date': plan_date, 'total': 0, 'by_status': {}, 'by_window': {}}
+        for row in rows:
+            summary['total'] += row['count']
+            summary['by_status'][row['status']] = summary['by_status'].get(row['status'], 0) + row['count']
+            summary['by_window'][row['window']] = summary['by_window'].get(row['window'], 0) + row['count']
+        return summary
@@ -0,0 +1,129 @@
+"""
+Response Cache
+
+On-disk record/replay cache for provider API responses. Lets dry-runs,
+benchmarks and debugging of the enrichment pipeline run against recorded
+responses instead of paying for live calls.
+
+Modes:
+- off: no caching
+- record: serve recorded responses younger than the TTL; call the API on
+  a miss and record the result
+- replay: serve recorded responses only (any age); a miss returns nothing
+  and never reaches the API
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Responses stored as one JSON file per request.
+
+    Requests are keyed by HTTP method, endpoint, body and field mask (never
+    the API key), so the same logical request always maps to the same file.
+    """
+
+    MODES = ('off', 'record', 'replay')
+
+    def __init__(self, directory, mode: str = 'off', ttl: Optional[int] = None):
+        """
+        Args:
+            directory: Where recorded responses are stored
+            mode: 'off', 'record' or 'replay'
+            ttl: Seconds a recording is served in record mode (None = forever)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown response cache mode: {mode}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, prefix: str = 'GOOGLE_PLACES', mode: Optional[str] = None) -> 'ResponseCache':
+        """Build from <prefix>_CACHE_MODE/_CACHE_DIR/_CACHE_TTL settings."""
+        return cls(
+            directory=getattr(settings, f'{prefix}_CACHE_DIR', Path(settings.BASE_DIR) / '.places_cache'),
+            mode=mode or getattr(settings, f'{prefix}_CACHE_MODE', 'off'),
+            ttl=getattr(settings, f'{prefix}_CACHE_TTL', None),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == 'replay'
+
+    @staticmethod
+    def key(
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        field_mask: Optional[List[str]] = None
+    ) -> str:
+        """Stable hash of the request."""
+        payload = json.dumps(
+            {
+                'method': method.upper(),
+                'endpoint': endpoint,
+                'data': data,
+                'field_mask': sorted(field_mask or []),
+            },
+            sort_keys=True,
+            separators=(',', ':'),
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Recorded response for a key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable response cache entry {path}: {e}")
+            self.misses += 1
+            return None
+
+        if not self.replay and self.ttl and time.time() - record.get('recorded_at', 0) > self.ttl:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return record.get('response')
+
+    def put(self, key: str, response: Dict[str, Any], **meta):
+        """Record a response (written atomically; replay mode never writes)."""
+        if self.mode != 'record':
+            return
+        path = self._path(key)
+        record = {'recorded_at': time.time(), **meta, 'response': response}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write response cache entry {path}: {e}")
@@ -0,0 +1,81 @@
+"""
+Run Cursor
+
+Tracks which venues of an EnrichmentRun have been processed, for
+resumable enrich/refresh runs.
+
+The pipeline finishes venues in completion order, not id order, so the
+cursor for each city/type only advances over a contiguous prefix of
+finished ids: everything at or below it is done, anything above may not
+be. Checkpoints flush the batch writer before saving the cursor, so the
+stored cursor never gets ahead of what's in the database.
+"""
+
+import logging
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+from guide.models import EnrichmentRun, Venue
+
+from .venue_writer import VenueBatchWriter
+
+logger = logging.getLogger(__name__)
+
+
+class RunCursor:
+    """Low-water mark of processed venue ids per city and type."""
+
+    CHECKPOINT_EVERY = 50  # venues between checkpoints
+
+    def __init__(
+        self,
+        run: EnrichmentRun,
+        venues: Iterable[Venue],
+        writer: Optional[VenueBatchWriter] = None
+    ):
+        """
+        Args:
+            run: Run whose cursor and stats are updated
+            venues: Venues this pass will process
+            writer: Flushed before each checkpoint
+        """
+        self.run = run
+        self.writer = writer
+        self._pending: Dict[str, deque] = {}
+        self._done = set()
+        self._since_checkpoint = 0
+
+        by_key: Dict[str, list] = {}
+        for venue in venues:
+            by_key.setdefault(self._key(venue), []).append(venue.pk)
+        for key, ids in by_key.items():
+            self._pending[key] = deque(sorted(ids))
+
+    @staticmethod
+    def _key(venue: Venue) -> str:
+        return EnrichmentRun.cursor_key(venue.city_id, venue.venue_type)
+
+    def done(self, venue: Venue, outcome: Optional[str] = None):
+        """Mark a venue processed (and count its outcome in run stats)."""
+        if outcome:
+            self.run.bump(outcome)
+        key = self._key(venue)
+        pending = self._pending.get(key)
+        if pending is None:
+            return
+        self._done.add(venue.pk)
+        while pending and pending[0] in self._done:
+            last_id = pending.popleft()
+            self._done.discard(last_id)
+            self.run.cursor[key] = last_id
+
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.CHECKPOINT_EVERY:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Flush pending writes, then save the cursor."""
+        if self.writer is not None:
+            self.writer.flush()
+        self.run.checkpoint()
+        self._since_checkpoint = 0
@@ -0,0 +1,78 @@
+"""
+Venue Sharding
+
+Splits batch enrichment work into N disjoint, deterministic slices so
+several processes (or hosts) can run enrich_venues / refresh_venues side
+by side without overlapping. Venues are assigned by a multiplicative hash
+of their id, computed in SQL so each process only loads its own slice.
+Discovery searches, which aren't tied to a venue id, are assigned by
+city: one city's searches for different venue types return many of the
+same places, so they run in one process against one dedupe index.
+
+The processes share the provider's atomic quota counter
+(VenueAPIConfig.reserve_requests), so together they never overspend the
+daily quota. With a shared cache backend they also share the rate limiter.
+"""
+
+import zlib
+from typing import Optional
+
+from django.db.models import F, QuerySet
+from django.db.models.functions import Mod
+
+
+class Shard:
+    """Slice `index` of `count` (written "index/count", zero-based)."""
+
+    # Knuth's multiplicative hash: spreads sequential ids evenly across
+    # shards, including within any one city/type
+    MULTIPLIER = 2654435761
+    MODULUS = 2 ** 32
+
+    def __init__(self, index: int, count: int):
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Invalid shard {index}/{count}")
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> Optional['Shard']:
+        """Parse "i/N"; None passes through."""
+        if not value:
+            return None
+        try:
+            index, count = (int(part) for part in value.split('/'))
+        except ValueError:
+            raise ValueError(f"Shard must look like i/N (e.g. 0/4), got {value!r}")
+        return cls(index, count)
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+    def __eq__(self, other):
+        return isinstance(other, Shard) and (self.index, self.count) == (other.index, other.count)
+
+    @property
+    def is_first(self) -> bool:
+        return self.index == 0
+
+    def split(self, workers: int):
+        """This shard divided into `workers` sub-shards (disjoint, covering it)."""
+        return [Shard(self.index + self.count * i, self.count * workers) for i in range(workers)]
+
+    def _bucket(self, value: int) -> int:
+        return (value * self.MULTIPLIER) % self.MODULUS % self.count
+
+    def owns(self, venue_id: int) -> bool:
+        return self._bucket(venue_id) == self.index
+
+    def owns_search(self, city_id: int) -> bool:
+        """Whether this shard runs the discovery searches for a city."""
+        return zlib.crc32(str(city_id).encode()) % self.count == self.index
+
+    def filter(self, queryset: QuerySet, field: str = 'pk') -> QuerySet:
+        """Restrict a queryset to rows whose `field` (a venue id) this shard owns."""
+        if self.count == 1:
+            return queryset
+        bucket = Mod(Mod(F(field) * self.MULTIPLIER, self.MODULUS), self.count)
+        return queryset.alias(_shard_bucket=bucket).filter(_shard_bucket=self.index)
@@ -0,0 +1,130 @@
+"""
+Content Stats Service
+
+Content and enrichment counts for the CMS dashboard and settings pages.
+
+Everything is computed in two queries: one conditional aggregate over
+Venue (totals, per-type, per-source and enrichment status counts) and one
+UNION ALL of per-model counts for the other content types. The result is
+cached as a snapshot and invalidated by post_save/post_delete signals on
+the counted models (connected in GuideConfig.ready). Bulk writes skip
+signals, so bulk writers call invalidate() themselves; CACHE_TIMEOUT
+bounds staleness for anything that slips through (e.g. queryset.update()).
+"""
+
+import logging
+from typing import Any, Dict
+
+from django.core.cache import cache
+from django.db.models import CharField, Count, Q, Value
+
+from guide.models import (
+    City, Venue, MilitaryBase, Tunnel, VacationDestination, Testimonial, TeamMember
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ContentStatsService:
+    """Cached single-pass content statistics."""
+
+    CACHE_KEY = 'guide:content_stats'
+    CACHE_TIMEOUT = 60 * 10  # seconds
+
+    # Snapshot key -> model counted (with a published count) in the UNION query
+    CONTENT_MODELS = {
+        'cities': City,
+        'military_bases': MilitaryBase,
+        'tunnels': Tunnel,
+        'destinations': VacationDestination,
+        'testimonials': Testimonial,
+        'team_members': TeamMember,
+    }
+
+    # Models whose changes invalidate the snapshot
+    WATCHED_MODELS = (Venue,) + tuple(CONTENT_MODELS.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the cached stats, computing them on a miss."""
+        stats = cache.get(self.CACHE_KEY)
+        if stats is None:
+            stats = self.compute()
+            cache.set(self.CACHE_KEY, stats, self.CACHE_TIMEOUT)
+        return stats
+
+    def invalidate(self):
+        cache.delete(self.CACHE_KEY)
+
+    def compute(self) -> Dict[str, Any]:
+        """Run the stats queries (uncached)."""
+        stats = {'content': self._content_counts()}
+        stats.update(self._venue_counts())
+        return stats
+
+    def _content_counts(self) -> Dict[str, Dict[str, int]]:
+        """Total and published counts for each CONTENT_MODELS entry, in one query."""
+        queries = [
+            model.objects.order_by().values(
+                kind=Value(key, output_field=CharField())
+            ).annotate(
+                total=Count('pk'),
+                published=Count('pk', filter=Q(is_published=True)),
+            )
+            for key, model in self.CONTENT_MODELS.items()
+        ]
+        counts = {key: {'total': 0, 'published': 0} for key in self.CONTENT_MODELS}
+        for row in queries[0].union(*queries[1:], all=True):
+            counts[row['kind']] = {'total': row['total'], 'published': row['published']}
+        return counts
+
+    def _venue_counts(self) -> Dict[str, Any]:
+        """Venue totals, per-type counts and enrichment breakdown, in one query."""
+        from .venue_enrichment_service import VenueEnrichmentService
+
+        enrichable = Q(venue_type__in=VenueEnrichmentService.ENRICHABLE_TYPES)
+        venue_types = [value for value, _ in Venue.VENUE_TYPE_CHOICES]
+        sources = [value for value, _ in Venue.DATA_SOURCE_CHOICES]
+
+        aggregates = {
+            'total': Count('pk'),
+            'published': Count('pk', filter=Q(is_published=True)),
+            'enrichable': Count('pk', filter=enrichable),
+            'enriched': Count('pk', filter=enrichable & Q(enrichment_status='success')),
+            'pending': Count('pk', filter=enrichable & Q(enrichment_status='none')),
+            'manual_review': Count('pk', filter=enrichable & Q(enrichment_status='manual_review')),
+        }
+        for venue_type in venue_types:
+            aggregates[f'type_{venue_type}'] = Count('pk', filter=Q(venue_type=venue_type))
+        for source in sources:
+            aggregates[f'source_{source}'] = Count('pk', filter=enrichable & Q(data_source=source))
+
+        row = Venue.objects.order_by().aggregate(**aggregates)
+
+        enrichable_total = row['enrichable']
+        return {
+            'venues': {'total': row['total'], 'published': row['published']},
+            # Same shape as values('venue_type').annotate(count=...) gave the templates
+            'venue_counts': [
+                {'venue_type': venue_type, 'count': row[f'type_{venue_type}']}
+                for venue_type in sorted(venue_types)
+                if row[f'type_{venue_type}']
+            ],
+            'enrichment': {
+                'total': enrichable_total,
+                'enriched': row['enriched'],
+                'pending': row['pending'],
+                'manual_review': row['manual_review'],
+                'enrichment_rate': round(
+                    (row['enriched'] / enrichable_total * 100) if enrichable_total else 0, 1
+                ),
+                'by_source': {
+                    source: row[f'source_{source}']
+                    for source in sources
+                    if row[f'source_{source}']
+                },
+            },
+        }
+
+
+# Singleton instance
+stats_service = ContentStatsService()
@@ -5,19 +5,51 @@ Orchestration layer for enriching venue data from external APIs.
 Handles matching existing venues to API data and discovering new venues.
 """
 
+import hashlib
 import logging
+import sys
 from datetime import timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Callable, Dict, List, Optional, Tuple, Any
 
-from django.db import transaction
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Q
 from django.utils import timezone
 
-from guide.models import Venue, City, VenueAPIConfig
+from core.http_client import deadline
+from guide.models import Venue, City, EnrichmentRun, VenueAPIConfig
+from .api_configs import get_api_config
+from .call_meter import metered
+from .enrichment_pipeline import EnrichmentPipeline, PipelineStats, QuotaGovernor
+from .composite_venue_service import CompositeVenueService
 from .google_places_service import GooglePlacesService
+from .response_cache import ResponseCache
+from .run_cursor import RunCursor
+from .sharding import Shard
+from .stats_service import stats_service
+from .venue_index import VenueDedupeIndex, normalize_venue_name
+from .venue_writer import VenueBatchWriter
+from .weather_service import CITY_COORDINATES
+from .yelp_service import YelpService
 
 logger = logging.getLogger(__name__)
 
 
+class _UnmeteredReservation:
+    """Stand-in quota reservation for replayed calls, which cost nothing."""
+    units = 0
+
+    def use(self, count: int = 1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
 class VenueEnrichmentService:
     """
     Service for enriching venue data from external APIs.
@@ -27,19 +59,74 @@ class VenueEnrichmentService:
     - Enriching matched venues with ratings, hours, photos
     - Discovering new top-rated venues not in our database
     - Refreshing stale venue data
+
+    Batch operations run through an EnrichmentPipeline: API calls on a
+    bounded worker pool, DB writes on the calling thread, with a
+    QuotaGovernor stopping the run once the day's quota is spent.
+    Their results are buffered in a VenueBatchWriter and flushed with
+    bulk_update/bulk_create.
     """
 
     # Venue types that can be enriched from APIs
     ENRICHABLE_TYPES = ['restaurant', 'cafe_brewery']
 
-    def __init__(self, provider: str = 'google'):
+    # Providers and the Venue field holding each one's id. 'composite'
+    # queries every enabled provider (Google first) and merges results.
+    PROVIDERS = ['google', 'yelp', 'composite']
+    ID_FIELDS = {
+        'google': 'google_place_id',
+        'yelp': 'yelp_business_id',
+    }
+
+    # Batch pipeline defaults
+    MAX_WORKERS = 4
+    MAX_QPS = 10.0
+    QUOTA_BLOCK_SIZE = 10
+    WRITE_BATCH_SIZE = 100
+
+    # Seconds one venue's (or one search's) API calls may take, retries
+    # included, before the fetch gives up on it
+    FETCH_DEADLINE = 60
+
+    # Refresh tiers: ratings/hours on the caller's schedule (days_old),
+    # address/phone/website/photos only this often
+    STATIC_REFRESH_DAYS = 90
+
+    # Smoothing for Venue.rating_volatility (weight of the latest change)
+    VOLATILITY_ALPHA = 0.3
+
+    # Days to wait before searching again for a venue that didn't match,
+    # by number of failed attempts (the last value repeats)
+    MATCH_RETRY_DAYS = [7, 30, 90]
+
+    def __init__(
+        self,
+        provider: str = 'google',
+        workers: Optional[int] = None,
+        max_qps: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        cache_mode: Optional[str] = None,
+        shard: Optional[Shard] = None
+    ):
         """
         Initialize the enrichment service.
 
         Args:
-            provider: API provider to use ('google' or 'yelp')
+            provider: API provider to use ('google', 'yelp' or 'composite')
+            workers: Concurrent API calls for batch runs (default: MAX_WORKERS)
+            max_qps: Client-side calls/second ceiling (default: MAX_QPS)
+            batch_size: Venues per bulk write in batch runs (default: WRITE_BATCH_SIZE)
+            cache_mode: Response cache mode 'off', 'record' or 'replay'
+                (default: GOOGLE_PLACES_CACHE_MODE setting)
+            shard: Only process this shard's venues (and discovery searches)
+                in batch runs
         """
         self.provider = provider
+        self.workers = workers or self.MAX_WORKERS
+        self.max_qps = max_qps or self.MAX_QPS
+        self.batch_size = batch_size or self.WRITE_BATCH_SIZE
+        self.cache_mode = cache_mode
+        self.shard = shard
         self._service = None
         self._config = None
 
@@ -47,31 +134,161 @@ class VenueEnrichmentService:
     def service(self):
         """Lazy-load the provider service."""
         if self._service is None:
-            if self.provider == 'google':
-                self._service = GooglePlacesService()
+            if self.provider == 'composite':
+                self._service = self._build_composite()
             else:
-                raise ValueError(f"Unknown provider: {self.provider}")
+                self._service = self._build_provider(self.provider)
         return self._service
 
+    def _build_provider(self, name: str):
+        if name == 'google':
+            return GooglePlacesService(
+                response_cache=ResponseCache.from_settings('GOOGLE_PLACES', mode=self.cache_mode)
+            )
+        if name == 'yelp':
+            return YelpService()
+        raise ValueError(f"Unknown provider: {self.provider}")
+
+    def _build_composite(self) -> CompositeVenueService:
+        """
+        Composite of the providers that are enabled and have quota today.
+
+        A provider out of quota is left out, so the others fill in for it;
+        if none are available Google is used and is_enabled() reports why.
+        """
+        configs = {name: get_api_config(name) for name in self.ID_FIELDS}
+        for config in configs.values():
+            if config:
+                config.refresh_quota()
+        names = [
+            name for name in self.ID_FIELDS
+            if configs[name] and configs[name].is_enabled and configs[name].has_quota
+        ]
+        return CompositeVenueService([self._build_provider(name) for name in names or ['google']])
+
+    def _resolve_provider(self):
+        """Build the provider service and load its config now (both read the DB)."""
+        return self.service, self.config
+
+    @property
+    def primary_provider(self) -> str:
+        """Provider whose ids and quota drive this service."""
+        if self.provider == 'composite':
+            return self.service.primary
+        return self.provider
+
+    @property
+    def id_field(self) -> str:
+        """Venue field holding the primary provider's id."""
+        return self.ID_FIELDS[self.primary_provider]
+
     @property
     def config(self) -> Optional[VenueAPIConfig]:
         """Get the API configuration for this provider."""
         if self._config is None:
-            self._config = VenueAPIConfig.objects.filter(
-                provider=self.provider
-            ).first()
+            self._config = get_api_config(self.primary_provider)
+            if self._config is not None:
+                self._config.refresh_quota()
         return self._config
 
+    def _charge_secondary_calls(self):
+        """Count a composite's calls to non-primary providers against their quotas."""
+        drain = getattr(self._service, 'drain_call_counts', None)
+        if not drain:
+            return
+        for name, count in drain().items():
+            if name == self.primary_provider or not count:
+                continue
+            config = get_api_config(name)
+            if config:
+                config.increment_requests(count)
+
+    @property
+    def replaying(self) -> bool:
+        """True when API responses come from recordings (no quota is spent)."""
+        mode = self.cache_mode or getattr(settings, 'GOOGLE_PLACES_CACHE_MODE', 'off')
+        return mode == 'replay'
+
     def is_enabled(self) -> bool:
         """Check if the provider is enabled and has quota."""
+        if self.replaying:
+            return True
         if not self.config:
             return False
+        # Gate on the row as it is now, not as it was when the registry loaded
+        self.config.refresh_quota()
         return self.config.is_enabled and self.config.has_quota
 
-    def _track_request(self):
-        """Track an API request against the quota."""
-        if self.config:
-            self.config.increment_requests()
+    def _reserve_request(self):
+        """Atomically reserve one API call from today's quota (or None)."""
+        if self.replaying:
+            return _UnmeteredReservation()
+        if not self.is_enabled():
+            return None
+        return self.config.reserve_requests(1)
+
+    def _spend(self, reservation, fetch, *args):
+        """
+        Call fetch(*args) against a reservation, keeping only the units spent.
+
+        A response served from the response cache makes no API call, so
+        its reserved unit goes back to the quota.
+        """
+        with reservation, metered() as meter, deadline(self.FETCH_DEADLINE):
+            try:
+                return fetch(*args)
+            finally:
+                reservation.use(min(meter.count(self.primary_provider), reservation.units))
+
+    def _run_pipeline(self, items, fetch, write, cost=None) -> PipelineStats:
+        """
+        Run fetch/write over items, drawing API calls from today's quota.
+
+        Quota is reserved atomically in blocks through the governor; each
+        item's estimated cost is settled to the primary provider's calls it
+        actually made, and unused units are refunded when the run ends.
+        The provider service and config are resolved here, on the calling
+        thread, so worker threads never hit the database.
+        """
+        self._resolve_provider()
+        if self.replaying:
+            # Recorded responses: no quota, no pacing
+            governor = QuotaGovernor(budget=sys.maxsize)
+        else:
+            governor = QuotaGovernor(
+                max_qps=self.max_qps,
+                config=self.config,
+                block_size=self.QUOTA_BLOCK_SIZE,
+            )
+        if not self.is_enabled():
+            governor.stop('API provider not enabled or out of quota')
+
+        pipeline = EnrichmentPipeline(
+            fetch=fetch,
+            write=write,
+            governor=governor,
+            workers=self.workers,
+            cost=cost,
+            provider=self.primary_provider,
+            fetch_deadline=self.FETCH_DEADLINE,
+        )
+        try:
+            return pipeline.run(items)
+        finally:
+            governor.close()
+            self._charge_secondary_calls()
+
+    def _writer(self, dry_run: bool = False) -> VenueBatchWriter:
+        """Batch writer for a run's DB writes."""
+        return VenueBatchWriter(batch_size=self.batch_size, dry_run=dry_run)
+
+    @staticmethod
+    def _save(venue: Venue, fields: List[str], writer: Optional[VenueBatchWriter] = None):
+        """Save changed fields now, or queue them on a batch writer."""
+        if writer is not None:
+            writer.update(venue, fields)
+        else:
+            venue.save(update_fields=[*fields, 'updated_at'])
 
     def match_and_enrich_venue(
         self,
@@ -95,35 +312,87 @@ class VenueEnrichmentService:
             return False, "API provider not enabled or out of quota"
 
         # If already has a place ID, just refresh the data
-        if venue.google_place_id:
+        if getattr(venue, self.id_field):
             return self.refresh_venue(venue, dry_run)
 
         # Try to find a match
-        city_name = venue.city.name
-        match_data = self.service.find_match(
+        reservation = self._reserve_request()
+        if not reservation:
+            return False, "API provider not enabled or out of quota"
+        match_data = self._spend(reservation, self._fetch_match, venue)
+        self._charge_secondary_calls()
+        return self._write_match(venue, match_data, dry_run)
+
+    def _fetch_match(self, venue: Venue) -> Optional[Dict[str, Any]]:
+        """Search the provider for a venue (API call only, no DB access)."""
+        return self.service.find_match(
             name=venue.name,
             address=venue.address,
-            city_name=city_name,
+            city_name=venue.city.name,
             state='VA'
         )
-        self._track_request()
 
+    def _write_match(
+        self,
+        venue: Venue,
+        match_data: Optional[Dict[str, Any]],
+        dry_run: bool = False,
+        writer: Optional[VenueBatchWriter] = None
+    ) -> Tuple[bool, str]:
+        """Record the outcome of a match search for a venue."""
         if not match_data:
             if not dry_run:
-                venue.enrichment_status = 'manual_review'
-                venue.save(update_fields=['enrichment_status'])
+                self._record_no_match(venue, writer)
             return False, f"No match found for '{venue.name}'"
 
         # Apply the enrichment data
         if not dry_run:
-            self._apply_enrichment(venue, match_data)
-
-        return True, f"Matched '{venue.name}' to Google Place ID: {match_data.get('google_place_id')}"
+            self._apply_enrichment(venue, match_data, writer)
+
+        if match_data.get('google_place_id'):
+            return True, f"Matched '{venue.name}' to Google Place ID: {match_data['google_place_id']}"
+        return True, f"Matched '{venue.name}' to Yelp business ID: {match_data.get('yelp_business_id')}"
+
+    @staticmethod
+    def match_fingerprint(venue: Venue) -> str:
+        """Hash of the inputs to a match search (name, address, city)."""
+        key = '|'.join([
+            normalize_venue_name(venue.name),
+            normalize_venue_name(venue.address),
+            str(venue.city_id),
+        ])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _record_no_match(self, venue: Venue, writer: Optional[VenueBatchWriter] = None):
+        """Flag for review and back off before searching for it again."""
+        fingerprint = self.match_fingerprint(venue)
+        if fingerprint != venue.match_query_fingerprint:
+            # Name/address changed since the last miss: restart the schedule
+            venue.match_attempts = 0
+        venue.match_attempts += 1
+        schedule = self.MATCH_RETRY_DAYS
+        days = schedule[min(venue.match_attempts, len(schedule)) - 1]
+        venue.next_match_attempt_at = timezone.now() + timedelta(days=days)
+        venue.match_query_fingerprint = fingerprint
+        venue.enrichment_status = 'manual_review'
+        self._save(venue, [
+            'enrichment_status', 'match_attempts',
+            'next_match_attempt_at', 'match_query_fingerprint',
+        ], writer)
+
+    def _match_backed_off(self, venue: Venue) -> bool:
+        """True if an earlier miss for the same query hasn't expired yet."""
+        return bool(
+            venue.next_match_attempt_at
+            and venue.next_match_attempt_at > timezone.now()
+            and venue.match_query_fingerprint == self.match_fingerprint(venue)
+        )
 
     def refresh_venue(
         self,
         venue: Venue,
-        dry_run: bool = False
+        dry_run: bool = False,
+        tier: str = 'static'
     ) -> Tuple[bool, str]:
         """
         Refresh data for a venue that already has a place ID.
@@ -131,79 +400,158 @@ class VenueEnrichmentService:
         Args:
             venue: Venue instance with existing place ID
             dry_run: If True, don't save changes
+            tier: 'static' for a full refresh, 'volatile' for ratings/hours only
 
         Returns:
             Tuple of (success, message)
         """
-        if not venue.google_place_id:
-            return False, "Venue has no Google Place ID"
+        if not getattr(venue, self.id_field):
+            return False, f"Venue has no {self.primary_provider} ID"
 
-        if not self.is_enabled():
+        reservation = self._reserve_request()
+        if not reservation:
             return False, "API provider not enabled or out of quota"
-
-        place_data = self.service.get_place_details(venue.google_place_id)
-        self._track_request()
-
+        place_data = self._spend(reservation, self._fetch_details, venue, tier)
+        self._charge_secondary_calls()
+        return self._write_refresh(venue, place_data, dry_run, tier=tier)
+
+    def _fetch_details(self, venue: Venue, tier: str = 'static') -> Optional[Dict[str, Any]]:
+        """Fetch current place details for a venue (API call only)."""
+        if self.provider == 'composite':
+            ids = {name: getattr(venue, field) for name, field in self.ID_FIELDS.items()}
+            return self.service.get_place_details(ids=ids, tier=tier)
+        return self.service.get_place_details(getattr(venue, self.id_field), tier=tier)
+
+    def _refresh_tier(self, venue: Venue, static_days: Optional[int] = None) -> str:
+        """Pick 'static' if the venue's static fields are due, else 'volatile'."""
+        static_days = static_days or self.STATIC_REFRESH_DAYS
+        if not venue.static_refreshed_at:
+            return 'static'
+        if timezone.now() - venue.static_refreshed_at > timedelta(days=static_days):
+            return 'static'
+        return 'volatile'
+
+    def _write_refresh(
+        self,
+        venue: Venue,
+        place_data: Optional[Dict[str, Any]],
+        dry_run: bool = False,
+        writer: Optional[VenueBatchWriter] = None,
+        tier: str = 'static'
+    ) -> Tuple[bool, str]:
+        """Record the outcome of a details refresh for a venue."""
         if not place_data:
             if not dry_run:
                 venue.enrichment_status = 'failed'
-                venue.save(update_fields=['enrichment_status'])
-            return False, f"Failed to fetch data for place ID: {venue.google_place_id}"
+                self._save(venue, ['enrichment_status'], writer)
+            return False, f"Failed to fetch data for place ID: {getattr(venue, self.id_field)}"
 
         if not dry_run:
-            self._apply_enrichment(venue, place_data)
+            self._apply_enrichment(venue, place_data, writer, static=(tier == 'static'))
+
+        return True, f"Refreshed '{venue.name}' ({tier})"
+
+    def _apply_enrichment(
+        self,
+        venue: Venue,
+        data: Dict[str, Any],
+        writer: Optional[VenueBatchWriter] = None,
+        static: bool = True
+    ) -> List[str]:
+        """
+        Apply enrichment data to a venue and save the fields that changed.
+
+        `static` marks data fetched with the full field mask, which
+        restarts the venue's static refresh clock.
 
-        return True, f"Refreshed '{venue.name}'"
+        Returns:
+            Names of the fields written
+        """
+        changed = []
+
+        def assign(field, value):
+            model_field = Venue._meta.get_field(field)
+            if isinstance(model_field, models.DecimalField) and value is not None:
+                # Providers send floats; compare at the column's precision,
+                # or 4.5 != Decimal('4.5') rewrites the field every refresh
+                value = Decimal(str(value)).quantize(
+                    Decimal(1).scaleb(-model_field.decimal_places), rounding=ROUND_HALF_UP
+                )
+            if getattr(venue, field) != value:
+                setattr(venue, field, value)
+                changed.append(field)
 
-    def _apply_enrichment(self, venue: Venue, data: Dict[str, Any]):
-        """Apply enrichment data to a venue and save."""
         # Only update fields that have values
         if data.get('google_place_id'):
-            venue.google_place_id = data['google_place_id']
+            assign('google_place_id', data['google_place_id'])
+        if data.get('yelp_business_id'):
+            assign('yelp_business_id', data['yelp_business_id'])
         if data.get('address') and not venue.address:
-            venue.address = data['address']
+            assign('address', data['address'])
         if data.get('phone') and not venue.phone:
-            venue.phone = data['phone']
+            assign('phone', data['phone'])
         if data.get('website') and not venue.website:
-            venue.website = data['website']
+            assign('website', data['website'])
         if data.get('latitude'):
-            venue.latitude = data['latitude']
+            assign('latitude', data['latitude'])
         if data.get('longitude'):
-            venue.longitude = data['longitude']
+            assign('longitude', data['longitude'])
         if data.get('rating') is not None:
-            venue.rating = data['rating']
+            if venue.rating is not None:
+                # Track how much the rating moves between refreshes
+                delta = abs(float(data['rating']) - float(venue.rating))
+                assign('rating_volatility', round(
+                    (1 - self.VOLATILITY_ALPHA) * venue.rating_volatility
+                    + self.VOLATILITY_ALPHA * delta, 4
+                ))
+            assign('rating', data['rating'])
         if data.get('rating_count') is not None:
-            venue.rating_count = data['rating_count']
+            assign('rating_count', data['rating_count'])
         if data.get('price_level') is not None:
-            venue.price_level = data['price_level']
+            assign('price_level', data['price_level'])
         if data.get('hours_json'):
-            venue.hours_json = data['hours_json']
+            assign('hours_json', data['hours_json'])
         if data.get('photos_json'):
-            venue.photos_json = data['photos_json']
+            assign('photos_json', data['photos_json'])
 
-        venue.last_enriched_at = timezone.now()
-        venue.enrichment_status = 'success'
-        if venue.data_source == 'manual':
-            # Keep manual but mark as enriched
-            pass
-        venue.save()
+        if venue.match_attempts or venue.next_match_attempt_at:
+            assign('match_attempts', 0)
+            assign('next_match_attempt_at', None)
+            assign('match_query_fingerprint', '')
+
+        # Manual venues keep data_source='manual' but are marked enriched
+        assign('last_enriched_at', timezone.now())
+        assign('enrichment_status', 'success')
+        if static:
+            assign('static_refreshed_at', venue.last_enriched_at)
+        self._save(venue, changed, writer)
+        return changed
 
     def match_and_enrich_city(
         self,
         city: City,
         venue_types: Optional[List[str]] = None,
-        dry_run: bool = False
+        dry_run: bool = False,
+        retry_unmatched: bool = False,
+        run: Optional[EnrichmentRun] = None
     ) -> Dict[str, Any]:
         """
         Match and enrich all venues of specified types in a city.
 
+        Venues whose last search found nothing are skipped until their
+        backoff (MATCH_RETRY_DAYS) expires or their name/address changes.
+
         Args:
             city: City instance
             venue_types: List of venue types to process (default: ENRICHABLE_TYPES)
             dry_run: If True, don't save changes
+            retry_unmatched: Search again for backed-off venues now
+            run: Resumable run; venues behind its cursor are skipped and
+                the cursor is checkpointed as venues are written
 
         Returns:
-            Dictionary with counts of matched, failed, and skipped venues
+            Dictionary with counts of matched, failed, and skipped venues,
+            plus pipeline throughput under 'pipeline'
         """
         if venue_types is None:
             venue_types = self.ENRICHABLE_TYPES
@@ -212,6 +560,7 @@ class VenueEnrichmentService:
             'matched': 0,
             'failed': 0,
             'skipped': 0,
+            'backed_off': 0,
             'details': [],
         }
 
@@ -219,30 +568,54 @@ class VenueEnrichmentService:
             city=city,
             venue_type__in=venue_types,
             data_source='manual',
-            google_place_id='',  # Not yet matched
-        )
-
+            **{self.id_field: ''},  # Not yet matched
+        ).select_related('city')
+        if self.shard:
+            venues = self.shard.filter(venues)
+        if run is not None:
+            venues = run.exclude_processed(venues)
+
+        candidates = []
         for venue in venues:
-            success, message = self.match_and_enrich_venue(venue, dry_run)
+            if venue.venue_type not in self.ENRICHABLE_TYPES:
+                message = f"Venue type '{venue.venue_type}' not enrichable"
+            elif not retry_unmatched and self._match_backed_off(venue):
+                results['backed_off'] += 1
+                message = (
+                    f"No match on last {venue.match_attempts} attempt(s); "
+                    f"retrying after {venue.next_match_attempt_at:%Y-%m-%d}"
+                )
+            else:
+                candidates.append(venue)
+                continue
+            results['skipped'] += 1
             results['details'].append({
                 'venue': venue.name,
-                'success': success,
+                'success': False,
                 'message': message,
             })
 
+        def write(venue, match_data):
+            success, message = self._write_match(venue, match_data, dry_run, writer)
+            results['details'].append({
+                'venue': venue.name,
+                'success': success,
+                'message': message,
+            })
             if success:
                 results['matched'] += 1
             else:
-                if 'not enrichable' in message:
-                    results['skipped'] += 1
-                else:
-                    results['failed'] += 1
-
-            # Check quota after each request
-            if not self.is_enabled():
-                logger.warning("Quota exhausted, stopping enrichment")
-                break
-
+                results['failed'] += 1
+            if cursor:
+                cursor.done(venue, 'matched' if success else 'match_failed')
+
+        with self._writer(dry_run) as writer:
+            cursor = RunCursor(run, candidates, writer) if run is not None else None
+            stats = self._run_pipeline(candidates, self._fetch_match, write)
+            if cursor:
+                cursor.checkpoint()
+        results['pipeline'] = stats.as_dict()
+        results['pipeline_summary'] = stats.summary()
         return results
 
     def discover_new_venues(
@@ -250,7 +623,10 @@ class VenueEnrichmentService:
         city: City,
         venue_types: Optional[List[str]] = None,
         limit: int = 20,
-        dry_run: bool = False
+        dry_run: bool = False,
+        nearby: bool = False,
+        radius_m: Optional[int] = None,
+        run: Optional[EnrichmentRun] = None
     ) -> Dict[str, Any]:
         """
         Discover and add new top-rated venues from the API.
@@ -260,12 +636,23 @@ class VenueEnrichmentService:
             venue_types: Types of venues to search (default: ENRICHABLE_TYPES)
             limit: Maximum venues to discover per type
             dry_run: If True, don't create new venues
+            nearby: Search a circle around the city's coordinates instead
+                of by text query
+            radius_m: Search radius in meters for nearby search
+            run: Resumable run; types it already discovered are skipped
 
         Returns:
             Dictionary with counts of added and existing venues
         """
         if venue_types is None:
             venue_types = self.ENRICHABLE_TYPES
+        if self.shard and not self.shard.owns_search(city.pk):
+            venue_types = []
+        if run is not None:
+            venue_types = [
+                t for t in venue_types
+                if EnrichmentRun.cursor_key(city.pk, t) not in run.discovered
+            ]
 
         if not self.is_enabled():
             return {'error': 'API provider not enabled or out of quota'}
@@ -276,180 +663,262 @@ class VenueEnrichmentService:
             'details': [],
         }
 
-        for venue_type in venue_types:
-            # Search for top venues
-            search_results = self.service.search_nearby(
+        location = None
+        if nearby:
+            coords = CITY_COORDINATES.get(city.slug)
+            if coords:
+                location = {'lat': coords['lat'], 'lon': coords['lon']}
+                if radius_m:
+                    location['radius'] = radius_m
+            else:
+                logger.warning(f"No coordinates for {city.slug}; using text search")
+
+        def fetch(venue_type):
+            kwargs = {'location': location} if location else {}
+            return self.service.search_nearby(
                 city_name=city.name,
                 state='VA',
                 venue_type=venue_type,
-                limit=limit
+                limit=limit,
+                **kwargs
             )
-            self._track_request()
-
-            for place_data in search_results:
-                google_place_id = place_data.get('google_place_id')
-
-                # Check if we already have this venue
-                existing = Venue.objects.filter(
-                    google_place_id=google_place_id
-                ).first()
-
-                if existing:
-                    results['existing'] += 1
-                    results['details'].append({
-                        'name': place_data.get('name'),
-                        'action': 'skipped',
-                        'reason': 'Already exists',
-                    })
-                    continue
-
-                # Check by name similarity
-                name = place_data.get('name', '')
-                name_match = Venue.objects.filter(
-                    city=city,
-                    name__iexact=name,
-                    venue_type=venue_type
-                ).first()
-
-                if name_match:
-                    # Update existing with API data
-                    if not dry_run:
-                        self._apply_enrichment(name_match, place_data)
-                    results['existing'] += 1
-                    results['details'].append({
-                        'name': name,
-                        'action': 'matched',
-                        'reason': 'Matched by name',
-                    })
-                    continue
-
-                # Create new venue
-                if not dry_run:
-                    venue = Venue.objects.create(
-                        city=city,
-                        venue_type=venue_type,
-                        name=name,
-                        address=place_data.get('address', ''),
-                        phone=place_data.get('phone', ''),
-                        website=place_data.get('website', ''),
-                        latitude=place_data.get('latitude'),
-                        longitude=place_data.get('longitude'),
-                        google_place_id=google_place_id,
-                        rating=place_data.get('rating'),
-                        rating_count=place_data.get('rating_count'),
-                        price_level=place_data.get('price_level'),
-                        hours_json=place_data.get('hours_json'),
-                        photos_json=place_data.get('photos_json'),
-                        data_source='google',
-                        last_enriched_at=timezone.now(),
-                        enrichment_status='success',
-                        is_published=True,
-                    )
-
-                results['added'] += 1
-                results['details'].append({
-                    'name': name,
-                    'action': 'added',
-                    'rating': place_data.get('rating'),
-                })
-
-            if not self.is_enabled():
-                logger.warning("Quota exhausted, stopping discovery")
-                break
 
+        # Hold quota for every page/type call a search can make; the
+        # pipeline gives back the pages a search didn't need
+        estimate = getattr(self.service, 'estimate_search_calls', None)
+        cost = (lambda venue_type: estimate(venue_type, limit, nearby=bool(location))) if estimate else None
+
+        # Existence checks run against this index instead of two queries
+        # per search result; it's updated as venues are added or matched.
+        index = VenueDedupeIndex.for_city(city, venue_types)
+
+        def write(venue_type, search_results):
+            # One transaction per city and type
+            added_before = results['added']
+            for place_data in search_results or []:
+                self._write_discovered(
+                    city, venue_type, place_data, results, dry_run, writer, index
+                )
+            writer.flush()
+            if run is not None:
+                run.discovered.append(EnrichmentRun.cursor_key(city.pk, venue_type))
+                run.bump('added', results['added'] - added_before)
+                run.checkpoint()
+
+        with self._writer(dry_run) as writer:
+            stats = self._run_pipeline(venue_types, fetch, write, cost=cost)
+        results['pipeline'] = stats.as_dict()
+        results['pipeline_summary'] = stats.summary()
         return results
 
+    def _write_discovered(
+        self,
+        city: City,
+        venue_type: str,
+        place_data: Dict[str, Any],
+        results: Dict[str, Any],
+        dry_run: bool = False,
+        writer: Optional[VenueBatchWriter] = None,
+        index: Optional[VenueDedupeIndex] = None
+    ):
+        """Add or match a single search result from discovery."""
+        if index is None:
+            index = VenueDedupeIndex.for_city(city, [venue_type])
+        google_place_id = place_data.get('google_place_id') or ''
+        yelp_business_id = place_data.get('yelp_business_id') or ''
+        place_id = google_place_id or yelp_business_id
+
+        # Check if we already have this venue
+        if index.has_place_id(place_id):
+            results['existing'] += 1
+            results['details'].append({
+                'name': place_data.get('name'),
+                'action': 'skipped',
+                'reason': 'Already exists',
+            })
+            return
+
+        # Check by normalized name (case and punctuation insensitive)
+        name = place_data.get('name', '')
+        name_match = index.find_by_name(venue_type, name)
+
+        if name_match:
+            # Update existing with API data
+            if not dry_run:
+                self._apply_enrichment(name_match, place_data, writer)
+            if place_id:
+                index.place_ids.add(place_id)
+            results['existing'] += 1
+            results['details'].append({
+                'name': name,
+                'action': 'matched',
+                'reason': 'Matched by name',
+            })
+            return
+
+        # Create new venue
+        now = timezone.now()
+        venue = Venue(
+            city=city,
+            venue_type=venue_type,
+            name=name,
+            address=place_data.get('address', ''),
+            phone=place_data.get('phone', ''),
+            website=place_data.get('website', ''),
+            latitude=place_data.get('latitude'),
+            longitude=place_data.get('longitude'),
+            google_place_id=google_place_id,
+            yelp_business_id=yelp_business_id,
+            rating=place_data.get('rating'),
+            rating_count=place_data.get('rating_count'),
+            price_level=place_data.get('price_level'),
+            hours_json=place_data.get('hours_json'),
+            photos_json=place_data.get('photos_json'),
+            data_source='google' if google_place_id else 'yelp',
+            last_enriched_at=now,
+            static_refreshed_at=now,
+            enrichment_status='success',
+            is_published=True,
+        )
+        if not dry_run:
+            if writer is not None:
+                writer.create(venue)
+            else:
+                venue.save()
+        index.add(venue)
+
+        results['added'] += 1
+        results['details'].append({
+            'name': name,
+            'action': 'added',
+            'rating': place_data.get('rating'),
+        })
+
     def refresh_stale_venues(
         self,
         days_old: int = 7,
         limit: Optional[int] = None,
-        dry_run: bool = False
+        dry_run: bool = False,
+        static_days: Optional[int] = None,
+        tier: Optional[str] = None,
+        run: Optional[EnrichmentRun] = None
     ) -> Dict[str, Any]:
         """
         Refresh venues that haven't been updated in N days.
 
+        Each venue gets the cheap 'volatile' field mask (rating, rating
+        count, current hours) unless its static fields are older than
+        static_days, in which case it gets a full 'static' refresh.
+
         Args:
-            days_old: Refresh venues older than this many days
+            days_old: Refresh venues whose ratings/hours are older than this
             limit: Maximum number of venues to refresh
             dry_run: If True, don't save changes
+            static_days: Full refresh when static fields are older than
+                this (default: STATIC_REFRESH_DAYS)
+            tier: Force 'volatile' or 'static' for every venue (default: per venue)
+            run: Resumable run; venues behind its cursor are skipped
 
         Returns:
             Dictionary with refresh results
         """
-        cutoff_date = timezone.now() - timedelta(days=days_old)
+        now = timezone.now()
+        cutoff_date = now - timedelta(days=days_old)
+        static_cutoff = now - timedelta(days=static_days or self.STATIC_REFRESH_DAYS)
 
         # Find stale venues with Google Place IDs
         stale_venues = Venue.objects.filter(
-            google_place_id__isnull=False,
             venue_type__in=self.ENRICHABLE_TYPES,
         ).exclude(
-            google_place_id=''
+            **{self.id_field: ''}
         ).filter(
-            last_enriched_at__lt=cutoff_date
+            Q(last_enriched_at__lt=cutoff_date) | Q(static_refreshed_at__lt=static_cutoff)
         ).order_by('last_enriched_at')
+        if self.shard:
+            stale_venues = self.shard.filter(stale_venues)
+        if run is not None:
+            stale_venues = run.exclude_processed(stale_venues)
 
         if limit:
             stale_venues = stale_venues[:limit]
 
+        # Tier is picked up front, on this thread, and carried with the venue
+        items = [
+            (venue, tier or self._refresh_tier(venue, static_days))
+            for venue in stale_venues
+        ]
+        return self.refresh_venue_batch(items, dry_run, run=run)
+
+    def refresh_venue_batch(
+        self,
+        items: List[Tuple[Venue, str]],
+        dry_run: bool = False,
+        on_result: Optional[Callable[[Venue, bool], None]] = None,
+        run: Optional[EnrichmentRun] = None
+    ) -> Dict[str, Any]:
+        """
+        Refresh a list of (venue, tier) pairs through the pipeline.
+
+        on_result(venue, success), if given, is called after each venue's
+        result is recorded (e.g. to track progress through a plan). With
+        a run, its cursor is advanced and checkpointed as venues are written.
+
+        Returns:
+            Dictionary with refresh results; details carry venue_id
+        """
         results = {
             'refreshed': 0,
             'failed': 0,
+            'by_tier': {'volatile': 0, 'static': 0},
             'details': [],
         }
 
-        for venue in stale_venues:
-            success, message = self.refresh_venue(venue, dry_run)
+        def fetch(item):
+            venue, venue_tier = item
+            return self._fetch_details(venue, venue_tier)
+
+        def write(item, place_data):
+            venue, venue_tier = item
+            success, message = self._write_refresh(
+                venue, place_data, dry_run, writer, tier=venue_tier
+            )
             results['details'].append({
                 'venue': venue.name,
+                'venue_id': venue.pk,
                 'success': success,
                 'message': message,
             })
-
             if success:
                 results['refreshed'] += 1
+                results['by_tier'][venue_tier] += 1
             else:
                 results['failed'] += 1
-
-            if not self.is_enabled():
-                logger.warning("Quota exhausted, stopping refresh")
-                break
-
+            if on_result:
+                on_result(venue, success)
+            if cursor:
+                cursor.done(venue, 'refreshed' if success else 'refresh_failed')
+
+        with self._writer(dry_run) as writer:
+            cursor = RunCursor(run, [venue for venue, _ in items], writer) if run is not None else None
+            stats = self._run_pipeline(items, fetch, write)
+            if cursor:
+                cursor.checkpoint()
+        results['pipeline'] = stats.as_dict()
+        results['pipeline_summary'] = stats.summary()
         return results
 
     def get_enrichment_stats(self) -> Dict[str, Any]:
         """
         Get statistics about venue enrichment status.
 
+        Counts come from the cached stats snapshot (see stats_service);
+        quota and last sync are read from this provider's config.
+
         Returns:
             Dictionary with enrichment statistics
         """
-        from django.db.models import Count
-
-        total = Venue.objects.filter(venue_type__in=self.ENRICHABLE_TYPES).count()
-        enriched = Venue.objects.filter(
-            venue_type__in=self.ENRICHABLE_TYPES,
-            enrichment_status='success'
-        ).count()
-        pending = Venue.objects.filter(
-            venue_type__in=self.ENRICHABLE_TYPES,
-            enrichment_status='none'
-        ).count()
-        manual_review = Venue.objects.filter(
-            venue_type__in=self.ENRICHABLE_TYPES,
-            enrichment_status='manual_review'
-        ).count()
-
-        by_source = Venue.objects.filter(
-            venue_type__in=self.ENRICHABLE_TYPES
-        ).values('data_source').annotate(count=Count('id'))
-
         return {
-            'total': total,
-            'enriched': enriched,
-            'pending': pending,
-            'manual_review': manual_review,
-            'enrichment_rate': round((enriched / total * 100) if total else 0, 1),
-            'by_source': {item['data_source']: item['count'] for item in by_source},
+            **stats_service.snapshot()['enrichment'],
             'quota_remaining': self.config.quota_remaining if self.config else 0,
             'last_sync': self.config.last_full_sync if self.config else None,
         }
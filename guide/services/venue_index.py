@@ -0,0 +1,66 @@
+"""
+Venue Dedupe Index
+
+In-memory lookup of existing venues used by discovery to decide whether
+a search result is new, without a query per candidate.
+"""
+
+import re
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from guide.models import City, Venue
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+def normalize_venue_name(name: str) -> str:
+    """Casefold, strip punctuation and collapse whitespace."""
+    return ' '.join(_PUNCTUATION.sub('', (name or '').casefold()).split())
+
+
+class VenueDedupeIndex:
+    """
+    Existing place ids and normalized venue names for one city.
+
+    Provider ids (Google place ids and Yelp business ids, which never
+    collide) are loaded across all cities (a search for one city can
+    return places already stored under a neighbour); names are scoped to
+    the city and venue type, like the queries they replace. Call add() for
+    venues created or matched during the run so later results see them.
+    """
+
+    def __init__(self):
+        self.place_ids: Set[str] = set()
+        self.names: Dict[Tuple[str, str], Venue] = {}
+
+    @classmethod
+    def for_city(cls, city: City, venue_types: Iterable[str]) -> 'VenueDedupeIndex':
+        """Load the index with two queries."""
+        index = cls()
+        index.place_ids.update(
+            Venue.objects.exclude(google_place_id='')
+            .values_list('google_place_id', flat=True)
+        )
+        index.place_ids.update(
+            Venue.objects.exclude(yelp_business_id='')
+            .values_list('yelp_business_id', flat=True)
+        )
+        venues = Venue.objects.filter(city=city, venue_type__in=list(venue_types))
+        for venue in venues:
+            # Keep the first venue per name in default ordering, like .first() did
+            key = (venue.venue_type, normalize_venue_name(venue.name))
+            index.names.setdefault(key, venue)
+        return index
+
+    def has_place_id(self, place_id: Optional[str]) -> bool:
+        return bool(place_id) and place_id in self.place_ids
+
+    def find_by_name(self, venue_type: str, name: str) -> Optional[Venue]:
+        return self.names.get((venue_type, normalize_venue_name(name)))
+
+    def add(self, venue: Venue):
+        """Record a venue created or matched during this run."""
+        for place_id in (venue.google_place_id, venue.yelp_business_id):
+            if place_id:
+                self.place_ids.add(place_id)
+        self.names.setdefault((venue.venue_type, normalize_venue_name(venue.name)), venue)
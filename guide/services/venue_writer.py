@@ -0,0 +1,148 @@
+"""
+Venue Batch Writer
+
+Accumulates venue updates and inserts from enrichment runs and flushes
+them with bulk_update/bulk_create, so a batch run costs O(batches) DB
+round-trips instead of O(venues). New venues whose provider id is
+already in the table (inserted by another run since this one loaded its
+dedupe index) are dropped at flush time.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Set, Tuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from guide.models import Venue
+
+from .stats_service import stats_service
+
+logger = logging.getLogger(__name__)
+
+
+class VenueBatchWriter:
+    """
+    Buffer venue writes and flush them in batches.
+
+    Updates record only the fields that changed; at flush time venues are
+    grouped by their changed-field set and each group is written with one
+    bulk_update (plus updated_at, which bulk_update doesn't touch on its
+    own). New venues are written with bulk_create. Each flush runs in a
+    single transaction.
+
+    Usable as a context manager; pending writes are flushed on exit.
+    """
+
+    def __init__(self, batch_size: int = 100, dry_run: bool = False):
+        """
+        Args:
+            batch_size: Pending writes that trigger an automatic flush, also
+                used as the bulk_update/bulk_create batch size
+            dry_run: If True, discard writes instead of flushing them
+        """
+        self.batch_size = max(1, batch_size)
+        self.dry_run = dry_run
+        self._updates: Dict[int, Tuple[Venue, Set[str]]] = {}
+        self._creates: List[Venue] = []
+        self.updated = 0
+        self.created = 0
+        self.skipped = 0
+        self.flushes = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._updates) + len(self._creates)
+
+    def update(self, venue: Venue, fields: Iterable[str]):
+        """Queue an update of the given fields on an existing venue."""
+        fields = set(fields)
+        if not fields or self.dry_run:
+            return
+        if venue.pk in self._updates:
+            fields |= self._updates[venue.pk][1]
+        self._updates[venue.pk] = (venue, fields)
+        self._maybe_flush()
+
+    def create(self, venue: Venue):
+        """Queue a new venue for insertion."""
+        if self.dry_run:
+            return
+        self._creates.append(venue)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write all pending updates and inserts in one transaction."""
+        if not self.pending:
+            return
+
+        updates, self._updates = self._updates, {}
+        creates, self._creates = self._creates, []
+
+        groups: Dict[frozenset, List[Venue]] = {}
+        for venue, fields in updates.values():
+            groups.setdefault(frozenset(fields), []).append(venue)
+
+        now = timezone.now()
+        with transaction.atomic():
+            for fields, venues in groups.items():
+                for venue in venues:
+                    venue.updated_at = now
+                Venue.objects.bulk_update(
+                    venues,
+                    sorted(fields | {'updated_at'}),
+                    batch_size=self.batch_size,
+                )
+            if creates:
+                creates = self._not_in_table(creates)
+                Venue.objects.bulk_create(creates, batch_size=self.batch_size)
+
+        # bulk_update/bulk_create don't send signals
+        stats_service.invalidate()
+
+        self.updated += len(updates)
+        self.created += len(creates)
+        self.flushes += 1
+        logger.debug(
+            f"Flushed {len(updates)} venue updates ({len(groups)} field groups) "
+            f"and {len(creates)} inserts"
+        )
+
+    def _not_in_table(self, venues: List[Venue]) -> List[Venue]:
+        """Drop venues whose Google or Yelp id is already stored (or repeated)."""
+        if connection.vendor == 'postgresql':
+            # Serialize inserting runs until commit, so two can't both
+            # pass the check below for the same place
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext('guide_venue_insert'))")
+
+        taken = set()
+        for field in ('google_place_id', 'yelp_business_id'):
+            ids = {getattr(venue, field) for venue in venues} - {''}
+            if ids:
+                taken.update(
+                    Venue.objects.filter(**{f'{field}__in': ids}).values_list(field, flat=True)
+                )
+
+        fresh = []
+        for venue in venues:
+            ids = {venue.google_place_id, venue.yelp_business_id} - {''}
+            if ids & taken:
+                self.skipped += 1
+                logger.info(f"Skipped inserting {venue.name!r}: place already stored")
+                continue
+            taken |= ids
+            fresh.append(venue)
+        return fresh
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # API calls for buffered results are already paid for; keep them
+        self.flush()
+        return False
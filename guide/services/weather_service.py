@@ -11,9 +11,10 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
-import requests
 from django.core.cache import cache
 
+from core.http_client import http_client
+
 logger = logging.getLogger(__name__)
 
 # Hampton Roads city coordinates
@@ -201,7 +202,7 @@ class WeatherService:
             'forecast_days': 5,
         }
 
-        response = requests.get(self.BASE_URL, params=params, timeout=10)
+        response = http_client.get(self.BASE_URL, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -1,28 +1,49 @@
 """
-Yelp Fusion Service (Stub)
+Yelp Fusion Service
 
-Placeholder for future Yelp Fusion API integration.
+Client for the Yelp Fusion API (v3) to fetch venue data.
+Used on its own or alongside Google Places via CompositeVenueService.
 """
 
 import logging
+import time
+import requests
 from typing import Dict, List, Optional, Any
+from django.conf import settings
+
+from core.http_client import can_resend, http_client, remaining_time
 
 from .base_venue_service import BaseVenueService
+from .call_meter import record_call
+from .rate_limiter import RateLimiter, retry_after_seconds
 
 logger = logging.getLogger(__name__)
 
+# Yelp allows 5000 calls/day and throttles bursts with 429s
+YELP_RATE_LIMITS = {
+    'search': {'per_minute': 300, 'burst': 10},
+    'details': {'per_minute': 300, 'burst': 10},
+}
+
+yelp_limiter = RateLimiter('yelp', getattr(settings, 'YELP_RATE_LIMITS', YELP_RATE_LIMITS))
+
 
 class YelpService(BaseVenueService):
     """
     Service for interacting with Yelp Fusion API.
 
-    This is a stub implementation for future development.
     Yelp provides complementary data to Google Places:
-    - More detailed reviews
-    - Different rating scale
+    - Independent ratings and review counts
+    - Price level and hours for places Google lacks
     - Additional business categories
+
+    Yelp doesn't return a business's own website (only its Yelp page),
+    and its photos can't be served by the Google photo proxy, so both are
+    left empty in normalized data.
     """
 
+    BASE_URL = "https://api.yelp.com/v3"
+
     # Map our venue types to Yelp categories
     # See: https://www.yelp.com/developers/documentation/v3/all_category_list
     VENUE_TYPE_MAP = {
@@ -30,46 +51,192 @@ class YelpService(BaseVenueService):
         'cafe_brewery': ['coffee', 'breweries', 'bars'],
     }
 
-    def __init__(self, api_key: Optional[str] = None):
+    # Search paging: Yelp returns at most 50 per page
+    SEARCH_PAGE_SIZE = 50
+    NEARBY_RADIUS_METERS = 15000
+    MAX_RADIUS_METERS = 40000  # Yelp rejects anything larger
+    MAX_RETRIES = 3
+    RATE_LIMIT_TIMEOUT = 60
+    REQUEST_TIMEOUT = 30
+    GATEWAY_STATUS_CODES = (502, 504)
+
+    DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """
         Initialize the Yelp service.
 
         Args:
-            api_key: Yelp Fusion API key
+            api_key: Yelp Fusion API key. If not provided, reads from settings.
+            base_url: API root (default: YELP_API_BASE_URL setting or BASE_URL)
         """
-        self.api_key = api_key
-        logger.info("Yelp service initialized (stub - not yet implemented)")
+        self.api_key = api_key or self._get_api_key()
+        self.base_url = (base_url or getattr(settings, 'YELP_API_BASE_URL', '') or self.BASE_URL).rstrip('/')
+        if not self.api_key:
+            logger.warning("Yelp API key not configured")
+
+    def _get_api_key(self) -> Optional[str]:
+        """Get API key from settings or environment."""
+        try:
+            from .api_configs import get_api_config
+            config = get_api_config('yelp', enabled_only=True)
+            if config:
+                import os
+                key_name = config.api_key_name
+                return os.environ.get(key_name) or getattr(settings, key_name, None)
+        except Exception:
+            pass
+
+        return getattr(settings, 'YELP_API_KEY', None)
 
     @property
     def provider_name(self) -> str:
         return 'yelp'
 
+    def _make_request(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        GET a Yelp Fusion endpoint.
+
+        Args:
+            path: Path below the API root (e.g., 'businesses/search')
+            params: Query parameters
+
+        Returns:
+            Response JSON or None on error
+        """
+        if not self.api_key:
+            logger.error("Yelp API key not configured")
+            return None
+
+        url = f"{self.base_url}/{path}"
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Accept': 'application/json',
+        }
+        endpoint_class = 'search' if path.startswith('businesses/search') else 'details'
+
+        # One request per attempt (retry='none'), so each retry takes a
+        # rate limiter token and is metered
+        for attempt in range(self.MAX_RETRIES + 1):
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                logger.error(f"Yelp deadline passed before {endpoint_class} request")
+                return None
+            if not yelp_limiter.acquire(endpoint_class, timeout=self.RATE_LIMIT_TIMEOUT):
+                logger.error(f"Yelp rate limit wait timed out for {endpoint_class}")
+                return None
+
+            record_call(self.provider_name)
+            try:
+                response = http_client.get(
+                    url, params=params, headers=headers, timeout=self.REQUEST_TIMEOUT, retry='none'
+                )
+
+                if response.status_code in self.GATEWAY_STATUS_CODES and attempt < self.MAX_RETRIES:
+                    delay = retry_after_seconds(response, attempt)
+                    logger.warning(
+                        f"Yelp {response.status_code} on {endpoint_class}, retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 1}/{self.MAX_RETRIES})"
+                    )
+                    time.sleep(delay)
+                    continue
+
+                if response.status_code == 429 and attempt < self.MAX_RETRIES:
+                    delay = retry_after_seconds(response, attempt)
+                    yelp_limiter.penalize(endpoint_class, delay)
+                    logger.warning(
+                        f"Yelp 429 on {endpoint_class}, retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 1}/{self.MAX_RETRIES})"
+                    )
+                    time.sleep(delay)
+                    continue
+
+                response.raise_for_status()
+                return response.json()
+
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt < self.MAX_RETRIES and can_resend('GET', e):
+                    delay = retry_after_seconds(None, attempt)
+                    logger.warning(
+                        f"Yelp {type(e).__name__} on {endpoint_class}, retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 1}/{self.MAX_RETRIES})"
+                    )
+                    time.sleep(delay)
+                    continue
+                logger.error(f"Yelp API error: {e}")
+                return None
+
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Yelp API error: {e}")
+                return None
+
+        return None
+
     def search_nearby(
         self,
         city_name: str,
         state: str = 'VA',
         venue_type: str = 'restaurant',
-        limit: int = 20
+        limit: int = 20,
+        location: Optional[Dict[str, float]] = None
     ) -> List[Dict[str, Any]]:
         """
-        Search for venues near a city.
+        Search for top-rated businesses in a city.
 
-        Not yet implemented - returns empty list.
+        All mapped categories are searched in one request (Yelp ORs a
+        comma-separated category list), paging by offset up to `limit`.
+        With `location` ({'lat', 'lon', 'radius'} in meters) the search
+        covers that circle instead of the city name.
         """
-        logger.warning("Yelp search_nearby not implemented")
-        return []
+        categories = self.VENUE_TYPE_MAP.get(venue_type, ['restaurants'])
+        params = {
+            'categories': ','.join(categories),
+            'sort_by': 'rating',
+            'limit': min(limit, self.SEARCH_PAGE_SIZE),
+        }
+        if location:
+            params['latitude'] = location['lat']
+            params['longitude'] = location['lon']
+            params['radius'] = int(min(
+                location.get('radius', self.NEARBY_RADIUS_METERS), self.MAX_RADIUS_METERS
+            ))
+        else:
+            params['location'] = f"{city_name}, {state}"
+
+        businesses = []
+        while len(businesses) < limit:
+            result = self._make_request('businesses/search', {**params, 'offset': len(businesses)})
+            page = (result or {}).get('businesses', [])
+            businesses.extend(page)
+            if len(page) < params['limit'] or len(businesses) >= (result or {}).get('total', 0):
+                break
+
+        results = []
+        for business in businesses[:limit]:
+            normalized = self.normalize_venue_data(business)
+            normalized['_search_type'] = categories[0]
+            results.append(normalized)
+        return results
 
     def get_place_details(
         self,
         place_id: str,
-        fields: Optional[List[str]] = None
+        fields: Optional[List[str]] = None,
+        tier: str = 'static'
     ) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a Yelp business.
 
-        Not yet implemented - returns None.
+        Yelp has no field masks, so fields and tier are accepted for
+        interface compatibility and ignored.
         """
-        logger.warning("Yelp get_place_details not implemented")
+        result = self._make_request(f"businesses/{place_id}")
+        if result:
+            return self.normalize_venue_data(result)
         return None
 
     def find_match(
@@ -82,28 +249,85 @@ class YelpService(BaseVenueService):
         """
         Find a matching Yelp business for an existing venue.
 
-        Not yet implemented - returns None.
+        Searches by name near the venue's address (or city) and accepts
+        the first result whose name overlaps, or the top result if it's in
+        the right city.
         """
-        logger.warning("Yelp find_match not implemented")
+        if not name or not name.strip():
+            # An empty term would "match" whatever Yelp ranks first
+            return None
+
+        params = {
+            'term': name,
+            'location': address or f"{city_name}, {state}",
+            'limit': 5,
+        }
+        result = self._make_request('businesses/search', params)
+        businesses = (result or {}).get('businesses', [])
+        if not businesses:
+            return None
+
+        name_lower = name.strip().lower()
+        for business in businesses:
+            business_name = (business.get('name') or '').strip().lower()
+            if business_name and (name_lower in business_name or business_name in name_lower):
+                return self.normalize_venue_data(business)
+
+        first = businesses[0]
+        if city_name.lower() == first.get('location', {}).get('city', '').lower():
+            return self.normalize_venue_data(first)
+
         return None
 
+    def _normalize_hours(self, hours: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Convert Yelp hours to the Google-style hours_json we store."""
+        regular = next((h for h in hours if h.get('hours_type', 'REGULAR') == 'REGULAR'), None)
+        if not regular:
+            return None
+
+        def fmt(hhmm):
+            hour, minute = int(hhmm[:2]), int(hhmm[2:])
+            suffix = 'AM' if hour < 12 else 'PM'
+            return f"{(hour % 12) or 12}:{minute:02d} {suffix}"
+
+        periods = []
+        by_day = {i: [] for i in range(7)}
+        for slot in regular.get('open', []):
+            day = slot.get('day', 0)  # Yelp: 0 = Monday
+            google_day = (day + 1) % 7  # Google: 0 = Sunday
+            close_day = (google_day + 1) % 7 if slot.get('is_overnight') else google_day
+            periods.append({
+                'open': {'day': google_day, 'hour': int(slot['start'][:2]), 'minute': int(slot['start'][2:])},
+                'close': {'day': close_day, 'hour': int(slot['end'][:2]), 'minute': int(slot['end'][2:])},
+            })
+            by_day[day].append(f"{fmt(slot['start'])} – {fmt(slot['end'])}")
+
+        descriptions = [
+            f"{self.DAY_NAMES[day]}: {', '.join(slots) if slots else 'Closed'}"
+            for day, slots in by_day.items()
+        ]
+        return {'weekdayDescriptions': descriptions, 'periods': periods}
+
     def normalize_venue_data(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Normalize Yelp data to our Venue model format.
-
-        Placeholder for future implementation.
         """
+        location = raw_data.get('location') or {}
+        coordinates = raw_data.get('coordinates') or {}
+        price = raw_data.get('price')
+        hours = raw_data.get('hours')
+
         return {
             'yelp_business_id': raw_data.get('id', ''),
             'name': raw_data.get('name', ''),
-            'address': '',
-            'phone': raw_data.get('phone', ''),
-            'website': raw_data.get('url', ''),
-            'latitude': None,
-            'longitude': None,
+            'address': ', '.join(location.get('display_address') or []),
+            'phone': raw_data.get('display_phone', ''),
+            'website': '',
+            'latitude': coordinates.get('latitude'),
+            'longitude': coordinates.get('longitude'),
             'rating': raw_data.get('rating'),
             'rating_count': raw_data.get('review_count'),
-            'price_level': len(raw_data.get('price', '')) if raw_data.get('price') else None,
-            'hours_json': None,
+            'price_level': len(price) if price else None,
+            'hours_json': self._normalize_hours(hours) if hours else None,
             'photos_json': None,
         }
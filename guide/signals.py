@@ -0,0 +1,41 @@
+"""
+Guide Signal Handlers
+
+Connected in GuideConfig.ready().
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from .content_sync import SYNC_LABELS, instance_natural_key
+from .models import SyncTombstone
+from .services.api_configs import api_configs
+from .services.stats_service import stats_service
+
+
+def invalidate_content_stats(sender, **kwargs):
+    """Drop the cached CMS stats snapshot when counted content changes."""
+    stats_service.invalidate()
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """Remember a deleted synced row so delta exports can delete it downstream."""
+    key = instance_natural_key(instance)
+    if key is not None:
+        SyncTombstone.objects.create(model_label=SYNC_LABELS[sender], natural_key=key)
+
+
+def connect():
+    api_configs.connect()
+    for model in stats_service.WATCHED_MODELS:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                invalidate_content_stats,
+                sender=model,
+                dispatch_uid=f'content_stats_{model._meta.label_lower}_{signal is post_save}',
+            )
+    for model in SYNC_LABELS:
+        post_delete.connect(
+            record_tombstone,
+            sender=model,
+            dispatch_uid=f'sync_tombstone_{model._meta.label_lower}',
+        )
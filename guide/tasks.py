@@ -0,0 +1,107 @@
+"""
+Background tasks for the guide app.
+
+Run by `python manage.py run_worker`; queued from the CMS with
+core.jobs.enqueue.
+"""
+
+import logging
+from typing import List, Optional
+
+from django.utils import timezone
+
+from core.jobs import PermanentJobError, task
+from .models import City, Venue
+from .services import VenueEnrichmentService, pulse_service
+
+logger = logging.getLogger(__name__)
+
+
+def _enabled_service(provider: str = 'google') -> VenueEnrichmentService:
+    service = VenueEnrichmentService(provider=provider)
+    if not service.is_enabled():
+        raise PermanentJobError("API provider is not enabled or out of quota.")
+    return service
+
+
+@task('guide.sync_city')
+def sync_city(
+    job,
+    city_slug: str,
+    venue_types: Optional[List[str]] = None,
+    discover: bool = False,
+    provider: str = 'google',
+    mark_full_sync: bool = False
+):
+    """Match and enrich a city's venues, optionally discovering new ones."""
+    city = City.objects.filter(slug=city_slug).first()
+    if not city:
+        raise PermanentJobError(f"City not found: {city_slug}")
+    service = _enabled_service(provider)
+    steps = 2 if discover else 1
+
+    job.progress(0, steps, f"Matching {city.name} venues")
+    results = service.match_and_enrich_city(city, venue_types=venue_types)
+    message = f"{results['matched']} venues enriched"
+    added = 0
+
+    if discover:
+        job.progress(1, steps, f"Discovering new {city.name} venues")
+        discover_results = service.discover_new_venues(
+            city,
+            venue_types=venue_types,
+            limit=service.config.venues_per_city if service.config else 20
+        )
+        added = discover_results.get('added', 0)
+        message += f", {added} new venues discovered"
+
+    if mark_full_sync and service.config:
+        # Only this field: the config's quota counters are written
+        # concurrently by atomic UPDATEs and must not be overwritten
+        service.config.last_full_sync = timezone.now()
+        service.config.save(update_fields=['last_full_sync', 'updated_at'])
+
+    job.progress(steps, steps, message)
+    return {
+        'matched': results['matched'],
+        'failed': results['failed'],
+        'added': added,
+        'message': f"Sync complete for {city.name}: {message}",
+    }
+
+
+@task('guide.refresh_venue')
+def refresh_venue(job, venue_id: int, provider: str = 'google'):
+    """Refresh one venue, matching it first if it has no provider id."""
+    venue = Venue.objects.filter(pk=venue_id).first()
+    if not venue:
+        raise PermanentJobError(f"Venue not found: {venue_id}")
+    service = _enabled_service(provider)
+
+    job.progress(0, 1, f"Refreshing {venue.name}")
+    if getattr(venue, service.id_field):
+        success, message = service.refresh_venue(venue)
+    else:
+        success, message = service.match_and_enrich_venue(venue)
+    if not success:
+        raise PermanentJobError(f"Could not refresh venue: {message}")
+
+    job.progress(1, 1, message)
+    return {'message': f"Venue '{venue.name}' refreshed successfully."}
+
+
+@task('guide.refresh_pulse')
+def refresh_pulse(job, content_type: Optional[str] = None):
+    """Regenerate pulse trends and/or headlines."""
+    job.progress(0, 1, f"Refreshing {content_type or 'trends and headlines'}")
+    result = pulse_service.force_refresh(content_type)
+
+    success_count = sum(1 for v in result.values() if v == 'success')
+    fail_count = sum(1 for v in result.values() if v == 'failed')
+    if fail_count == 0:
+        message = f'Successfully refreshed {success_count} content type(s)'
+    else:
+        message = f'Refreshed with {fail_count} failure(s)'
+
+    job.progress(1, 1, message)
+    return {'result': result, 'message': message}
@@ -1,3 +1,297 @@
-from django.test import TestCase
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .models import VenueAPIConfig
+
+from .services.base_venue_service import BaseVenueService
+from .services.call_meter import record_call
+from .services.composite_venue_service import CompositeVenueService
+from .services.yelp_service import YelpService
+
+
+class _YelpStandIn(BaseHTTPRequestHandler):
+    """Answers businesses/search like Yelp Fusion and records each query."""
+
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.requests.append((url.path, parse_qs(url.query)))
+        body = json.dumps({
+            'total': 1,
+            'businesses': [{
+                'id': 'yelp-1',
+                'name': 'Blue Ridge Brewing',
+                'rating': 4.5,
+                'review_count': 120,
+                'price': '$$',
+                'coordinates': {'latitude': 38.03, 'longitude': -78.48},
+                'location': {'city': 'Charlottesville', 'display_address': ['1 Main St']},
+            }],
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class YelpServiceTests(SimpleTestCase):
+    """YelpService against a local HTTP stand-in for the Fusion API."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), _YelpStandIn)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}/v3'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        _YelpStandIn.requests = []
+        cache.clear()
+        with override_settings(YELP_API_BASE_URL=self.base_url):
+            self.service = YelpService(api_key='test-key')
+
+    def test_search_nearby_sends_coordinates(self):
+        results = self.service.search_nearby(
+            city_name='Charlottesville',
+            venue_type='cafe_brewery',
+            limit=10,
+            location={'lat': 38.03, 'lon': -78.48, 'radius': 50000},
+        )
+
+        path, query = _YelpStandIn.requests[0]
+        self.assertEqual(path, '/v3/businesses/search')
+        self.assertEqual(query['latitude'], ['38.03'])
+        self.assertEqual(query['longitude'], ['-78.48'])
+        self.assertEqual(query['radius'], [str(YelpService.MAX_RADIUS_METERS)])
+        self.assertNotIn('location', query)
+        self.assertEqual([r['yelp_business_id'] for r in results], ['yelp-1'])
+
+    def test_search_nearby_by_city_name(self):
+        self.service.search_nearby(city_name='Charlottesville', venue_type='restaurant')
+
+        _, query = _YelpStandIn.requests[0]
+        self.assertEqual(query['location'], ['Charlottesville, VA'])
+        self.assertNotIn('latitude', query)
+
+    def test_find_match_rejects_blank_name(self):
+        for name in ('', '   '):
+            self.assertIsNone(self.service.find_match(name, '1 Main St', 'Charlottesville'))
+        self.assertEqual(_YelpStandIn.requests, [])
+
+    def test_find_match_by_name(self):
+        match = self.service.find_match('Blue Ridge Brewing', '', 'Charlottesville')
+        self.assertEqual(match['yelp_business_id'], 'yelp-1')
+
+
+class _ProviderStandIn(BaseVenueService):
+    """A provider that returns canned details and records one API call per lookup."""
+
+    def __init__(self, name, details=None, calls=1, error=None):
+        self.name = name
+        self.details = details
+        self.calls = calls
+        self.error = error
+        self.VENUE_TYPE_MAP = {}
+
+    @property
+    def provider_name(self):
+        return self.name
+
+    def _lookup(self):
+        record_call(self.name, self.calls)
+        if self.error:
+            raise self.error
+        return self.details
+
+    def search_nearby(self, city_name, state='VA', venue_type='restaurant', limit=20, **kwargs):
+        return []
+
+    def get_place_details(self, place_id, fields=None, tier='static'):
+        return self._lookup()
+
+    def find_match(self, name, address, city_name, state='VA'):
+        return self._lookup()
+
+
+GOOGLE_DETAILS = {
+    'google_place_id': 'g-1',
+    'name': 'Blue Ridge Brewing (Google)',
+    'rating': 4.6,
+    'rating_count': 300,
+    'phone': '',
+    'website': 'https://blueridge.example',
+}
+YELP_DETAILS = {
+    'yelp_business_id': 'yelp-1',
+    'name': 'Blue Ridge Brewing (Yelp)',
+    'rating': 4.5,
+    'rating_count': 120,
+    'phone': '+14345550100',
+    'website': 'https://yelp.example/biz/blue-ridge',
+    'price_level': 2,
+}
+
+
+class CompositeVenueServiceTests(SimpleTestCase):
+    """CompositeVenueService fan-out and merge over stand-ins for Google and Yelp."""
+
+    def composite(self, google=None, yelp=None):
+        return CompositeVenueService([
+            google or _ProviderStandIn('google', GOOGLE_DETAILS),
+            yelp or _ProviderStandIn('yelp', YELP_DETAILS),
+        ])
+
+    def test_merge_follows_field_precedence(self):
+        merged = self.composite().get_place_details(ids={'google': 'g-1', 'yelp': 'yelp-1'})
+
+        self.assertEqual(merged['rating'], 4.6)
+        self.assertEqual(merged['rating_count'], 300)
+        self.assertEqual(merged['website'], 'https://blueridge.example')
+        self.assertEqual(merged['google_place_id'], 'g-1')
+        self.assertEqual(merged['yelp_business_id'], 'yelp-1')
+        # Not in FIELD_PRECEDENCE: provider order, so the primary wins
+        self.assertEqual(merged['name'], 'Blue Ridge Brewing (Google)')
+        # Empty on Google, so Yelp's value is used
+        self.assertEqual(merged['phone'], '+14345550100')
+        self.assertEqual(merged['_sources']['phone'], 'yelp')
+        self.assertEqual(merged['_sources']['rating'], 'google')
+
+    def test_website_only_comes_from_google(self):
+        google = _ProviderStandIn('google', {**GOOGLE_DETAILS, 'website': ''})
+        merged = self.composite(google=google).get_place_details(ids={'google': 'g-1', 'yelp': 'yelp-1'})
+        self.assertNotIn('website', merged)
+
+    def test_yelp_fills_in_when_google_fails(self):
+        for google in (_ProviderStandIn('google', error=RuntimeError('boom')),
+                       _ProviderStandIn('google', details=None)):
+            merged = self.composite(google=google).find_match('Blue Ridge Brewing', '', 'Charlottesville')
+
+            self.assertEqual(merged['rating'], 4.5)
+            self.assertEqual(merged['name'], 'Blue Ridge Brewing (Yelp)')
+            self.assertEqual(set(merged['_sources'].values()), {'yelp'})
+
+    def test_no_results_merge_to_none(self):
+        service = self.composite(
+            google=_ProviderStandIn('google', details=None),
+            yelp=_ProviderStandIn('yelp', error=RuntimeError('boom')),
+        )
+        self.assertIsNone(service.find_match('Blue Ridge Brewing', '', 'Charlottesville'))
+
+    def test_details_only_ask_providers_with_an_id(self):
+        service = self.composite()
+        merged = service.get_place_details(ids={'google': 'g-1'})
+
+        self.assertNotIn('yelp_business_id', merged)
+        self.assertEqual(service.drain_call_counts(), {'google': 1, 'yelp': 0})
+
+    def test_call_counts_per_provider(self):
+        service = self.composite(
+            google=_ProviderStandIn('google', GOOGLE_DETAILS, calls=2),
+            yelp=_ProviderStandIn('yelp', error=RuntimeError('boom')),
+        )
+        service.find_match('Blue Ridge Brewing', '', 'Charlottesville')
+        service.get_place_details(ids={'google': 'g-1', 'yelp': 'yelp-1'})
+
+        # A failed call still counts; draining resets the counts
+        self.assertEqual(service.drain_call_counts(), {'google': 4, 'yelp': 2})
+        self.assertEqual(service.drain_call_counts(), {'google': 0, 'yelp': 0})
+
+    def test_cache_hits_are_not_counted(self):
+        service = self.composite(yelp=_ProviderStandIn('yelp', YELP_DETAILS, calls=0))
+        service.find_match('Blue Ridge Brewing', '', 'Charlottesville')
+        self.assertEqual(service.drain_call_counts(), {'google': 1, 'yelp': 0})
+
+
+class QuotaReservationTests(TestCase):
+    """VenueAPIConfig.reserve_requests() / refund_requests() against the database."""
+
+    def setUp(self):
+        self.config = VenueAPIConfig.objects.create(
+            provider='google', api_key_name='GOOGLE_PLACES_API_KEY', is_enabled=True, daily_quota=10,
+        )
+
+    def stored_requests(self):
+        return VenueAPIConfig.objects.get(pk=self.config.pk).requests_today
+
+    def test_reserve_counts_units(self):
+        reservation = self.config.reserve_requests(4)
+
+        self.assertEqual(reservation.units, 4)
+        self.assertEqual(self.stored_requests(), 4)
+        self.assertEqual(self.config.quota_remaining, 6)
+
+    def test_reserve_refuses_to_overspend(self):
+        self.assertIsNotNone(self.config.reserve_requests(8))
+        self.assertIsNone(self.config.reserve_requests(3))
+        self.assertEqual(self.stored_requests(), 8)
+
+    def test_guard_uses_database_usage(self):
+        # Another process spent quota since this instance was loaded
+        VenueAPIConfig.objects.filter(pk=self.config.pk).update(requests_today=9)
+
+        self.assertIsNone(self.config.reserve_requests(2))
+        self.assertEqual(self.stored_requests(), 9)
+
+    def test_partial_reserves_what_is_left(self):
+        VenueAPIConfig.objects.filter(pk=self.config.pk).update(requests_today=7)
+
+        reservation = self.config.reserve_requests(5, partial=True)
+
+        self.assertEqual(reservation.units, 3)
+        self.assertEqual(self.stored_requests(), 10)
+        self.assertIsNone(self.config.reserve_requests(1, partial=True))
+
+    def test_commit_refunds_unused_units(self):
+        with self.config.reserve_requests(5) as reservation:
+            self.assertTrue(reservation.use(2))
+            self.assertFalse(reservation.use(4))
+
+        self.assertEqual(self.stored_requests(), 2)
+
+    def test_refund_never_goes_below_zero(self):
+        reservation = self.config.reserve_requests(3)
+        VenueAPIConfig.objects.filter(pk=self.config.pk).update(requests_today=1)
+
+        reservation.refund()
+
+        self.assertEqual(self.stored_requests(), 0)
+        self.assertEqual(self.config.requests_today, 0)
+
+    def test_refund_from_previous_day_is_ignored(self):
+        today = timezone.now().date()
+        self.config.reserve_requests(4)
+
+        self.config.refund_requests(4, today - timedelta(days=1))
+
+        self.assertEqual(self.stored_requests(), 4)
+
+    def test_new_day_resets_usage(self):
+        yesterday = timezone.now().date() - timedelta(days=1)
+        VenueAPIConfig.objects.filter(pk=self.config.pk).update(requests_today=10, quota_reset_date=yesterday)
+        self.config.refresh_quota()
+
+        reservation = self.config.reserve_requests(2)
+
+        self.assertIsNotNone(reservation)
+        self.assertEqual(reservation.day, timezone.now().date())
+        config = VenueAPIConfig.objects.get(pk=self.config.pk)
+        self.assertEqual(config.requests_today, 2)
+        self.assertEqual(config.quota_reset_date, timezone.now().date())
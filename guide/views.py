@@ -10,14 +10,20 @@ from django.http import HttpResponse, Http404
 from django.urls import reverse
 from django.views.decorators.cache import cache_page
 from django.core.cache import cache
+from core.http_client import deadline, http_client
 from .models import (
     Region, City, Venue, MilitaryBase, Tunnel,
-    VacationDestination, VendorUtility, Testimonial, TeamMember,
-    VenueAPIConfig
+    VacationDestination, VendorUtility, Testimonial, TeamMember
 )
+from .services.api_configs import get_api_config
+from .services.refresh_scheduler import record_city_view, record_venue_view
 
 logger = logging.getLogger(__name__)
 
+# Seconds a page request may spend fetching a photo from Google, retries
+# included
+PHOTO_FETCH_DEADLINE = 8
+
 
 class HomeView(TemplateView):
     """Homepage with overview and city cards."""
@@ -48,6 +54,7 @@ class CityDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         city = self.object
+        record_city_view(city.pk)
 
         # Get venues by type, sorted by rating (highest first), then by name
         from django.db.models import F
@@ -259,6 +266,10 @@ def venue_photo(request, venue_id, photo_index=0):
     """
     import os
 
+    # Lead photo requests double as venue view counts for refresh priority
+    if photo_index == 0:
+        record_venue_view(venue_id)
+
     # Check cache first
     cache_key = f'venue_photo_{venue_id}_{photo_index}'
     cached_photo = cache.get(cache_key)
@@ -281,7 +292,7 @@ def venue_photo(request, venue_id, photo_index=0):
         raise Http404("Photo reference not found")
 
     # Get API key
-    config = VenueAPIConfig.objects.filter(provider='google', is_enabled=True).first()
+    config = get_api_config('google', enabled_only=True)
     if not config:
         raise Http404("API not configured")
 
@@ -298,8 +309,17 @@ def venue_photo(request, venue_id, photo_index=0):
 
     photo_url = f"https://places.googleapis.com/v1/{photo_name}/media?maxWidthPx={max_width}&key={api_key}"
 
+    # Photo media shares the cross-process Places budget; don't hold a
+    # page request for long waiting on it
+    from .services.rate_limiter import google_places_limiter, retry_after_seconds
+    if not google_places_limiter.acquire('photo', timeout=5):
+        raise Http404("Photo temporarily unavailable")
+
     try:
-        response = requests.get(photo_url, timeout=10)
+        with deadline(PHOTO_FETCH_DEADLINE):
+            response = http_client.get(photo_url, timeout=10, retry='api')
+        if response.status_code == 429:
+            google_places_limiter.penalize('photo', retry_after_seconds(response, 0))
         response.raise_for_status()
 
         content_type = response.headers.get('Content-Type', 'image/jpeg')